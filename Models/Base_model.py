@@ -1,603 +1,145 @@
-import cv2
-import mediapipe as mp
-import math
-import time  # Required for PlankHold timer
+import argparse
+import logging
+from exercise_core import pose as lazy
+from exercise_core import registry
+from exercise_core.analytics import RepAnalytics
+from exercise_core.events import (ANGLE, EXERCISE, HOLD, LOW_VISIBILITY, REP, STAGE, EventBus, EventEmitter,
+                                  console, json_lines, log_events)
+from exercise_core.frames import CaptureClock, FramePath, is_live, negotiated_format, open_capture
+from exercise_core.headless import print_event, run_headless
+from exercise_core.latency import LandmarkSmoother, LatencyController
+from exercise_core.people import MultiPersonCounter, PeopleDetector, run_people
+from exercise_core.pipeline import Pipeline
+from exercise_core.profiler import create_profiler
+from exercise_core.roi import RoiTracker
+from exercise_core.scheduler import AdaptiveScheduler
+from exercise_core.stepper import FrameStepper
+from exercise_core.writer import AsyncVideoWriter
 #push ups and crunches work on web cam
 #other exercises either have vertical positioning or the face is not visible so they will require a phone app
 #as phones can auto-rotate the display for vertical positions and zoom out to make face visible
-#other exercises can be tested on laptop by inputting the respective video from test_data folder
+#other exercises can be tested on laptop by passing the respective video from test_data with --source
+
+# Importing this module has no side effects: OpenCV and MediaPipe are only
+# loaded when main() runs, so the counters can be reused by servers and tests.
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Live exercise rep counter")
+    parser.add_argument("--exercise", default="auto",
+                        help="exercise mode, e.g. pushup or crunch; 'auto' (default) detects it")
+    parser.add_argument("--source", default="0", help="camera index or path to a video file")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, pose inference and display on separate threads")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window; print rep and stage events as JSON lines")
+    parser.add_argument("--output", help="write annotated video to this file (runs on a background thread)")
+    parser.add_argument("--output-every", type=int, default=1, help="keep every Nth frame in --output")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="skip pose inference while the body is still and far from a rep threshold")
+    parser.add_argument("--roi", action="store_true",
+                        help="run pose inference on a cropped window around the person")
+    parser.add_argument("--target-ms", type=float,
+                        help="per-frame inference budget; steps model complexity and input scale to hold it")
+    parser.add_argument("--smooth", action="store_true",
+                        help="filter landmark jitter before counting (always on with --target-ms)")
+    parser.add_argument("--people", type=int, metavar="N",
+                        help="count up to N people at once (needs --pose-model)")
+    parser.add_argument("--pose-model", help="MediaPipe pose_landmarker_*.task bundle for --people")
+    parser.add_argument("--debug-angles", type=float, metavar="HZ",
+                        help="log the tracked angle at most HZ times per second (DEBUG level)")
+    parser.add_argument("--profile", nargs="?", type=float, const=0, metavar="SECONDS",
+                        help="time each loop stage; report on exit, or every SECONDS if given")
+    parser.add_argument("--size", default="640x480", help="capture/output resolution, WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=int, default=30, help="frame rate to request from the camera")
+    parser.add_argument("--fourcc", default="MJPG", help="pixel format to request from the camera ('' to skip)")
+    args = parser.parse_args(argv)
+    if args.people:
+        if not args.pose_model:
+            parser.error("--people needs --pose-model pointing at a pose_landmarker .task file")
+        # The multi-person loop has one detector pass and no per-person inference to tune
+        unsupported = [flag for flag, used in (("--pipelined", args.pipelined), ("--adaptive", args.adaptive),
+                                               ("--roi", args.roi), ("--target-ms", args.target_ms),
+                                               ("--smooth", args.smooth), ("--profile", args.profile is not None))
+                       if used]
+        if unsupported:
+            parser.error(f"--people cannot be combined with {', '.join(unsupported)}")
+    return args
 
-# ----------------------------- Function to calculate angle -----------------------------
-def calculate_angle(a, b, c):
-    a = [a.x, a.y]
-    b = [b.x, b.y]
-    c = [c.x, c.y]
-
-    ab = [a[0] - b[0], a[1] - b[1]]
-    cb = [c[0] - b[0], c[1] - b[1]]
-
-    dot = ab[0]*cb[0] + ab[1]*cb[1]
-    mag_ab = math.sqrt(ab[0]**2 + ab[1]**2)
-    mag_cb = math.sqrt(cb[0]**2 + cb[1]**2)
-
-    if mag_ab * mag_cb == 0:
-        return 0
-
-    angle = math.acos(dot / (mag_ab * mag_cb))
-    return math.degrees(angle)
-
-
-# ----------------------------- Exercise Logic Functions -----------------------------
-def Pushup(landmarks, stage, rep_count):
-    r_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    r_elbow = landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value]
-    r_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value]
-
-    l_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    l_elbow = landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value]
-    l_wrist = landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value]
-
-    angle_r = calculate_angle(r_shoulder, r_elbow, r_wrist)
-    angle_l = calculate_angle(l_shoulder, l_elbow, l_wrist)
-    avg_angle = (angle_r + angle_l) / 2
-
-    if avg_angle > 160:
-        stage = "up"
-    if avg_angle < 90 and stage == "up":
-        stage = "down"
-        rep_count += 1
-        print(f"Push-up rep count: {rep_count}")
-
-    return stage, rep_count, avg_angle
-
-def Squat(landmarks, stage, rep_count, view="frontal"):
-    r_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value]
-    r_knee = landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value]
-    r_ankle = landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-
-    l_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    l_knee = landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-    l_ankle = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-
-    # Calculate average knee angle
-    angle_r = calculate_angle(r_hip, r_knee, r_ankle)
-    angle_l = calculate_angle(l_hip, l_knee, l_ankle)
-    avg_angle = (angle_r + angle_l) / 2
-
-    # Average hip Y for frontal view
-    avg_hip_y = (l_hip.y + r_hip.y) / 2
-
-    # Thresholds - tune these based on your camera setup
-    down_angle_thresh = 90
-    up_angle_thresh = 160
-
-    down_hip_y_thresh = 0.55
-    up_hip_y_thresh = 0.50
-
-    # Initialize stage if None
-    if stage is None:
-        if view == "frontal":
-            if avg_hip_y < up_hip_y_thresh:
-                stage = "up"
-            elif avg_hip_y > down_hip_y_thresh:
-                stage = "down"
-        else:  # side view
-            if avg_angle > up_angle_thresh:
-                stage = "up"
-            elif avg_angle < down_angle_thresh:
-                stage = "down"
-
-    # Transition logic based on view
-    if view == "frontal":
-        if stage == "down" and avg_hip_y < up_hip_y_thresh:
-            stage = "up"
-        elif stage == "up" and avg_hip_y > down_hip_y_thresh:
-            stage = "down"
-            rep_count += 1
-            print(f"Squat rep count: {rep_count}")
-
-    else:  # side view
-        if stage == "down" and avg_angle > up_angle_thresh:
-            stage = "up"
-        elif stage == "up" and avg_angle < down_angle_thresh:
-            stage = "down"
-            rep_count += 1
-            print(f"Squat rep count: {rep_count}")
-
-    print(f"Hip Y: {avg_hip_y:.2f}, Avg Angle: {avg_angle:.2f}, Stage: {stage}")
-    return stage, rep_count, avg_angle
-
-def Deadlift(landmarks, stage, rep_count, view="side"):
-    # Helper function to check visibility
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-   
-    r_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value]
-    r_knee = landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value]
-    r_ankle = landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-
-    l_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    l_knee = landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-    l_ankle = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-
-    r_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    l_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-
-    
-    min_visibility = 0.5
-    if min(visible(r_hip), visible(r_knee), visible(r_ankle),
-           visible(l_hip), visible(l_knee), visible(l_ankle),
-           visible(r_shoulder), visible(l_shoulder)) < min_visibility:
-        return stage, rep_count, 0, 0
-
-    
-    angle_r = calculate_angle(r_hip, r_knee, r_ankle)
-    angle_l = calculate_angle(l_hip, l_knee, l_ankle)
-    avg_knee_angle = (angle_r + angle_l) / 2
-
-    
-    back_angle_r = calculate_angle(r_shoulder, r_hip, r_ankle)
-    back_angle_l = calculate_angle(l_shoulder, l_hip, l_ankle)
-    avg_back_angle = (back_angle_r + back_angle_l) / 2
-
-    
-    down_knee_thresh = 120  #
-    up_knee_thresh = 160
-    down_back_thresh = 110  
-    up_back_thresh = 160
-
-    # Initial stage detection
-    if stage is None:
-        if avg_knee_angle > up_knee_thresh and avg_back_angle > up_back_thresh:
-            stage = "up"
-        elif avg_knee_angle < down_knee_thresh and avg_back_angle < down_back_thresh:
-            stage = "down"
-
-    # Rep counting logic
-    if stage == "down" and avg_knee_angle > up_knee_thresh and avg_back_angle > up_back_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Deadlift rep count: {rep_count}")
-
-    elif stage == "up" and avg_knee_angle < down_knee_thresh and avg_back_angle < down_back_thresh:
-        stage = "down"
-
-    print(f"Knee Angle: {avg_knee_angle:.2f}, Back Angle: {avg_back_angle:.2f}, Stage: {stage}")
-    return stage, rep_count, avg_knee_angle, avg_back_angle
-
-def GluteBridge(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    lk = landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-
-    # Check visibility
-    min_vis = 0.6
-    if visible(lh) < min_vis or visible(lk) < min_vis or visible(ls) < min_vis:
-        # Not visible enough; skip frame
-        return stage, rep_count, 0
-
-    hip_angle = calculate_angle(ls, lh, lk)  # Angle at hip joint (shoulder-hip-knee)
-
-    # Thresholds to define up/down positions (tweak as needed)
-    up_thresh = 170  # Hip nearly straight (lying flat)
-    down_thresh = 130  # Hip bent (bridge up)
-
-    if stage is None:
-        # Initialize stage
-        if hip_angle < up_thresh:
-            stage = "down"  # Lying flat
-        elif hip_angle > down_thresh:
-            stage = "up"    # Bridge raised
-
-    # Count reps based on stage transitions
-    if stage == "down" and hip_angle < down_thresh:
-        stage = "up"
-    elif stage == "up" and hip_angle > up_thresh:
-        stage = "down"
-        rep_count += 1
-        print(f"Glute Bridge rep count: {rep_count}")
-
-    return stage, rep_count, hip_angle
-
-def LyingLegRaise(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    # Key landmarks: shoulder, hip, ankle (left side)
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    la = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-
-    min_vis = 0.6
-    if visible(ls) < min_vis or visible(lh) < min_vis or visible(la) < min_vis:
-        # Skip frame if low visibility
-        return stage, rep_count, 0
-
-    # Calculate hip angle = angle at hip joint formed by shoulder-hip-ankle
-    hip_angle = calculate_angle(ls, lh, la)
-    print(f"Lying Leg Raise Hip Angle: {hip_angle:.2f}, Stage: {stage}, Reps: {rep_count}")
-
-    # Thresholds (tune for your setup)
-    down_thresh = 160   # Leg down (close to lying flat)
-    up_thresh = 100     # Leg lifted up (hip flexion decreases angle)
-
-    # Initialize stage if None
-    if stage is None:
-        if hip_angle < up_thresh:
-            stage = "up"
-        elif hip_angle > down_thresh:
-            stage = "down"
-
-    # Rep counting logic
-    if stage == "down" and hip_angle < up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Lying Leg Raise rep counted! Total: {rep_count}")
-    elif stage == "up" and hip_angle > down_thresh:
-        stage = "down"
-
-    return stage, rep_count, hip_angle
-
-def ChestPress(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    # Use right side landmarks (can average both sides if you want)
-    r_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    r_elbow = landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value]
-    r_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value]
-
-    min_vis = 0.6
-    if visible(r_shoulder) < min_vis or visible(r_elbow) < min_vis or visible(r_wrist) < min_vis:
-        return stage, rep_count, 0
-
-    elbow_angle = calculate_angle(r_shoulder, r_elbow, r_wrist)
-    print(f"Chest Press Elbow Angle: {elbow_angle:.2f}, Stage: {stage}, Reps: {rep_count}")
-
-    # Thresholds (tune these)
-    down_thresh = 90    # arms bent at the bottom of press
-    up_thresh = 160     # arms extended at the top
-
-    # Initialize stage if None
-    if stage is None:
-        if elbow_angle > up_thresh:
-            stage = "up"
-        elif elbow_angle < down_thresh:
-            stage = "down"
-
-    # Rep counting logic
-    if stage == "down" and elbow_angle > up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Chest Press rep counted! Total: {rep_count}")
-    elif stage == "up" and elbow_angle < down_thresh:
-        stage = "down"
-
-    return stage, rep_count, elbow_angle
-
-def BicepCurl(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    # Use right arm landmarks (you can do left or average both)
-    r_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    r_elbow = landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value]
-    r_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value]
-
-    min_vis = 0.6
-    if min(visible(r_shoulder), visible(r_elbow), visible(r_wrist)) < min_vis:
-        return stage, rep_count, 0
-
-    # Calculate elbow angle
-    angle = calculate_angle(r_shoulder, r_elbow, r_wrist)
-    print(f"Bicep Curl Angle: {angle:.2f}, Stage: {stage}, Reps: {rep_count}")
-
-    # Thresholds
-    down_thresh = 160  # arm extended
-    up_thresh = 50     # arm curled
-
-    # Initial stage
-    if stage is None:
-        if angle > down_thresh:
-            stage = "down"
-        elif angle < up_thresh:
-            stage = "up"
-
-    # Rep counting logic
-    if stage == "down" and angle < up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Bicep Curl rep counted! Total: {rep_count}")
-    elif stage == "up" and angle > down_thresh:
-        stage = "down"
-
-    return stage, rep_count, angle
-
-def Row(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    le = landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value]
-    lw = landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value]
-
-    elbow_angle = calculate_angle(ls, le, lw)
-
-    # Always print angle to debug
-    print(f"Row Elbow Angle: {elbow_angle:.2f}, Stage: {stage}, Reps: {rep_count}")
-
-    if min(visible(ls), visible(le), visible(lw)) < 0.6:
-        return stage, rep_count, elbow_angle  # still return angle so it displays on screen
-
-    # Rep counting thresholds (180° down, ~90° up)
-    if elbow_angle > 120:
-        stage = "down"
-    if elbow_angle < 70 and stage == "down":
-        stage = "up"
-        rep_count += 1
-        print(f"Row rep counted! Total: {rep_count}")
-
-    return stage, rep_count, elbow_angle
-
-
-def Crunch(landmarks, stage, rep_count):
-    def visible(landmark):
-        return landmark.visibility if hasattr(landmark, 'visibility') else 1.0
-
-    # We'll use the angle between hip, shoulder, and ear to detect crunch motion
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    le = landmarks[mp_pose.PoseLandmark.LEFT_EAR.value]
-
-    crunch_angle = calculate_angle(lh, ls, le)
-
-    print(f"Crunch Angle: {crunch_angle:.2f}, Stage: {stage}, Reps: {rep_count}")
-
-    if min(visible(lh), visible(ls), visible(le)) < 0.6:
-        return stage, rep_count, crunch_angle
-
-    # Based on your actual values, adjust thresholds:
-    if crunch_angle > 122:
-        stage = "down"
-    if crunch_angle < 110 and stage == "down":
-        stage = "up"
-        rep_count += 1
-        print(f"Crunch rep counted! Total: {rep_count}")
-
-    return stage, rep_count, crunch_angle
-
-# ----------------------------- Shoulder Shrug -----------------------------
-def ShoulderShrug(landmarks, stage, rep_count):
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    rs = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    le = landmarks[mp_pose.PoseLandmark.LEFT_EAR.value]
-    re = landmarks[mp_pose.PoseLandmark.RIGHT_EAR.value]
-
-    avg_shoulder_y = (ls.y + rs.y) / 2
-    avg_ear_y = (le.y + re.y) / 2
-
-    diff = avg_shoulder_y - avg_ear_y
-
-    up_thresh = 0.05
-    down_thresh = 0.12
-
-    if stage is None:
-        if diff > down_thresh:
-            stage = "down"
-        elif diff < up_thresh:
-            stage = "up"
-
-    if stage == "down" and diff < up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Shoulder Shrug rep count: {rep_count}")
-    elif stage == "up" and diff > down_thresh:
-        stage = "down"
-
-    return stage, rep_count, diff
-
-# ----------------------------- Plank Hold (Timer-based) -----------------------------
-def PlankHold(landmarks, hold_start_time, holding):
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    la = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-
-    hip_angle = calculate_angle(ls, lh, la)
-
-    plank_angle_thresh = 160
-
-    if hip_angle > plank_angle_thresh:
-        if not holding:
-            hold_start_time = time.time()
-            holding = True
-        hold_duration = int(time.time() - hold_start_time)
-    else:
-        hold_start_time = None
-        hold_duration = 0
-        holding = False
-
-    print(f"Plank Hold duration: {hold_duration} sec")
-    return hold_start_time, holding, hold_duration
-
-# ----------------------------- Lateral Raise -----------------------------
-def LateralRaise(landmarks, stage, rep_count):
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    le = landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value]
-    lw = landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value]
-
-    angle_l = calculate_angle(ls, le, lw)
-
-    up_thresh = 80
-    down_thresh = 30
-
-    if stage is None:
-        if angle_l < down_thresh:
-            stage = "down"
-        elif angle_l > up_thresh:
-            stage = "up"
-
-    if stage == "down" and angle_l > up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Lateral Raise rep count: {rep_count}")
-    elif stage == "up" and angle_l < down_thresh:
-        stage = "down"
-
-    return stage, rep_count, angle_l
-
-# ----------------------------- Lunges -----------------------------
-def Lunges(landmarks, stage, rep_count):
-    lh = landmarks[mp_pose.PoseLandmark.LEFT_HIP.value]
-    lk = landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value]
-    la = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-
-    hip_angle = calculate_angle(lh, lk, la)
-
-    down_thresh = 100
-    up_thresh = 160
-
-    if stage is None:
-        if hip_angle > up_thresh:
-            stage = "up"
-        elif hip_angle < down_thresh:
-            stage = "down"
-
-    if stage == "down" and hip_angle > up_thresh:
-        stage = "up"
-        rep_count += 1
-        print(f"Lunges rep count: {rep_count}")
-    elif stage == "up" and hip_angle < down_thresh:
-        stage = "down"
-
-    return stage, rep_count, hip_angle
-
-# ----------------------------- Jumping Jacks -----------------------------
-def JumpingJacks(landmarks, stage, rep_count):
-    la = landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-    ra = landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-    lw = landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value]
-    rw = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value]
-
-    foot_distance = abs(la.x - ra.x)
-    hand_y = (lw.y + rw.y) / 2
-
-    open_thresh = 0.4
-    hand_up_thresh = 0.4
-
-    if stage is None:
-        if foot_distance < 0.2 and hand_y > 0.6:
-            stage = "closed"
-        elif foot_distance > open_thresh and hand_y < hand_up_thresh:
-            stage = "open"
-
-    if stage == "closed" and foot_distance > open_thresh and hand_y < hand_up_thresh:
-        stage = "open"
-        rep_count += 1
-        print(f"Jumping Jack rep count: {rep_count}")
-    elif stage == "open" and foot_distance < 0.2 and hand_y > 0.6:
-        stage = "closed"
-
-    return stage, rep_count, foot_distance, hand_y
 
 # ----------------------------- Main Code -----------------------------
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
-
-# Get user input for exercise mode
-exercise_mode = input("Enter the exercise mode (e.g., crunch, pushup): ").strip().lower()
-
-# Open the webcam (0 is usually the default camera)
-cap = cv2.VideoCapture(0)
-
-# Optional: Check if the webcam opened successfully
-if not cap.isOpened():
-    print("Error: Unable to access the webcam.")
-else:
-    print(f"Webcam accessed successfully. Exercise mode set to: {exercise_mode}")
-
-rep_count = 0
-stage = None
-hold_start_time = None
-holding = False
-
-with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.flip(frame, 1)
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-     
-
-        results = pose.process(image_rgb)
-        frame = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-
+def main(argv=None):
+    args = parse_args(argv)
+
+    exercise_mode = args.exercise
+
+    # Every exercise is a declarative spec in exercise_core.registry. Look it up
+    # once and compile it into a state machine that is stepped once per frame;
+    # unknown names fail here instead of silently counting nothing.  'auto'
+    # steps every counter at once and reports the one being performed.
+    try:
+        counter = registry.create(exercise_mode)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+
+    cv2 = lazy.cv2()
+    mp_drawing = lazy.mp_drawing()
+    mp_pose = lazy.mp_pose()
+
+    # Open the webcam (0 is usually the default camera) or video file, asking the
+    # camera for the output size up front so frames need no resize
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    cap = open_capture(args.source, size=size, fps=args.fps, fourcc=args.fourcc)
+    frame_path = FramePath(size, reuse_reads=not args.pipelined)
+    clock = CaptureClock(cap, is_live(args.source))
+
+    # Optional: Check if the webcam opened successfully
+    if not cap.isOpened():
+        print("Error: Unable to access the webcam.")
+    else:
+        print(f"Webcam accessed successfully. Exercise mode set to: {exercise_mode}")
+        if is_live(args.source):
+            print("Camera format: %dx%d @ %.0f fps %s" % negotiated_format(cap))
+
+    # Skip pose inference on still frames far from a threshold (--adaptive)
+    scheduler = AdaptiveScheduler() if args.adaptive else None
+    # Run inference on a padded window around the person (--roi)
+    roi = RoiTracker() if args.roi else None
+    # Hold a per-frame latency budget by switching model complexity and input
+    # scale (--target-ms); smooth landmarks so lighter models don't add false reps
+    smoother = LandmarkSmoother() if args.smooth or args.target_ms else None
+    # Tempo, range of motion and velocity of each rep, updated in O(1) per frame
+    analytics = RepAnalytics()
+
+    # Rep, stage and visibility changes go through a non-blocking event bus;
+    # the counters never print and nothing is formatted unless subscribed
+    bus = EventBus()
+    if args.headless:
+        bus.subscribe(json_lines(), kinds=(EXERCISE, STAGE, REP, HOLD, LOW_VISIBILITY))
+    else:
+        bus.subscribe(console, kinds=(REP, LOW_VISIBILITY))
+    if args.debug_angles:
+        logging.basicConfig(level=logging.DEBUG)
+        bus.subscribe(log_events(), kinds=(ANGLE,))
+    angle_interval = 1.0 / args.debug_angles if args.debug_angles else None
+    emitter = EventEmitter(bus, counter, angle_interval=angle_interval)
+
+    # --profile: p50/p95/p99 per stage; a no-op object when off
+    profiler = create_profiler(args.profile is not None, report_every=args.profile or None)
+
+    def infer(item):
+        frame, t = item
+        # Mirrored BGR for display and RGB for inference, both in reused buffers
+        with profiler.stage("prepare"):
+            frame, image_rgb = frame_path.prepare(frame)
+        # One vectorized pass computes every angle; hold timers use the capture time
+        results, value = stepper.step(image_rgb, t)
+        return frame, results, counter.stage, counter.reps, value
+
+    def draw(frame, results, value, stage, rep_count):
         if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-
-            if exercise_mode == "pushup":
-                stage, rep_count, avg_angle = Pushup(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Push-up Angle: {int(avg_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-
-            elif exercise_mode == "squat":
-                stage, rep_count, avg_angle = Squat(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Squat Angle: {int(avg_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode== "Deadlift":
-                stage, rep_count, avg_knee_angle, avg_back_angle = Deadlift(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Deadlift Angle: {int(avg_knee_angle)}',(30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "Glute Bridge":
-                stage, rep_count, hip_angle = GluteBridge(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Hip Angle: {int(hip_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 180), 2)
-            elif exercise_mode == "LyingLegRaise":
-                stage, rep_count, hip_angle = LyingLegRaise(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Lying Leg Raise Angle: {int(hip_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "InclineChestPress":
-                stage, rep_count, elbow_angle = ChestPress(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Chest Press Angle: {int(elbow_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "BicepCurl":
-                stage, rep_count, curl_angle = BicepCurl(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Bicep Curl Angle: {int(curl_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "Rows":
-                stage, rep_count, elbow_angle = Row(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Row Angle: {int(elbow_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 0), 2)
-            elif exercise_mode == "crunch":
-                stage, rep_count, avg_angle = Crunch(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Crunch Angle: {int(avg_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "ShoulderShrug":
-                stage, rep_count, diff = ShoulderShrug(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Shoulder Shrug Diff: {diff:.2f}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "PlankHold":
-                hold_start_time, holding, hold_duration = PlankHold(landmarks, hold_start_time, holding)
-                cv2.putText(frame, f'Plank Hold Duration: {hold_duration} sec', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "LateralRaise":
-                stage, rep_count, angle_l = LateralRaise(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Lateral Raise Angle: {int(angle_l)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "Lunges":
-                stage, rep_count, hip_angle = Lunges(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Lunges Angle: {int(hip_angle)}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-            elif exercise_mode == "JumpingJacks":
-                stage, rep_count, foot_distance, hand_y = JumpingJacks(landmarks, stage, rep_count)
-                cv2.putText(frame, f'Jumping Jacks Foot Distance: {foot_distance:.2f}', (30, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
-
+            cv2.putText(frame, counter.overlay(value), (30, 150),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, counter.spec.color, 2)
 
             # Draw landmarks
             mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
@@ -607,13 +149,108 @@ with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as
                     cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 2)
         cv2.putText(frame, f"Stage: {stage}", (30, 100),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 0), 2)
-
-        frame = cv2.resize(frame, (640, 480))
+        last = analytics.last
+        if last is not None and "rom" in last:
+            tempo = (f"{last['eccentric_s']:.1f}s/{last['concentric_s']:.1f}s" if "eccentric_s" in last
+                     else f"{last['tut_s']:.1f}s")
+            cv2.putText(frame, f"Last rep: {tempo}  ROM {last['rom']:.0f}", (30, 200),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+    rendered = [0]
+
+    def render(packet):
+        frame, results, stage, rep_count, value = packet
+        with profiler.stage("draw"):
+            draw(frame, results, value, stage, rep_count)
+            # Every frame is shown; --output keeps every Nth
+            if writer is not None and writer.wants(rendered[0]):
+                writer.write(frame)
+        rendered[0] += 1
+        with profiler.stage("display"):
+            cv2.imshow("Exercise Counter", frame)
+
+            # Press ESC to exit; the pipelined loop only needs to pump GUI events
+            keep_going = cv2.waitKey(1 if args.pipelined else 10) & 0xFF != 27
+        profiler.frame_done()
+        return keep_going
+
+    def read():
+        frame = frame_path.read(cap)
+        return None if frame is None else (frame, clock())
+
+    def timed_read():
+        with profiler.stage("read"):
+            return read()
+
+    # --people: one PoseLandmarker pass finds everyone, each track has its own counter
+    people = MultiPersonCounter(exercise_mode) if args.people else None
+    people_frames = [0]
+
+    def render_people(frame, landmarks, stepped):
+        frame_index = people_frames[0]
+        people_frames[0] += 1
+        if args.headless and not (writer is not None and writer.wants(frame_index)):
+            return True
+        height, width = frame.shape[:2]
+        for i, (track, person, value) in enumerate(stepped):
+            for x, y, _, visibility in landmarks[i]:
+                if visibility > 0.5:
+                    cv2.circle(frame, (int(x * width), int(y * height)), 3, (0, 255, 0), -1)
+            x, y = landmarks[i, 0, :2]
+            cv2.putText(frame, f"#{track} Reps: {person.reps} {person.stage or ''}",
+                        (int(x * width) - 60, max(20, int(y * height) - 30)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, person.spec.color, 2)
+        if writer is not None and writer.wants(frame_index):
+            writer.write(frame)
+        if args.headless:
+            return True
         cv2.imshow("Exercise Counter", frame)
+        return cv2.waitKey(10) & 0xFF != 27
 
-        # Press ESC to exit
-        if cv2.waitKey(10) & 0xFF == 27:
-            break
+    writer = None
+    if args.output:
+        fps = cap.get(cv2.CAP_PROP_FPS) or args.fps
+        writer = AsyncVideoWriter(args.output, fps=fps, every=args.output_every)
 
-cap.release()
-cv2.destroyAllWindows()
+    if args.people:
+        pose_model = PeopleDetector(args.pose_model, max_people=args.people)
+    elif args.target_ms:
+        pose_model = LatencyController(args.target_ms)
+    else:
+        pose_model = lazy.get_pose()
+    summary = None
+    with pose_model as pose:
+        if people is not None:
+            # Per-track events go through the same bus, tagged with the track ID as "source"
+            summary = run_people(read, frame_path.prepare, pose, people, on_event=None, render=render_people,
+                                 bus=bus, angle_interval=angle_interval)
+        elif args.headless:
+            summary = run_headless(read, frame_path.prepare, pose, counter, on_event=None, writer=writer,
+                                   draw=draw, scheduler=scheduler, roi=roi, smoother=smoother,
+                                   analytics=analytics, events=emitter, profiler=profiler)
+        else:
+            stepper = FrameStepper(pose, counter, scheduler, roi, smoother, analytics, emitter, profiler)
+            if args.pipelined:
+                # Capture, inference and display overlap; live sources drop stale frames
+                Pipeline(timed_read, infer, render, drop_stale=is_live(args.source)).run()
+            else:
+                while cap.isOpened():
+                    item = timed_read()
+                    if item is None or not render(infer(item)):
+                        break
+
+    # Flush queued events first so the summary is the last line
+    bus.close()
+    if args.headless and summary is not None:
+        print_event(dict(summary, event="summary"))
+    if profiler.enabled and not args.headless:
+        print(profiler.format_report())
+    if writer is not None:
+        writer.close()
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Exercise-counting core shared by the webcam scripts and the web app.
+
+Importing the package has no side effects and does not import MediaPipe or
+OpenCV; those are loaded on first use through exercise_core.pose.
+"""
+from .angles import (FEATURE_INDEX, FEATURE_NAMES, NUM_FEATURES, calculate_angle,
+                     compute_features, landmarks_to_array)
+from .registry import EXERCISES, create, get_spec, make_counter, register
+
+_LAZY = {"create_pose": "pose", "get_pose": "pose", "prewarm": "pose"}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{module}", __name__), name)
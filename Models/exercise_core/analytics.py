@@ -0,0 +1,152 @@
+"""Streaming per-rep analytics in constant time and memory.
+
+RepAnalytics watches what a counter reports each frame (stage, reps,
+display value, capture time) and keeps only running accumulators for the
+current rep.  When a rep completes it emits a record:
+
+    duration_s      time since the previous rep (or the first stage change)
+    phases_s        time spent moving into each stage, e.g. {"down": 1.1, "up": 0.8}
+    eccentric_s     the phase that ends in "down" (lowering), when the spec has one
+    concentric_s    the other phase
+    tut_s           time under tension: both phases together
+    min / max / rom lowest, highest and range of the displayed angle over the rep
+    peak_velocity   fastest change of the displayed value, units per second
+    mean_velocity   rom covered twice (down and up) divided by tut_s
+
+Every numeric field also feeds a Welford accumulator (count, mean, std,
+min, max), and only the last few records are kept, so a long session costs
+no more than a short one.
+"""
+import math
+from collections import deque
+
+ECCENTRIC_STAGE = "down"
+STAT_FIELDS = ("duration_s", "eccentric_s", "concentric_s", "tut_s", "rom", "peak_velocity", "mean_velocity")
+
+
+class RunningStats:
+    """Welford mean / variance plus min and max."""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def as_dict(self, digits=3):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": round(self.mean, digits), "std": round(self.std, digits),
+                "min": round(self.min, digits), "max": round(self.max, digits)}
+
+
+class RepAnalytics:
+    """Per-rep tempo, range of motion and velocity from a counter's per-frame output.
+
+    alpha smooths the frame-to-frame velocity before peaks are taken;
+    keep is how many recent rep records are retained.
+    """
+
+    def __init__(self, alpha=0.5, keep=10):
+        self.alpha = alpha
+        self.recent = deque(maxlen=keep)
+        self.reset()
+
+    def reset(self):
+        self.recent.clear()
+        self.stats = {field: RunningStats() for field in STAT_FIELDS}
+        self._stage = None
+        self._reps = 0
+        self._stage_t = None        # when the current stage was entered
+        self._rep_t = None          # when the previous rep completed
+        self._phases = {}
+        self._prev = None           # (t, value) of the previous frame
+        self._velocity = 0.0
+        self._clear_rep()
+
+    def _clear_rep(self):
+        self._min = math.inf
+        self._max = -math.inf
+        self._peak = 0.0
+
+    def update(self, stage, reps, value, t):
+        """Feed one frame; returns the finished rep's record when a rep completed, else None."""
+        if value is not None:
+            if self._prev is not None and t > self._prev[0]:
+                raw = (value - self._prev[1]) / (t - self._prev[0])
+                self._velocity += self.alpha * (raw - self._velocity)
+                self._peak = max(self._peak, abs(self._velocity))
+            self._prev = (t, value)
+            self._min = min(self._min, value)
+            self._max = max(self._max, value)
+
+        if stage != self._stage:
+            if self._stage_t is not None and stage is not None:
+                self._phases[stage] = t - self._stage_t
+            if self._rep_t is None and stage is not None:
+                self._rep_t = t
+            self._stage = stage
+            self._stage_t = t
+
+        record = None
+        if reps == self._reps + 1:
+            record = self._finish(reps, t)
+        elif reps != self._reps:
+            # The counter was reset (or switched exercise); start over
+            self._restart()
+        self._reps = reps
+        return record
+
+    def _restart(self):
+        """Drop the rep in progress; history and stats are kept."""
+        self._phases = {}
+        self._rep_t = None
+        self._prev = None
+        self._velocity = 0.0
+        self._clear_rep()
+
+    def _finish(self, reps, t):
+        phases = {k: round(v, 3) for k, v in self._phases.items()}
+        tut = sum(self._phases.values())
+        record = {"rep": reps, "t": round(t, 3), "duration_s": round(t - self._rep_t, 3),
+                  "phases_s": phases, "tut_s": round(tut, 3)}
+        if ECCENTRIC_STAGE in self._phases and len(self._phases) == 2:
+            eccentric = self._phases[ECCENTRIC_STAGE]
+            record["eccentric_s"] = round(eccentric, 3)
+            record["concentric_s"] = round(tut - eccentric, 3)
+        if self._max >= self._min:
+            rom = self._max - self._min
+            record.update({"min": round(self._min, 3), "max": round(self._max, 3), "rom": round(rom, 3),
+                           "peak_velocity": round(self._peak, 3),
+                           "mean_velocity": round(2 * rom / tut, 3) if tut > 0 else 0.0})
+
+        for field in STAT_FIELDS:
+            if field in record:
+                self.stats[field].add(record[field])
+        self.recent.append(record)
+        self._rep_t = t
+        self._clear_rep()
+        return record
+
+    @property
+    def last(self):
+        return self.recent[-1] if self.recent else None
+
+    def summary(self):
+        return {"reps": self._reps, "stats": {k: v.as_dict() for k, v in self.stats.items()},
+                "recent": list(self.recent)}
@@ -0,0 +1,178 @@
+"""Parallel batch analyzer for directories of exercise videos.
+
+    python -m exercise_core.batch ../Data/test_data --out results
+
+Every video under the directory is scored in a process pool with one
+MediaPipe Pose per worker.  The exercise comes from a manifest (JSON object
+mapping a video's relative path or file name to an exercise) or else from the
+parent folder name, e.g. bicepcurl_data/ -> bicepcurl.  For each video the
+analyzer writes <name>.json (reps, stage, timing) and <name>.angles.npz
+(per-frame features, visibility and timestamps), plus summary.json overall.
+Landmarks go through the trace cache, so re-runs skip pose inference.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from . import pose as lazy
+from . import registry, traces
+from .angles import FEATURE_NAMES
+
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".avi", ".mov", ".mkv")
+MANIFEST_NAME = "manifest.json"
+
+_pose = None
+_pose_options = {}
+
+
+# ----------------------------- Discovery -----------------------------
+def exercise_from_folder(folder):
+    """'bicepcurl_data' -> 'bicepcurl'; None if it names no registered exercise."""
+    name = os.path.basename(os.path.normpath(folder))
+    if name.endswith("_data"):
+        name = name[:-len("_data")]
+    try:
+        return registry.get_spec(name).name
+    except KeyError:
+        return None
+
+
+def find_videos(root, manifest=None):
+    """Yield (video_path, relative_path, exercise) for every video under root."""
+    manifest = manifest or {}
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for file_name in sorted(files):
+            if not file_name.lower().endswith(VIDEO_EXTENSIONS):
+                continue
+            path = os.path.join(directory, file_name)
+            rel = os.path.relpath(path, root)
+            exercise = manifest.get(rel.replace(os.sep, "/")) or manifest.get(file_name) \
+                or exercise_from_folder(directory)
+            yield path, rel, exercise
+
+
+def load_manifest(root, manifest_path=None):
+    path = manifest_path or os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+# ----------------------------- Worker -----------------------------
+def _init_worker(pose_options):
+    global _pose_options
+    _pose_options = pose_options
+
+
+def _worker_pose():
+    """This worker's Pose, built on the first cache miss and reset between videos."""
+    global _pose
+    if _pose is None:
+        _pose = lazy.create_pose(**_pose_options)
+    elif hasattr(_pose, "reset"):
+        # Tracking state must not leak from the previous video
+        _pose.reset()
+    return _pose
+
+
+def analyze_video(path, exercise, out_path, cache_dir=None, use_cache=True, pose_options=None):
+    """Score one video; runs inside a pool worker."""
+    settings = traces.trace_settings(**(pose_options or {}))
+
+    started = time.perf_counter()
+    key = traces.trace_key(path, settings)
+    trace = traces.load_trace(key, settings, cache_dir) if use_cache else None
+    if trace is None:
+        trace = traces.extract_trace(path, settings, pose=_worker_pose())
+        if use_cache:
+            traces.save_trace(trace, key, cache_dir)
+    landmarks_done = time.perf_counter()
+
+    values, visibility, valid = trace.features()
+    summary = traces.replay(trace, exercise, (values, visibility, valid))
+    replay_done = time.perf_counter()
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez_compressed(out_path + ".angles.npz", values=values, visibility=visibility,
+                        valid=valid, times=np.asarray(trace.times),
+                        feature_names=np.array(FEATURE_NAMES))
+    frames = len(trace)
+    summary.update({
+        "video": path,
+        "timing": {
+            "landmarks_s": round(landmarks_done - started, 4),
+            "replay_s": round(replay_done - landmarks_done, 4),
+            "fps": round(frames / max(replay_done - started, 1e-9), 1),
+        },
+    })
+    with open(out_path + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+# ----------------------------- Driver -----------------------------
+def run_batch(root, out_dir, workers=None, manifest=None, cache_dir=None, use_cache=True, pose_options=None):
+    """Analyze every video under root; returns the list of per-video summaries."""
+    pose_options = pose_options or {}
+    jobs, skipped = [], []
+    for path, rel, exercise in find_videos(root, manifest):
+        if exercise is None:
+            skipped.append(rel)
+            continue
+        out_path = os.path.join(out_dir, os.path.splitext(rel)[0])
+        jobs.append((path, exercise, out_path))
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pose_options,)) as pool:
+        futures = {pool.submit(analyze_video, path, exercise, out_path, cache_dir, use_cache, pose_options): path
+                   for path, exercise, out_path in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"video": futures[future], "error": repr(e)})
+
+    results.sort(key=lambda r: r["video"])
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump({"videos": results, "skipped": skipped,
+                   "wall_s": round(time.perf_counter() - started, 3)}, f, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every exercise video in a directory")
+    parser.add_argument("root", help="directory to scan, e.g. ../Data/test_data")
+    parser.add_argument("--out", default="batch_results", help="output directory")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--manifest", help=f"JSON file mapping videos to exercises (default: ROOT/{MANIFEST_NAME})")
+    parser.add_argument("--cache-dir", help="landmark trace cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always run pose inference")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1, 2), help="MediaPipe pose model complexity")
+    args = parser.parse_args(argv)
+
+    pose_options = {}
+    if args.model_complexity is not None:
+        pose_options["model_complexity"] = args.model_complexity
+
+    results = run_batch(args.root, args.out, workers=args.workers,
+                        manifest=load_manifest(args.root, args.manifest),
+                        cache_dir=args.cache_dir, use_cache=not args.no_cache,
+                        pose_options=pose_options)
+    for r in results:
+        if "error" in r:
+            print(f"{r['video']}: ERROR {r['error']}")
+        else:
+            print(f"{r['video']}: {r['exercise']} reps={r['reps']} frames={r['frames']} fps={r['timing']['fps']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""End-to-end throughput and latency benchmark over the bundled videos.
+
+    python -m exercise_core.bench --out bench.json
+    python -m exercise_core.bench --config default --config roi+adaptive --baseline bench.json
+
+Every video under the given directories (default: the repository's
+Data/pushup_data and Data/test_data, wherever this is run from) runs
+through the same headless pipeline Base_model uses: decode,
+FramePath.prepare, pose inference, counter.  Each run reports frames/sec,
+per-frame latency percentiles (profiler histograms), peak RSS and the rep
+count, and results are written as JSON.  Given --baseline, runs are matched
+by (video path below Data/, config), so a baseline recorded in another
+checkout or on CI still lines up, and any that got slower, heavier or count
+differently are listed; the exit status is 1 when there are regressions.
+
+A config is a "+"-joined set of options:
+
+    default         model complexity 1, every frame inferred
+    lite / heavy    model complexity 0 / 2
+    roi             RoiTracker crops inference to the person
+    adaptive        AdaptiveScheduler skips still frames
+    smooth          LandmarkSmoother before the counter
+    target=MS       LatencyController holding MS per frame
+
+Runs execute one at a time, each in a fresh process, so they don't compete
+for cores and ru_maxrss is that run's own peak.  That uses
+ProcessPoolExecutor(max_tasks_per_child=1) on Python 3.11+ and a new
+single-worker executor per run on older versions.  The pose graph is built and
+warmed before timing starts.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:     # not on Windows
+    resource = None
+
+from . import pose as lazy
+from . import registry
+from .batch import find_videos
+from .frames import CaptureClock, FramePath, open_capture
+from .headless import run_headless
+from .latency import LandmarkSmoother, LatencyController
+from .profiler import Profiler
+from .roi import RoiTracker
+from .scheduler import AdaptiveScheduler
+
+# Models/exercise_core/bench.py -> repository root
+_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Data")
+DEFAULT_ROOTS = (os.path.join(_DATA, "pushup_data"), os.path.join(_DATA, "test_data"))
+OPTIONS = {
+    "default": {},
+    "lite": {"model_complexity": 0},
+    "heavy": {"model_complexity": 2},
+    "roi": {"roi": True},
+    "adaptive": {"adaptive": True},
+    "smooth": {"smooth": True},
+}
+# Relative change that counts as a regression when comparing with a baseline;
+# above one histogram bucket (12%) so p95 must move by two buckets
+DEFAULT_TOLERANCE = 0.15
+
+
+# ----------------------------- Configs -----------------------------
+def parse_config(name):
+    """'roi+adaptive' -> {"roi": True, "adaptive": True}; raises ValueError on unknown options."""
+    options = {}
+    for token in name.split("+"):
+        if token.startswith("target="):
+            options["target_ms"] = float(token[len("target="):])
+        elif token in OPTIONS:
+            options.update(OPTIONS[token])
+        else:
+            raise ValueError(f"Unknown benchmark option {token!r}; choose from "
+                             f"{', '.join(OPTIONS)} or target=MS")
+    return options
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ----------------------------- Worker -----------------------------
+def bench_video(path, exercise, config, max_frames=None):
+    """Time one video under one config; runs in its own process."""
+    options = parse_config(config)
+    pose_options = {k: options[k] for k in ("model_complexity",) if k in options}
+    counter = registry.create(exercise)
+    if "target_ms" in options:
+        pose = LatencyController(options["target_ms"])
+    else:
+        lazy.prewarm(**pose_options)
+        pose = lazy.get_pose(**pose_options)
+
+    cap = open_capture(path)
+    frame_path = FramePath()
+    clock = CaptureClock(cap, live=False)
+    frames = [0]
+
+    def read():
+        if max_frames is not None and frames[0] >= max_frames:
+            return None
+        frame = frame_path.read(cap)
+        if frame is None:
+            return None
+        frames[0] += 1
+        return frame, clock()
+
+    profiler = Profiler()
+    started = time.perf_counter()
+    with pose:
+        summary = run_headless(read, frame_path.prepare, pose, counter, on_event=None,
+                               scheduler=AdaptiveScheduler() if options.get("adaptive") else None,
+                               roi=RoiTracker() if options.get("roi") else None,
+                               smoother=LandmarkSmoother() if options.get("smooth") else None,
+                               profiler=profiler)
+    wall = time.perf_counter() - started
+    cap.release()
+
+    report = profiler.report()
+    return {"video": path, "config": config, "exercise": exercise,
+            "frames": summary["frames"], "reps": summary["reps"],
+            "wall_s": round(wall, 3), "fps": round(summary["frames"] / wall, 2) if wall > 0 else 0.0,
+            "latency_ms": report["frame"], "peak_rss_mb": peak_rss_mb(),
+            "stages": report["stages"]}
+
+
+# ----------------------------- Driver -----------------------------
+@contextmanager
+def _isolated_runner():
+    """Yields run(fn, *args), which calls fn in a process of its own and returns its result."""
+    if sys.version_info >= (3, 11):
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+            yield lambda fn, *args: pool.submit(fn, *args).result()
+        return
+
+    def run(fn, *args):
+        # max_tasks_per_child needs 3.11: pay for a new executor per run instead
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            return pool.submit(fn, *args).result()
+    yield run
+
+
+def run_bench(roots, configs, repeat=1, max_frames=None):
+    """Benchmark every video under roots with every config; returns the results dict."""
+    for config in configs:
+        parse_config(config)
+    jobs = []
+    for root in roots:
+        for path, _, exercise in find_videos(root):
+            if exercise is not None:
+                jobs.append((path, exercise))
+
+    runs = []
+    # One worker, one task per process: sequential, isolated runs
+    with _isolated_runner() as run_isolated:
+        for path, exercise in jobs:
+            for config in configs:
+                attempts = []
+                for _ in range(repeat):
+                    try:
+                        attempts.append(run_isolated(bench_video, path, exercise, config, max_frames))
+                    except Exception as e:
+                        attempts = [{"video": path, "config": config, "exercise": exercise, "error": repr(e)}]
+                        break
+                # Report the median run by throughput
+                attempts.sort(key=lambda r: r.get("fps", 0))
+                run = attempts[len(attempts) // 2]
+                print(format_run(run), file=sys.stderr, flush=True)
+                runs.append(run)
+
+    return {"meta": environment(), "configs": list(configs), "repeat": repeat, "runs": runs}
+
+
+def environment():
+    meta = {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    for name, module in (("opencv", lazy.cv2), ("mediapipe", lazy.mediapipe)):
+        meta[name] = getattr(module(), "__version__", None)
+    return meta
+
+
+def format_run(run):
+    if "error" in run:
+        return f"{run['video']} [{run['config']}]: ERROR {run['error']}"
+    lat = run["latency_ms"]
+    return (f"{run['video']} [{run['config']}]: {run['fps']:.1f} fps, p50 {lat['p50_ms']:.1f} "
+            f"p95 {lat['p95_ms']:.1f} p99 {lat['p99_ms']:.1f} ms, {run['peak_rss_mb']} MB, "
+            f"{run['reps']} reps")
+
+
+# ----------------------------- Baseline comparison -----------------------------
+def video_key(path):
+    """The part of a video path below its last Data/ directory, e.g. 'test_data/row_data/row_1.webm'.
+
+    Recorded paths are absolute and differ between checkouts; paths outside
+    any Data/ directory are used as given.
+    """
+    parts = [p for p in re.split(r"[\\/]+", path) if p]
+    if "Data" not in parts[:-1]:
+        return path
+    below = len(parts) - parts[::-1].index("Data")
+    return "/".join(parts[below:])
+
+
+def _run_key(run):
+    return video_key(run["video"]), run["config"]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Match runs by (video below Data/, config); returns (rows, regressions) as lists of strings."""
+    base = {_run_key(r): r for r in baseline["runs"] if "error" not in r}
+    rows, regressions = [], []
+    for run in results["runs"]:
+        old = base.get(_run_key(run))
+        if old is None or "error" in run:
+            continue
+        name = f"{run['video']} [{run['config']}]"
+        checks = [("fps", run["fps"], old["fps"], -1),
+                  ("p95_ms", run["latency_ms"]["p95_ms"], old["latency_ms"]["p95_ms"], 1)]
+        if run.get("peak_rss_mb") and old.get("peak_rss_mb"):
+            checks.append(("peak_rss_mb", run["peak_rss_mb"], old["peak_rss_mb"], 1))
+        changes = []
+        for field, new, was, worse in checks:
+            change = (new - was) / was if was else 0.0
+            changes.append(f"{field} {was:g} -> {new:g} ({change:+.0%})")
+            if change * worse > tolerance:
+                regressions.append(f"{name}: {field} {was:g} -> {new:g} ({change:+.0%})")
+        if run["reps"] != old["reps"]:
+            regressions.append(f"{name}: reps {old['reps']} -> {run['reps']}")
+        rows.append(f"{name}: " + ", ".join(changes))
+    overall = _geomean_row(results, base)
+    if overall:
+        rows.append(overall)
+    return rows, regressions
+
+
+def _geomean_row(results, base):
+    ratios = [run["fps"] / base[_run_key(run)]["fps"] for run in results["runs"]
+              if "error" not in run and _run_key(run) in base
+              and base[_run_key(run)]["fps"] > 0 and run["fps"] > 0]
+    if not ratios:
+        return None
+    return f"overall: fps x{statistics.geometric_mean(ratios):.3f} (geometric mean of {len(ratios)} runs)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pose + counter pipeline over video files")
+    parser.add_argument("roots", nargs="*", default=list(DEFAULT_ROOTS), help="directories of videos")
+    parser.add_argument("--config", action="append", dest="configs",
+                        help="options to benchmark, e.g. default, lite, roi+adaptive, target=30 (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per video and config; the median is kept")
+    parser.add_argument("--max-frames", type=int, help="stop each video after this many frames")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative change in fps, p95 or RSS that counts as a regression")
+    args = parser.parse_args(argv)
+
+    configs = args.configs or ["default"]
+    try:
+        results = run_bench(args.roots, configs, repeat=max(args.repeat, 1), max_frames=args.max_frames)
+    except ValueError as e:
+        raise SystemExit(e.args[0])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        for row in rows:
+            print(row)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
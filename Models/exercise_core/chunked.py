@@ -0,0 +1,179 @@
+"""Chunked parallel processing of one long video.
+
+    python -m exercise_core.chunked class.mp4 --exercise squat --workers 8
+
+The video is cut into contiguous segments and each segment runs pose
+inference in its own process.  A segment starts decoding `overlap` frames
+early so MediaPipe's tracker has settled by the first frame it keeps.
+
+Segment bounds come from CAP_PROP_FRAME_COUNT, which is only approximate
+for some containers (row_1.webm reports 78 frames and has 66).  So the last
+segment has no end and reads until the decoder runs out, and segments that
+start past the real end are simply empty.
+
+Rep counters are then stitched without re-running them: each worker steps
+its segment once from every possible entry stage (none / high / low) and
+returns, per entry stage, the exit stage, reps added and stage timeline.
+The parent composes these tables in order, which gives exactly the result of
+a sequential run over the same landmarks.  Hold timers depend on a start
+timestamp rather than a finite stage, so they are replayed over the returned
+features instead (a few microseconds per frame).
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import pose as lazy
+from . import registry, traces
+from .angles import NUM_LANDMARKS, compute_features, landmarks_to_array
+from .frames import CaptureClock, FramePath
+from .registry import HIGH, LOW, NO_STAGE
+
+
+def video_info(path):
+    """(approximate frame count, fps) from the container header."""
+    cv2 = lazy.cv2()
+    cap = cv2.VideoCapture(path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+
+def plan_segments(frames, workers, min_frames=300):
+    """Split [0, frames) into at most `workers` contiguous (start, end) ranges."""
+    count = max(1, min(workers, frames // min_frames or 1))
+    bounds = np.linspace(0, frames, count + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+# ----------------------------- Worker -----------------------------
+def segment_transfer(spec, values, visibility, valid, first_frame, times=None):
+    """Step one segment from every entry stage.
+
+    Returns {entry_state: (exit_state, reps, [(frame, stage), ...], [rep_frame, ...])}.
+    """
+    table = {}
+    rows = np.flatnonzero(valid)
+    for entry in (NO_STAGE, HIGH, LOW):
+        counter = spec.build()
+        counter.state = entry
+        timeline, rep_frames = [], []
+        for i in rows:
+            state, reps = counter.state, counter.reps
+            counter.step(values[i], visibility[i], None if times is None else times[i])
+            if counter.state != state:
+                timeline.append((first_frame + int(i), counter.stage))
+            if counter.reps != reps:
+                rep_frames.append(first_frame + int(i))
+        table[entry] = (counter.state, counter.reps, timeline, rep_frames)
+    return table
+
+
+def process_segment(path, start, end, overlap, exercise, settings):
+    """Pose inference over frames [start, end) of one video; runs in a worker.
+
+    end=None reads to the end of the video.
+    """
+    cv2 = lazy.cv2()
+    cap = cv2.VideoCapture(path)
+    warm_start = max(0, start - overlap)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, warm_start)
+    clock = CaptureClock(cap, live=False, first_frame=warm_start)
+    # Same fit and mirror as traces.extract_trace, so the stitched trace matches a cached one
+    frame_path = FramePath(settings["size"], mirror=settings["mirror"])
+    pose = lazy.create_pose(**settings["pose"])
+
+    missing = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    landmarks, times = [], []
+    index = warm_start
+    try:
+        while end is None or index < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            t = clock()
+            _, rgb = frame_path.prepare(frame)
+            results = pose.process(rgb)
+            index += 1
+            if index <= start:
+                continue  # warm-up frame: only primes the tracker
+            times.append(t)
+            landmarks.append(landmarks_to_array(results.pose_landmarks.landmark)
+                             if results.pose_landmarks else missing)
+    finally:
+        cap.release()
+        pose.close()
+
+    landmarks = np.array(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4)
+    times = np.array(times, dtype=np.float64)
+    valid = ~np.isnan(landmarks[:, 0, 0])
+    values, visibility = compute_features(landmarks)
+    spec = registry.get_spec(exercise)
+    table = segment_transfer(spec, values, visibility, valid, start, times) if spec.kind == "reps" else None
+    return {"start": start, "end": start + len(landmarks), "landmarks": landmarks, "times": times, "transfer": table}
+
+
+# ----------------------------- Stitching -----------------------------
+def stitch(spec, segments):
+    """Compose per-segment transfer tables in order; returns a summary dict."""
+    state, reps, timeline, rep_frames = NO_STAGE, 0, [], []
+    for segment in segments:
+        state, added, seg_timeline, seg_reps = segment["transfer"][state]
+        reps += added
+        timeline.extend(seg_timeline)
+        rep_frames.extend(seg_reps)
+    labels = (None,) + tuple(spec.stages)
+    return {"exercise": spec.name, "reps": reps, "stage": labels[state],
+            "timeline": timeline, "rep_frames": rep_frames}
+
+
+def process_video(path, exercise, workers=None, overlap=30, **settings_kwargs):
+    """Process one video in parallel segments; returns (summary, Trace)."""
+    spec = registry.get_spec(exercise)
+    settings = traces.trace_settings(**settings_kwargs)
+    workers = workers or os.cpu_count() or 1
+    frames, fps = video_info(path)
+    segments = plan_segments(frames, workers) or [(0, 0)]
+    # The header count is approximate: the last segment reads until EOF
+    segments[-1] = (segments[-1][0], None)
+
+    with ProcessPoolExecutor(max_workers=len(segments)) as pool:
+        futures = [pool.submit(process_segment, path, start, end, overlap, spec.name, settings)
+                   for start, end in segments]
+        results = [f.result() for f in futures]
+
+    trace = traces.Trace(np.concatenate([r["landmarks"] for r in results]),
+                         np.concatenate([r["times"] for r in results]),
+                         {"video": os.path.abspath(path), "frames": sum(len(r["landmarks"]) for r in results),
+                          "fps": fps, "settings": settings})
+    if spec.kind == "reps":
+        summary = stitch(spec, results)
+    else:
+        summary = traces.replay(trace, spec.name)
+    summary.update({"frames": len(trace), "segments": [(r["start"], r["end"]) for r in results]})
+    return summary, trace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count reps in one long video using parallel segments")
+    parser.add_argument("video")
+    parser.add_argument("--exercise", required=True)
+    parser.add_argument("--workers", type=int, help="segments/processes (default: CPU count)")
+    parser.add_argument("--overlap", type=int, default=30, help="warm-up frames decoded before each segment")
+    parser.add_argument("--verify", action="store_true",
+                        help="also replay the stitched landmarks sequentially and compare")
+    args = parser.parse_args(argv)
+
+    summary, trace = process_video(args.video, args.exercise, workers=args.workers, overlap=args.overlap)
+    if args.verify:
+        sequential = traces.replay(trace, args.exercise)
+        summary["verified"] = sequential["reps"] == summary["reps"] and sequential["stage"] == summary["stage"]
+    print(json.dumps({k: v for k, v in summary.items() if k != "timeline"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Typed rep events and a non-blocking event bus.
+
+The hot loop never formats output itself.  EventEmitter compares a
+counter's stage / reps / hold time before and after each frame and builds
+an event object only when a subscriber wants that kind (EventBus.wants is
+a set lookup).  EventBus.publish puts the event on a bounded queue and
+returns at once; when the queue is full the event is dropped and counted
+rather than stalling inference.  A dispatcher thread hands events to the
+subscribers, so JSON encoding, console writes and logging all happen off
+the capture/inference path.
+
+Kinds: "rep", "stage", "exercise", "hold", "low_visibility" and "angle".
+Angle samples are debug telemetry, emitted at most every `angle_interval`
+seconds of capture time.
+"""
+import json
+import logging
+import queue
+import sys
+import threading
+
+log = logging.getLogger("exercise_core.events")
+
+REP, STAGE, EXERCISE, HOLD, LOW_VISIBILITY, ANGLE = \
+    "rep", "stage", "exercise", "hold", "low_visibility", "angle"
+
+
+# ----------------------------- Event types -----------------------------
+class Event:
+    kind = None
+    __slots__ = ("exercise", "frame", "t", "source")
+
+    def __init__(self, exercise, frame, t, source=None):
+        self.exercise = exercise
+        self.frame = frame
+        self.t = t
+        self.source = source
+
+    def as_dict(self):
+        out = {"event": self.kind}
+        for cls in reversed(type(self).__mro__[:-1]):
+            for name in cls.__slots__:
+                value = getattr(self, name)
+                if value is not None:
+                    out[name] = round(value, 3) if isinstance(value, float) else value
+        return out
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()})"
+
+
+class RepCompleted(Event):
+    kind = REP
+    __slots__ = ("reps", "analytics")
+
+    def __init__(self, exercise, frame, t, reps, analytics=None, source=None):
+        super().__init__(exercise, frame, t, source)
+        self.reps = reps
+        self.analytics = analytics
+
+
+class StageChanged(Event):
+    kind = STAGE
+    __slots__ = ("stage",)
+
+    def __init__(self, exercise, frame, t, stage, source=None):
+        super().__init__(exercise, frame, t, source)
+        self.stage = stage
+
+
+class ExerciseDetected(Event):
+    """AutoCounter recognised a (different) exercise."""
+
+    kind = EXERCISE
+    __slots__ = ()
+
+
+class HoldTick(Event):
+    kind = HOLD
+    __slots__ = ("seconds",)
+
+    def __init__(self, exercise, frame, t, seconds, source=None):
+        super().__init__(exercise, frame, t, source)
+        self.seconds = seconds
+
+
+class LowVisibility(Event):
+    """The counter's landmarks dropped below its visibility floor; it stops stepping."""
+
+    kind = LOW_VISIBILITY
+    __slots__ = ()
+
+
+class AngleSample(Event):
+    kind = ANGLE
+    __slots__ = ("value",)
+
+    def __init__(self, exercise, frame, t, value, source=None):
+        super().__init__(exercise, frame, t, source)
+        self.value = value
+
+
+# ----------------------------- Bus -----------------------------
+class EventBus:
+    """Bounded queue plus one dispatcher thread feeding pluggable subscribers."""
+
+    _STOP = object()
+
+    def __init__(self, maxsize=1024):
+        self._queue = queue.Queue(maxsize)
+        self._subscribers = []
+        self._kinds = set()
+        self._thread = None
+        self.dropped = 0
+
+    def subscribe(self, callback, kinds=None):
+        """Call callback(event) for the given kinds (all kinds if None)."""
+        kinds = None if kinds is None else frozenset(kinds)
+        self._subscribers.append((callback, kinds))
+        self._kinds.update(kinds if kinds is not None else (REP, STAGE, EXERCISE, HOLD, LOW_VISIBILITY, ANGLE))
+        return callback
+
+    def wants(self, kind):
+        return kind in self._kinds
+
+    def publish(self, event):
+        """Queue an event without blocking; returns False if it was dropped."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._dispatch, name="event-bus", daemon=True)
+        self._thread.start()
+
+    def _dispatch(self):
+        while True:
+            event = self._queue.get()
+            if event is self._STOP:
+                return
+            for callback, kinds in self._subscribers:
+                if kinds is None or event.kind in kinds:
+                    try:
+                        callback(event)
+                    except Exception:
+                        log.exception("event subscriber %r failed", callback)
+
+    def close(self, timeout=5.0):
+        """Deliver everything queued so far, then stop the dispatcher."""
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------- Emitter -----------------------------
+class EventEmitter:
+    """Turns one counter's per-frame state into events on a bus.
+
+    Call before() ahead of counter.step and after() once it has run.
+    """
+
+    def __init__(self, bus, counter, source=None, angle_interval=1.0):
+        self.bus = bus
+        self.counter = counter
+        self.source = source
+        self.angle_interval = angle_interval
+        self._last_angle_t = None
+        self._last_hold = 0
+        self._visible = True
+        self._snapshot = None
+
+    def before(self):
+        counter = self.counter
+        self._snapshot = (counter.spec, counter.stage, counter.reps)
+
+    def after(self, frame, t, value, record=None):
+        bus, counter = self.bus, self.counter
+        spec, stage, reps = self._snapshot
+        name = counter.spec.name
+        if counter.spec is not spec and bus.wants(EXERCISE):
+            bus.publish(ExerciseDetected(name, frame, t, self.source))
+        if counter.stage != stage and bus.wants(STAGE):
+            bus.publish(StageChanged(name, frame, t, counter.stage, self.source))
+        if counter.reps != reps and bus.wants(REP):
+            bus.publish(RepCompleted(name, frame, t, counter.reps, record, self.source))
+
+        visible = getattr(counter, "visible", True)
+        if not visible and self._visible and bus.wants(LOW_VISIBILITY):
+            bus.publish(LowVisibility(name, frame, t, self.source))
+        self._visible = visible
+
+        if counter.spec.kind == "hold" and value is not None:
+            if value != self._last_hold and value > 0 and bus.wants(HOLD):
+                bus.publish(HoldTick(name, frame, t, int(value), self.source))
+            self._last_hold = value
+
+        if value is not None and self.angle_interval is not None and bus.wants(ANGLE):
+            if self._last_angle_t is None or t - self._last_angle_t >= self.angle_interval:
+                self._last_angle_t = t
+                bus.publish(AngleSample(name, frame, t, float(value), self.source))
+
+
+# ----------------------------- Subscribers -----------------------------
+def json_lines(stream=None):
+    """Subscriber writing each event as one JSON line (stdout by default)."""
+    def write(event):
+        out = stream or sys.stdout
+        out.write(json.dumps(event.as_dict()) + "\n")
+        out.flush()
+    return write
+
+
+def console(event):
+    """The human-readable rep messages the counters used to print themselves."""
+    if event.kind == REP:
+        from .registry import EXERCISES
+        spec = EXERCISES.get(event.exercise)
+        print(f"{spec.title if spec else event.exercise} rep count: {event.reps}")
+    elif event.kind == LOW_VISIBILITY:
+        print(f"{event.exercise}: landmarks not visible enough to count")
+
+
+def log_events(logger=log):
+    """Subscriber sending events to `logging`; angle samples go to DEBUG."""
+    def write(event):
+        level = logging.DEBUG if event.kind == ANGLE else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s", event.as_dict())
+    return write
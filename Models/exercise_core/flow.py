@@ -0,0 +1,202 @@
+"""Streaming alignment of yoga flows (ordered pose sequences).
+
+A Flow is a cycle of steps, each a pose from exercise_core.yoga with the
+seconds it is meant to be held.  FlowMatcher aligns each user's live
+stream of feature vectors to it with an incremental, open-begin dynamic
+time warping.  Each step keeps one cumulative cost cell; per frame the
+cells are updated from the previous column only:
+
+    D[j] = d[j] + decay * min(D[j] (stay), D[j - 1] (advance))
+    D[0] = d[0] + min(decay * D[0], decay * D[M - 1] (next cycle), restart)
+
+d[j] is the pose-template error of step j (PoseLibrary.errors, capped),
+so steps cannot be skipped or reordered.  `decay` (1 - 1/memory) forgets
+old frames, so the costs stay bounded and memory is O(steps) per user no
+matter how long the session runs.  The cheapest cell is the step the user
+is in.  The state each path carries is gathered along with its cost:
+when the current step was entered, the seconds spent in each step of the
+cycle so far, and the step times and end of its last full cycle.  When the
+cheapest path has closed a cycle newer than the last one reported (it
+wrapped from the last step back to the first), a cycle record is emitted.
+DTW will always stretch a path over every step, so a cycle only counts
+if each of its steps had at least one frame that met the step's template.
+
+All users are updated together as (U, M) arrays, so tracking several
+people (people.MultiPersonCounter's tracks, or several streams) costs
+about the same as tracking one.
+"""
+import numpy as np
+
+from .yoga import POSES, PoseLibrary, base_name
+
+FLOWS = {}
+# Local cost of a frame that matches no step well; keeps one bad frame from dominating
+MAX_COST = 3.0
+
+
+class Flow:
+    """An ordered cycle of (pose, seconds) steps."""
+
+    def __init__(self, name, title, steps):
+        for pose, _ in steps:
+            if pose not in POSES:
+                raise KeyError(f"Unknown yoga pose {pose!r} in flow {name!r}")
+        self.name = name
+        self.title = title
+        self.poses = [pose for pose, _ in steps]
+        self.seconds = np.array([seconds for _, seconds in steps], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.poses)
+
+
+def register(flow):
+    FLOWS[flow.name] = flow
+    return flow
+
+
+def get_flow(name):
+    flow = FLOWS.get(name)
+    if flow is None:
+        raise KeyError(f"Unknown flow {name!r}; choose one of: {', '.join(FLOWS)}")
+    return flow
+
+
+class FlowMatcher:
+    """Incremental DTW of U users against one flow.
+
+    memory  -- frames of history that still weigh on the alignment (about
+               3 s at 30 fps); sets decay = 1 - 1/memory
+    restart -- cost of starting the flow afresh at step 0, in units of a
+               steady frame that just meets its template (error 1)
+    """
+
+    def __init__(self, flow, users=1, library=None, memory=90, restart=1.5):
+        self.flow = get_flow(flow) if isinstance(flow, str) else flow
+        self.library = library or PoseLibrary()
+        self.users = users
+        self.decay = 1.0 - 1.0 / memory
+        self.restart = restart / (1.0 - self.decay)
+        # Template rows of each step, padded by repeating so one gather + min covers mirrors
+        rows = [[k for k, name in enumerate(self.library.names) if base_name(name) == pose]
+                for pose in self.flow.poses]
+        width = max(len(r) for r in rows)
+        self._rows = np.array([np.resize(r, width) for r in rows])
+        m = len(self.flow)
+        self._steps = np.arange(m)
+        self._previous = (self._steps - 1) % m
+        self.cost = np.zeros((users, m))
+        self.local = np.zeros((users, m))
+        self.entered = np.zeros((users, m))
+        self.durations = np.zeros((users, m, m))
+        self.last_cycle = np.zeros((users, m, m))
+        self.cycle_end = np.zeros((users, m))
+        self.hits = np.zeros((users, m), dtype=np.int64)
+        self.skipped = np.zeros((users, m), dtype=bool)
+        self.completed = np.zeros(users, dtype=np.int64)
+        self._emitted = np.zeros(users)
+        self.reset()
+
+    def reset(self, user=None):
+        """Forget the alignment of one user (e.g. a retired track) or of everyone."""
+        rows = slice(None) if user is None else user
+        self.cost[rows] = np.inf
+        self.local[rows] = MAX_COST
+        self.entered[rows] = 0
+        self.durations[rows] = 0
+        self.last_cycle[rows] = 0
+        self.cycle_end[rows] = -np.inf
+        self.hits[rows] = 0
+        self.skipped[rows] = False
+        self.completed[rows] = 0
+        self._emitted[rows] = -np.inf
+
+    def step(self, values, visibility=None, t=0.0):
+        """Advance every user by one frame.
+
+        values / visibility -- (U, NUM_FEATURES), or (NUM_FEATURES,) when users == 1
+        t                   -- capture time in seconds (scalar or per user)
+        Returns [(user, cycle record)] for cycles completed on this frame.
+        """
+        values = np.asarray(values, dtype=np.float32).reshape(self.users, -1)
+        errors = self.library.scores(values, None if visibility is None
+                                     else np.asarray(visibility).reshape(self.users, -1))
+        local = np.minimum(errors[:, self._rows].min(axis=-1), MAX_COST)
+        t = np.broadcast_to(np.asarray(t, dtype=np.float64), (self.users,))[:, None]
+
+        decay, prev = self.decay, self._previous
+        stay = decay * self.cost
+        advance = decay * self.cost[:, prev]
+        moved = advance < stay
+        # Step 0 may also (re)start the flow from nothing
+        restart = self.restart < np.minimum(stay[:, 0], advance[:, 0])
+        best = np.minimum(stay, advance)
+        best[:, 0] = np.where(restart, self.restart, best[:, 0])
+        wrapped = moved[:, 0] & ~restart
+        moved[:, 0] |= restart
+
+        # Gather each path's state from the cell it came from
+        src = np.where(moved, prev, self._steps)
+        users = np.arange(self.users)[:, None]
+        step_time = t - self.entered[:, prev]
+        durations = self.durations[users, src]
+        durations[:, self._steps, prev] = np.where(moved, step_time, durations[:, self._steps, prev])
+        last_cycle = self.last_cycle[users, src]
+        cycle_end = self.cycle_end[users, src]
+        # A path that leaves a step it never matched has skipped it
+        skipped = self.skipped[users, src] | (moved & (self.hits[:, prev] == 0))
+        hits = np.where(moved, 0, self.hits) + (local <= 1.0)
+
+        # Wrapping into step 0 closes a cycle; either way step 0 starts a fresh one
+        closed = wrapped & ~skipped[:, 0]
+        last_cycle[closed, 0] = durations[closed, 0]
+        cycle_end[closed, 0] = t[closed, 0]
+        fresh = wrapped | restart
+        durations[fresh, 0] = 0
+        skipped[fresh, 0] = False
+
+        self.cost = local + best
+        self.local = local
+        self.entered = np.where(moved, t, self.entered)
+        self.durations, self.last_cycle, self.cycle_end = durations, last_cycle, cycle_end
+        self.hits, self.skipped = hits, skipped
+
+        done = []
+        current = self.cost.argmin(axis=1)
+        ended = self.cycle_end[users[:, 0], current]
+        for user in np.flatnonzero(ended > self._emitted):
+            self._emitted[user] = ended[user]
+            self.completed[user] += 1
+            done.append((int(user), self._record(user, current[user])))
+        return done
+
+    def _record(self, user, step):
+        steps = self.last_cycle[user, step]
+        flow = self.flow
+        total = float(steps.sum())
+        return {"flow": flow.name, "cycle": int(self.completed[user]), "duration_s": round(total, 2),
+                "tempo": round(total / flow.seconds.sum(), 2),
+                "steps": [{"pose": pose, "seconds": round(float(s), 2), "expected_s": float(e)}
+                          for pose, s, e in zip(flow.poses, steps, flow.seconds)]}
+
+    def state(self, user=0, t=None):
+        """Where one user is in the flow."""
+        step = int(self.cost[user].argmin())
+        pose = self.flow.poses[step]
+        state = {"flow": self.flow.name, "step": step, "pose": pose, "title": POSES[pose].title,
+                 "matching": bool(self.local[user, step] <= 1.0), "cycles": int(self.completed[user]),
+                 "expected_s": float(self.flow.seconds[step])}
+        if t is not None:
+            state["in_step_s"] = round(float(t - self.entered[user, step]), 2)
+        return state
+
+
+# ----------------------------- Flow table -----------------------------
+register(Flow("suryanamaskar", "Surya Namaskar", [
+    ("tadasana", 3), ("urdhvahastasana", 3), ("uttanasana", 3), ("phalakasana", 3),
+    ("bhujangasana", 3), ("adhomukhasvanasana", 5), ("uttanasana", 3), ("urdhvahastasana", 3),
+]))
+
+register(Flow("warrior", "Warrior Flow", [
+    ("virabhadrasana1", 5), ("virabhadrasana2", 5), ("trikonasana", 5), ("tadasana", 3),
+]))
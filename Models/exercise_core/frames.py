@@ -0,0 +1,144 @@
+"""Copy-free frame path and camera format negotiation.
+
+The camera is asked up front for the resolution, FPS and pixel format the
+counter actually uses, so frames normally arrive at output size.  Each frame
+then goes through preallocated buffers exactly once:
+
+    raw BGR --(resize only if needed)--> flip into display BGR --> RGB for inference
+
+Overlays are drawn on the display buffer at output resolution and nothing is
+converted back from RGB.  Buffers rotate through a small ring so a pipelined
+renderer can still hold the previous frame while the next one is prepared
+(Pipeline's blocking packet queue keeps at most three in flight).
+"""
+import time
+
+from . import pose as lazy
+
+DEFAULT_SIZE = (640, 480)
+
+
+def is_live(source):
+    return str(source).isdigit()
+
+
+def open_capture(source, size=DEFAULT_SIZE, fps=30, fourcc="MJPG"):
+    """Open a camera index or video path, negotiating format for live cameras."""
+    cv2 = lazy.cv2()
+    if not is_live(source):
+        return cv2.VideoCapture(source)
+
+    cap = cv2.VideoCapture(int(source))
+    if fourcc:
+        # MJPG lets most USB cameras deliver 640x480@30 without saturating the bus
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if size:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    # Keep the driver queue short so we always read a fresh frame
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def negotiated_format(cap):
+    """What the camera actually agreed to: (width, height, fps, fourcc)."""
+    cv2 = lazy.cv2()
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code else ""
+    return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            cap.get(cv2.CAP_PROP_FPS), fourcc)
+
+
+class CaptureClock:
+    """Timestamp in seconds for the frame that was just read.
+
+    Files use the decoder's CAP_PROP_POS_MSEC (falling back to frame index /
+    FPS), so timers measure video time however fast frames are processed.
+    Live cameras use time.monotonic().  A custom `clock` callable overrides both.
+    Pass `first_frame` when reading starts after a seek.
+    """
+
+    def __init__(self, cap, live, clock=None, first_frame=0):
+        cv2 = lazy.cv2()
+        self.cap = cap
+        self.frame_index = first_frame - 1
+        if clock is not None:
+            self._clock = clock
+        elif live:
+            self._clock = time.monotonic
+        else:
+            self._fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            self._prop = cv2.CAP_PROP_POS_MSEC
+            self._clock = self._video_time
+
+    def _video_time(self):
+        msec = self.cap.get(self._prop)
+        return msec / 1000.0 if msec > 0 or self.frame_index == 0 else self.frame_index / self._fps
+
+    def __call__(self):
+        self.frame_index += 1
+        return self._clock()
+
+
+class FramePath:
+    """Ring of preallocated raw / display / RGB buffers at output resolution.
+
+    size=None keeps every frame at its source resolution.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, mirror=True, ring=3, reuse_reads=True):
+        self.size = size
+        self.mirror = mirror
+        self.ring = ring
+        # A capture thread that runs ahead of inference must not reuse buffers
+        self.reuse_reads = reuse_reads
+        self._raw = [None] * ring
+        self._scaled = [None] * ring
+        self._display = [None] * ring
+        self._rgb = [None] * ring
+        self._read_slot = 0
+        self._slot = 0
+
+    def read(self, cap):
+        """cap.read() into a reused buffer; returns the frame or None at end of stream."""
+        slot = self._read_slot
+        self._read_slot = (slot + 1) % self.ring
+        ret, frame = cap.read(self._raw[slot]) if self.reuse_reads else cap.read()
+        if not ret:
+            return None
+        if self.reuse_reads:
+            self._raw[slot] = frame
+        return frame
+
+    def prepare(self, frame):
+        """Return (display_bgr, rgb) for one frame, both fitted inside the output size.
+
+        The aspect ratio is kept: stretching a 16:9 recording to 4:3 before
+        inference skews every joint angle.  `rgb` is marked read-only so
+        MediaPipe can use it without copying.
+        """
+        cv2 = lazy.cv2()
+        slot = self._slot
+        self._slot = (slot + 1) % self.ring
+
+        height, width = frame.shape[:2]
+        scale = min(self.size[0] / width, self.size[1] / height) if self.size else 1
+        if scale < 1:
+            # Only when the camera ignored the requested size (or for files)
+            fitted = (max(1, round(width * scale)), max(1, round(height * scale)))
+            self._scaled[slot] = cv2.resize(frame, fitted, dst=self._scaled[slot],
+                                            interpolation=cv2.INTER_AREA)
+            frame = self._scaled[slot]
+
+        if self.mirror:
+            self._display[slot] = cv2.flip(frame, 1, dst=self._display[slot])
+            display = self._display[slot]
+        else:
+            display = frame
+
+        self._rgb[slot] = cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=self._rgb[slot])
+        rgb = self._rgb[slot].view()
+        rgb.flags.writeable = False
+        return display, rgb
@@ -0,0 +1,79 @@
+"""Headless counting: rep and stage events without any GUI.
+
+No window is opened and nothing is drawn unless an AsyncVideoWriter is
+supplied, in which case overlays are drawn only on the frames it keeps.
+Throughput is bounded by decode and pose inference, not by display.
+"""
+import json
+
+from .events import EXERCISE, REP, STAGE, EventBus, EventEmitter
+from .profiler import NULL_PROFILER
+from .stepper import FrameStepper
+
+
+def print_event(event):
+    print(json.dumps(event))
+
+
+def run_headless(read, prepare, pose, counter, on_event=print_event, writer=None, draw=None, scheduler=None,
+                 roi=None, smoother=None, analytics=None, events=None, profiler=NULL_PROFILER):
+    """Count reps over a stream.
+
+    read()              -- next (frame, capture time in seconds) or None
+    prepare(frame)      -- returns (display_bgr, rgb), e.g. FramePath.prepare
+    on_event(dict)      -- called with {"event": "stage"|"rep"|"exercise", "frame": i, ...}
+                           when no `events` emitter is given
+    writer / draw       -- optional AsyncVideoWriter and draw(frame, results, value, stage, reps)
+    scheduler           -- optional AdaptiveScheduler to skip inference on still frames
+    roi                 -- optional RoiTracker to run inference on a cropped window
+    smoother            -- optional LandmarkSmoother applied before the counter
+    analytics           -- optional RepAnalytics; its record is attached to rep events
+    events              -- optional events.EventEmitter publishing to the caller's bus
+    profiler            -- optional profiler.Profiler timing each stage of the loop
+    Returns a summary dict.
+    """
+    bus = None
+    if events is None and on_event is not None:
+        bus = EventBus()
+        bus.subscribe(lambda event: on_event(event.as_dict()), kinds=(EXERCISE, STAGE, REP))
+        events = EventEmitter(bus, counter, angle_interval=None)
+
+    frame_index = 0
+    stepper = FrameStepper(pose, counter, scheduler, roi, smoother, analytics, events, profiler)
+    try:
+        while True:
+            with profiler.stage("read"):
+                item = read()
+            if item is None:
+                break
+            frame, t = item
+            with profiler.stage("prepare"):
+                display, rgb = prepare(frame)
+            results, value = stepper.step(rgb, t)
+
+            if writer is not None and writer.wants(frame_index):
+                with profiler.stage("draw"):
+                    if draw is not None:
+                        draw(display, results, value, counter.stage, counter.reps)
+                    writer.write(display)
+            frame_index += 1
+            profiler.frame_done()
+    finally:
+        if bus is not None:
+            bus.close()
+
+    summary = {"exercise": counter.spec.name, "frames": frame_index,
+               "reps": counter.reps, "stage": counter.stage}
+    if scheduler is not None:
+        summary["scheduler"] = scheduler.stats()
+    if hasattr(pose, "stats"):
+        summary["latency"] = pose.stats()
+    if analytics is not None:
+        summary["analytics"] = analytics.summary()
+    if roi is not None:
+        summary["roi"] = {"crop_runs": roi.crop_runs, "full_frame_runs": roi.full_frame_runs}
+    if profiler.enabled:
+        summary["profile"] = profiler.report()
+    if events is not None and events.bus.dropped:
+        summary["events_dropped"] = events.bus.dropped
+    return summary
@@ -0,0 +1,166 @@
+"""Latency-budget control for pose inference.
+
+LatencyController is a drop-in replacement for a Pose object (it has
+process() and close()) that holds a per-frame latency target.  It measures
+each inference with a monotonic clock and steps down a ladder of
+(model_complexity, input scale) levels when the smoothed latency exceeds the
+target, and back up once there is comfortable headroom.  Pose graphs are
+built lazily per complexity and kept, so switching back is cheap.
+
+Lighter models jitter more, so LandmarkSmoother applies a One Euro filter
+to the landmarks before they reach the counters.  It keeps its state across
+model switches, which stops threshold-hugging counters such as Crunch or
+ShoulderShrug from counting noise.
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from . import pose as lazy
+
+# Heaviest first: (model_complexity, input scale)
+DEFAULT_LEVELS = ((2, 1.0), (1, 1.0), (1, 0.75), (0, 1.0), (0, 0.75), (0, 0.5))
+
+
+class LatencyController:
+    def __init__(self, target_ms, levels=DEFAULT_LEVELS, start_level=1, alpha=0.1,
+                 patience=15, headroom=0.6, cooldown=90, **pose_options):
+        self.target = target_ms / 1000.0
+        self.levels = tuple(levels)
+        self.level = min(start_level, len(self.levels) - 1)
+        self.alpha = alpha          # EWMA weight of the newest sample
+        self.patience = patience    # frames over budget before stepping down
+        self.headroom = headroom    # step up when latency < headroom * target ...
+        self.cooldown = cooldown    # ... for this many frames
+        self.pose_options = pose_options
+        self.latency = None
+        self.switches = 0
+        self._over = 0
+        self._under = 0
+        self._poses = {}
+
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][0]
+
+    @property
+    def scale(self):
+        return self.levels[self.level][1]
+
+    def _pose(self, complexity):
+        pose = self._poses.get(complexity)
+        if pose is None:
+            pose = self._poses[complexity] = lazy.create_pose(model_complexity=complexity, **self.pose_options)
+        return pose
+
+    def process(self, rgb):
+        complexity, scale = self.levels[self.level]
+        pose = self._poses.get(complexity) or self._pose(complexity)
+        started = time.perf_counter()
+        if scale != 1.0:
+            cv2 = lazy.cv2()
+            height, width = rgb.shape[:2]
+            rgb = cv2.resize(rgb, (max(1, int(width * scale)), max(1, int(height * scale))),
+                             interpolation=cv2.INTER_AREA)
+        # Landmarks are normalized, so a scaled input needs no mapping back
+        results = pose.process(rgb)
+        self._record(time.perf_counter() - started)
+        return results
+
+    def _record(self, elapsed):
+        self.latency = elapsed if self.latency is None else self.latency + self.alpha * (elapsed - self.latency)
+        if self.latency > self.target:
+            self._over += 1
+            self._under = 0
+            if self._over >= self.patience and self.level < len(self.levels) - 1:
+                self._switch(self.level + 1)
+        elif self.latency < self.headroom * self.target:
+            self._under += 1
+            self._over = 0
+            if self._under >= self.cooldown and self.level > 0:
+                self._switch(self.level - 1)
+        else:
+            self._over = self._under = 0
+
+    def _switch(self, level):
+        complexity = self.levels[level][0]
+        try:
+            self._pose(complexity)
+        except OSError as exc:
+            # MediaPipe downloads the lite/heavy models on first use; offline,
+            # drop that complexity from the ladder and stay where we are
+            print(f"Pose model_complexity={complexity} unavailable ({exc}); skipping it", file=sys.stderr)
+            current = self.levels[self.level]
+            self.levels = tuple(lv for lv in self.levels if lv[0] != complexity)
+            self.level = self.levels.index(current)
+            self._over = self._under = 0
+            return
+        self.level = level
+        self.switches += 1
+        self._over = self._under = 0
+        # The new level's latency is unknown; re-measure from scratch
+        self.latency = None
+
+    def stats(self):
+        return {"level": self.level, "model_complexity": self.model_complexity, "scale": self.scale,
+                "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+                "switches": self.switches}
+
+    def close(self):
+        for pose in self._poses.values():
+            pose.close()
+        self._poses.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkSmoother:
+    """One Euro filter over (33, 4) landmark arrays; visibility is left as is.
+
+    min_cutoff sets smoothing when still (lower = smoother), beta how quickly
+    it opens up with speed (higher = less lag on fast reps).  The defaults
+    only remove frame-to-frame jitter: heavier smoothing lags enough to clip
+    the top of a rep (glute bridges stop counting at min_cutoff=1).
+    """
+
+    def __init__(self, min_cutoff=5.0, beta=20.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def apply(self, landmarks, t):
+        """Smooth x, y, z in place and return the array."""
+        xyz = landmarks[:, :3]
+        if self._x is None or t is None or self._t is None or t <= self._t:
+            self._x = xyz.copy()
+            self._dx = np.zeros_like(self._x)
+            self._t = t
+            return landmarks
+
+        dt = t - self._t
+        self._t = t
+        dx = (xyz - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self._x += alpha * (xyz - self._x)
+        xyz[:] = self._x
+        return landmarks
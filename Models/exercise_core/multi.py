@@ -0,0 +1,304 @@
+"""Every exercise counter at once, with automatic exercise detection.
+
+CounterBank stacks the compiled RepSpecs into one weight matrix, so a single
+matrix-vector product gives every metric of every exercise and the state
+machines advance as integer arrays.  Stepping all fifteen costs about three
+times one RepCounter step, not fifteen times (the synthetic microbench
+measures ~40-50 against ~15 us per frame): fixed NumPy call overhead
+dominates at this size.  Hold specs (plank) keep their scalar HoldTimer.
+
+ExerciseClassifier watches a sliding window of the bank.  An exercise is a
+candidate when it has completed a rep inside the window and the average
+torso tilt fits its spec.posture.  Among the candidates it prefers the most
+specific one: the widest threshold span.  A curl that swings the elbow
+through 50-160 degrees also passes a row's 70-120, but a row does not pass
+a curl.  Holds are chosen only when no rep exercise is active.
+AutoCounter wraps both behind the RepCounter interface
+(registry.create("auto")).  Its margin() is the detected exercise's once
+the classifier is settled, and the smallest of all while it is still
+detecting or switching, so --adaptive can skip frames in auto mode.
+"""
+import numpy as np
+
+from . import registry
+from .angles import FEATURE_INDEX, NUM_ANGLES, NUM_FEATURES, TORSO_TILT
+from .registry import HIGH, LOW, NO_STAGE
+
+
+class CounterBank:
+    """All rep counters stepped together over the shared feature vector."""
+
+    def __init__(self, specs=None):
+        specs = list(registry.EXERCISES.values()) if specs is None else list(specs)
+        self.specs = specs
+        self.names = [spec.name for spec in specs]
+        self.rep_index = np.array([i for i, s in enumerate(specs) if s.kind == "reps"], dtype=np.int64)
+        rep_specs = [specs[i] for i in self.rep_index]
+        self.holds = [(i, specs[i].build()) for i, s in enumerate(specs) if s.kind == "hold"]
+
+        # One row per metric of every rep spec; metric rows of spec k start at starts[k]
+        self._weights = np.concatenate([s.weights for s in rep_specs])
+        self._high = np.concatenate([s.high_signed for s in rep_specs])
+        self._low = np.concatenate([s.low_signed for s in rep_specs])
+        self._span = np.concatenate([s.span for s in rep_specs])
+        self._starts = np.cumsum([0] + [len(s.metrics) for s in rep_specs[:-1]])
+        self._ends = self._starts + [len(s.metrics) for s in rep_specs]
+        self._count_high = np.array([s.count_on == HIGH for s in rep_specs])
+        self._min_vis = np.array([-np.inf if s.min_visibility is None else s.min_visibility
+                                  for s in rep_specs], dtype=np.float32)
+        # Visibility features per spec, padded by repeating so one gather + min covers all
+        width = max(len(s.visibility_index) for s in rep_specs)
+        self._vis_index = np.array([np.resize(s.visibility_index, width) for s in rep_specs])
+        self._display = np.zeros((len(rep_specs), NUM_FEATURES), dtype=np.float32)
+        for k, s in enumerate(rep_specs):
+            self._display[k, s.display_index] = 1.0 / len(s.display_index)
+        self._labels = [(None,) + tuple(s.stages) for s in rep_specs]
+
+        # How much of its features' range each spec's thresholds cover
+        scale = np.where(np.arange(NUM_FEATURES) < NUM_ANGLES, 180.0, 1.0)
+        self.specificity = np.zeros(len(specs))
+        for k, s in zip(self.rep_index, rep_specs):
+            features = [[FEATURE_INDEX[f] for f in group] for group in s.metrics]
+            self.specificity[k] = sum(abs(span) / scale[f[0]] for span, f in zip(s.span, features))
+
+        self.state = np.zeros(len(rep_specs), dtype=np.int8)
+        self.rep_counts = np.zeros(len(rep_specs), dtype=np.int64)
+        # Whether each rep spec's landmarks were visible enough on the last frame
+        self._visible = np.ones(len(rep_specs), dtype=bool)
+        self.shown = np.zeros(len(specs), dtype=np.float32)
+        self._counted = np.zeros(len(specs), dtype=bool)
+
+    def reset(self):
+        self.state[:] = NO_STAGE
+        self.rep_counts[:] = 0
+        self._visible = np.ones(len(self.rep_index), dtype=bool)
+        for _, timer in self.holds:
+            timer.reset()
+
+    def step(self, values, visibility, t=None):
+        """Advance every machine on one frame; returns a bool array of specs that just counted a rep."""
+        metrics = self._weights @ values
+        above = np.logical_and.reduceat(metrics > self._high, self._starts)
+        below = np.logical_and.reduceat(metrics < self._low, self._starts)
+        visible = visibility[self._vis_index].min(axis=1) >= self._min_vis
+        self._visible = visible
+
+        state = self.state
+        to_high = visible & above & (state != HIGH)
+        to_low = visible & ~above & below & (state != LOW)
+        rep = (to_high & (state == LOW) & self._count_high) | (to_low & (state == HIGH) & ~self._count_high)
+        self.rep_counts += rep
+        state[to_high] = HIGH
+        state[to_low] = LOW
+
+        self.shown[self.rep_index] = self._display @ values
+        for i, timer in self.holds:
+            self.shown[i] = timer.step(values, visibility, t)[2]
+
+        counted = self._counted
+        counted[self.rep_index] = rep
+        return counted
+
+    def margins(self, values):
+        """RepCounter.margin for every rep spec at once."""
+        metrics = self._weights @ values
+        to_low = np.maximum.reduceat(np.maximum(metrics - self._low, 0) / self._span, self._starts)
+        to_high = np.maximum.reduceat(np.maximum(self._high - metrics, 0) / self._span, self._starts)
+        return np.where(self.state == HIGH, to_low,
+                        np.where(self.state == LOW, to_high, np.minimum(to_low, to_high)))
+
+    def margin(self, index, values):
+        """RepCounter.margin / HoldTimer.margin of one spec."""
+        position = self._position(index)
+        if position is None:
+            return dict(self.holds)[index].margin(values)
+        rows = slice(self._starts[position], self._ends[position])
+        metrics = self._weights[rows] @ values
+        to_low = (np.maximum(metrics - self._low[rows], 0) / self._span[rows]).max()
+        to_high = (np.maximum(self._high[rows] - metrics, 0) / self._span[rows]).max()
+        state = self.state[position]
+        if state == HIGH:
+            return float(to_low)
+        if state == LOW:
+            return float(to_high)
+        return float(min(to_low, to_high))
+
+    def _position(self, index):
+        """Row of spec `index` among the rep specs, or None for a hold."""
+        position = np.searchsorted(self.rep_index, index)
+        if position < len(self.rep_index) and self.rep_index[position] == index:
+            return position
+        return None
+
+    def reps(self, index):
+        position = self._position(index)
+        return 0 if position is None else int(self.rep_counts[position])
+
+    def stage(self, index):
+        position = self._position(index)
+        if position is not None:
+            return self._labels[position][self.state[position]]
+        timer = dict(self.holds)[index]
+        return timer.stage
+
+    def visible(self, index):
+        """RepCounter.visible / HoldTimer.visible of one spec on the last frame."""
+        position = self._position(index)
+        if position is not None:
+            return bool(self._visible[position])
+        return dict(self.holds)[index].visible
+
+    def counts(self):
+        return {name: self.reps(i) for i, name in enumerate(self.names)}
+
+
+class ExerciseClassifier:
+    """Pick the active exercise from a sliding window over the bank.
+
+    window   -- frames of history (about 5 s at 30 fps)
+    patience -- frames a new best candidate must persist before it takes over
+    """
+
+    def __init__(self, bank, window=150, patience=15):
+        self.bank = bank
+        self.window = window
+        self.patience = patience
+        n = len(bank.specs)
+        low = np.array([s.posture[0] if s.posture else 0 for s in bank.specs], dtype=np.float32)
+        high = np.array([s.posture[1] if s.posture else 90 for s in bank.specs], dtype=np.float32)
+        self._posture = (low, high)
+        self._hold_index = np.array([i for i, _ in bank.holds], dtype=np.int64)
+        self._hold_fits = np.zeros(n, dtype=bool)
+        # Ring buffers with running sums so every update is O(1) on frames without reps
+        self._reps = np.zeros((window, n), dtype=np.int8)
+        self._slot_has_reps = [False] * window
+        self._holding = np.zeros((window, len(bank.holds)), dtype=np.int8)
+        self._tilt = np.zeros(window, dtype=np.float64)
+        self._rep_sum = np.zeros(n, dtype=np.int64)
+        self._hold_sum = np.zeros(len(bank.holds), dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self._reps[:] = 0
+        self._slot_has_reps = [False] * self.window
+        self._holding[:] = 0
+        self._tilt[:] = 0
+        self._rep_sum[:] = 0
+        self._hold_sum[:] = 0
+        self._tilt_sum = 0.0
+        self._frames = 0
+        self.active = None
+        self._candidate = None
+        self._since = 0
+
+    def update(self, values, counted):
+        """Feed one frame (features and bank.step's result); returns the active spec index or None."""
+        slot = self._frames % self.window
+        self._frames += 1
+        changed = False
+        if self._slot_has_reps[slot]:
+            self._rep_sum -= self._reps[slot]
+            self._reps[slot] = 0
+            self._slot_has_reps[slot] = False
+            changed = True
+        if counted.any():
+            self._rep_sum += counted
+            self._reps[slot] = counted
+            self._slot_has_reps[slot] = True
+            changed = True
+        for j, (_, timer) in enumerate(self.bank.holds):
+            holding = timer.hold_start is not None
+            self._hold_sum[j] += holding - self._holding[slot, j]
+            self._holding[slot, j] = holding
+        tilt = float(values[TORSO_TILT])
+        self._tilt_sum += tilt - self._tilt[slot]
+        self._tilt[slot] = tilt
+
+        # Posture and holds drift slowly; only re-rank on a rep or every few frames
+        if not changed and self._frames % 5:
+            return self.active
+        best = self.best()
+        if best is None or best == self.active:
+            self._candidate = None
+        elif self.active is None:
+            self.active = best
+        elif best != self._candidate:
+            self._candidate, self._since = best, self._frames
+        elif self._frames - self._since >= self.patience:
+            self.active, self._candidate = best, None
+        return self.active
+
+    @property
+    def settled(self):
+        """An exercise is active and no other is about to take over."""
+        return self.active is not None and self._candidate is None
+
+    def best(self):
+        frames = min(self._frames, self.window)
+        tilt = self._tilt_sum / frames
+        fits = (tilt >= self._posture[0]) & (tilt <= self._posture[1])
+        reps = fits & (self._rep_sum > 0)
+        if reps.any():
+            return int(np.argmax(np.where(reps, self.bank.specificity, -1.0)))
+        holds = self._hold_fits
+        holds[:] = False
+        holds[self._hold_index] = self._hold_sum >= self.window // 2
+        holds &= fits
+        if holds.any():
+            return int(np.argmax(holds))
+        return None
+
+
+class AutoCounter:
+    """RepCounter-compatible counter that runs every exercise and reports the detected one."""
+
+    # Shown until an exercise has been recognised
+    pending = registry.RepSpec("auto", "Auto", "Detecting exercise", metrics=[("elbow_l",)],
+                               high=[180], low=[0])
+
+    def __init__(self, specs=None, window=150, patience=15):
+        self.bank = CounterBank(specs)
+        self.classifier = ExerciseClassifier(self.bank, window, patience)
+
+    @property
+    def spec(self):
+        active = self.classifier.active
+        return self.pending if active is None else self.bank.specs[active]
+
+    @property
+    def stage(self):
+        active = self.classifier.active
+        return None if active is None else self.bank.stage(active)
+
+    @property
+    def reps(self):
+        active = self.classifier.active
+        return 0 if active is None else self.bank.reps(active)
+
+    @property
+    def visible(self):
+        """The detected exercise's visibility check; True while still detecting."""
+        active = self.classifier.active
+        return True if active is None else self.bank.visible(active)
+
+    def reset(self):
+        self.bank.reset()
+        self.classifier.reset()
+
+    def step(self, values, visibility, t=None):
+        counted = self.bank.step(values, visibility, t)
+        active = self.classifier.update(values, counted)
+        shown = 0.0 if active is None else float(self.bank.shown[active])
+        return self.stage, self.reps, shown
+
+    def margin(self, values):
+        if self.classifier.settled:
+            return self.bank.margin(self.classifier.active, values)
+        # Still detecting: any exercise may be about to count, so stay awake near all thresholds
+        return float(self.bank.margins(values).min())
+
+    def overlay(self, value):
+        spec = self.spec
+        if spec is self.pending:
+            return spec.label
+        return f"{spec.label}: {spec.fmt.format(int(value) if spec.kind == 'hold' else value)}"
@@ -0,0 +1,261 @@
+"""Multi-camera counting with shared-memory frames and a pose worker pool.
+
+    python -m exercise_core.multicam 0 1 rtsp://cam3/stream squat=../Data/squat.mp4 --exercise pushup
+
+Each source gets a capture process that decodes, fits and mirrors frames and
+writes the RGB image straight into its own slots of one shared-memory ring,
+so only small (stream, slot, h, w, t) tuples cross process boundaries.
+A pool of inference workers (default: CPU count minus the captures, at least
+one) runs MediaPipe Pose on those slots and returns the 33x4 landmark
+array.  Streams are pinned to a worker, so MediaPipe's temporal tracking
+stays valid and frames of a stream are processed in order.  The parent keeps
+one exercise state machine per stream and emits JSON events tagged with the
+stream index.
+
+Live sources never wait: when all of a stream's slots are still in flight
+the newest frame is dropped.  Files block instead, so every frame is counted.
+
+A capture process that dies without sending its end-of-stream marker (a
+crashing decoder, say) is noticed by the parent, which queues the marker
+for it behind the frames it did send; its summary carries the exit code.
+"""
+import argparse
+import json
+import os
+import queue
+import time
+from multiprocessing import Process, Queue, shared_memory
+
+import numpy as np
+
+from . import pose as lazy
+from . import registry
+from .angles import compute_features, landmarks_to_array
+from .frames import CaptureClock, FramePath, is_live, open_capture
+
+DEFAULT_SLOTS = 4
+
+
+# ----------------------------- Shared ring -----------------------------
+class FrameRing:
+    """`streams` x `slots` RGB frames of at most size=(width, height) in one shared block."""
+
+    def __init__(self, streams, slots, size, name=None):
+        self.streams, self.slots, self.size = streams, slots, size
+        self.slot_bytes = size[0] * size[1] * 3
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=streams * slots * self.slot_bytes)
+        self.frames = np.ndarray((streams, slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def attach(self):
+        """Arguments that re-open this ring in another process."""
+        return self.streams, self.slots, self.size, self.name
+
+    def slot(self, stream, slot, height, width):
+        # Packed from the start of the slot so a narrower frame is still
+        # C-contiguous, which MediaPipe needs to read it without a copy
+        return self.frames[stream, slot, :height * width * 3].reshape(height, width, 3)
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ----------------------------- Processes -----------------------------
+def _capture(stream, source, ring_args, free, tasks, size, mirror):
+    ring = FrameRing(*ring_args)
+    live = is_live(source)
+    cap = open_capture(source, size)
+    clock = CaptureClock(cap, live)
+    path = FramePath(size, mirror, ring=1, reuse_reads=True)
+    dropped = 0
+    try:
+        while cap.isOpened():
+            frame = path.read(cap)
+            if frame is None:
+                break
+            t = clock()
+            try:
+                slot = free.get_nowait() if live else free.get()
+            except queue.Empty:
+                dropped += 1
+                continue
+            _, rgb = path.prepare(frame)
+            height, width = rgb.shape[:2]
+            ring.slot(stream, slot, height, width)[:] = rgb
+            tasks.put((stream, slot, height, width, t))
+    finally:
+        cap.release()
+        tasks.put((stream, None, dropped, clock.frame_index + 1, None))  # end of stream
+        ring.close()
+
+
+def _infer(ring_args, free, tasks, results, pose_options):
+    ring = FrameRing(*ring_args)
+    poses = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            stream, slot, height, width, t = task
+            if slot is None:
+                results.put((stream, None, {"dropped": height, "read": width}, None))
+                pose = poses.pop(stream, None)
+                if pose is not None:
+                    pose.close()
+                continue
+            # One Pose per stream: tracking state must not mix between cameras
+            pose = poses.get(stream)
+            if pose is None:
+                pose = poses[stream] = lazy.create_pose(**pose_options)
+            rgb = ring.slot(stream, slot, height, width)
+            rgb.flags.writeable = False
+            out = pose.process(rgb)
+            free[stream].put(slot)
+            if out.pose_landmarks:
+                # A fresh array per result: Queue.put pickles later, on a feeder thread
+                results.put((stream, slot, landmarks_to_array(out.pose_landmarks.landmark), t))
+            else:
+                results.put((stream, slot, None, t))
+    finally:
+        for pose in poses.values():
+            pose.close()
+        ring.close()
+
+
+# ----------------------------- Driver -----------------------------
+def parse_source(text, default_exercise):
+    """'squat=cam.mp4' -> ('cam.mp4', 'squat'); plain sources use the default exercise."""
+    name, sep, source = text.partition("=")
+    if sep and "/" not in name and ":" not in name:
+        return source, name
+    return text, default_exercise
+
+
+def run_multicam(sources, workers=None, size=(640, 480), slots=DEFAULT_SLOTS, mirror=True,
+                 on_event=None, pose_options=None):
+    """Count reps on every (source, exercise) pair; returns one summary per stream."""
+    counters = [registry.create(exercise) for _, exercise in sources]
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) - len(sources))
+    workers = max(1, min(workers, len(sources)))
+
+    ring = FrameRing(len(sources), slots, size)
+    free = [Queue() for _ in sources]
+    for q in free:
+        for slot in range(slots):
+            q.put(slot)
+    task_queues = [Queue() for _ in range(workers)]
+    results = Queue()
+
+    inferers = [Process(target=_infer, args=(ring.attach(), free, task_queues[w], results, pose_options or {}),
+                        daemon=True) for w in range(workers)]
+    captures = [Process(target=_capture, args=(i, source, ring.attach(), free[i], task_queues[i % workers],
+                                               size, mirror), daemon=True)
+                for i, (source, _) in enumerate(sources)]
+
+    frames = [0] * len(sources)
+    summaries = [None] * len(sources)
+    started = time.perf_counter()
+    try:
+        for p in inferers + captures:
+            p.start()
+        remaining = len(sources)
+        capturing = set(range(len(sources)))
+        next_check = time.monotonic() + 1.0
+        while remaining:
+            try:
+                stream, slot, landmarks, t = results.get(timeout=1.0)
+            except queue.Empty:
+                stream = None
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + 1.0
+                if not all(p.is_alive() for p in inferers):
+                    raise RuntimeError("a pose worker exited unexpectedly")
+                for i in [i for i in capturing if not captures[i].is_alive()]:
+                    # Its own end marker, if it sent one, is already queued ahead of this one
+                    capturing.discard(i)
+                    task_queues[i % workers].put((i, None, None, None, None))
+            if stream is None:
+                continue
+            counter = counters[stream]
+            if slot is None:
+                if summaries[stream] is not None:
+                    continue  # the marker queued for an exited capture, after its own
+                # End of stream; `landmarks` carries the capture counts
+                summaries[stream] = dict({"stream": stream, "source": sources[stream][0],
+                                          "exercise": counter.spec.name, "frames": frames[stream],
+                                          "reps": counter.reps, "stage": counter.stage}, **landmarks)
+                if landmarks["read"] is None:
+                    summaries[stream]["error"] = f"capture exited with code {captures[stream].exitcode}"
+                remaining -= 1
+                continue
+            frames[stream] += 1
+            if landmarks is None:
+                continue
+            prev_stage, prev_reps = counter.stage, counter.reps
+            values, visibility = compute_features(landmarks)
+            counter.step(values, visibility, t)
+            if on_event is not None:
+                if counter.stage != prev_stage:
+                    on_event({"event": "stage", "stream": stream, "t": round(t, 3), "stage": counter.stage})
+                if counter.reps != prev_reps:
+                    on_event({"event": "rep", "stream": stream, "t": round(t, 3), "reps": counter.reps})
+    finally:
+        for q in task_queues:
+            q.put(None)
+        for p in captures + inferers:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        ring.close()
+
+    wall = time.perf_counter() - started
+    for summary in summaries:
+        summary["fps"] = round(summary["frames"] / max(wall, 1e-9), 1)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count reps on several cameras or videos at once")
+    parser.add_argument("sources", nargs="+",
+                        help="camera index, file or URL; prefix with EXERCISE= to override --exercise")
+    parser.add_argument("--exercise", default="auto",
+                        help="exercise for sources without a prefix; 'auto' (default) detects it")
+    parser.add_argument("--workers", type=int, help="inference processes (default: spare CPU cores)")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="shared frame slots per stream")
+    parser.add_argument("--size", default="640x480", help="WIDTHxHEIGHT frames are fitted into")
+    parser.add_argument("--no-mirror", action="store_true", help="don't flip frames horizontally")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1, 2), help="MediaPipe pose model complexity")
+    args = parser.parse_args(argv)
+
+    sources = [parse_source(s, args.exercise) for s in args.sources]
+    for _, exercise in sources:
+        try:
+            # create(), not get_spec(), so 'auto' is accepted like everywhere else
+            registry.create(exercise)
+        except KeyError as e:
+            raise SystemExit(e.args[0])
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    pose_options = {}
+    if args.model_complexity is not None:
+        pose_options["model_complexity"] = args.model_complexity
+
+    def print_event(event):
+        print(json.dumps(event), flush=True)
+
+    for summary in run_multicam(sources, args.workers, (width, height), args.slots, not args.no_mirror,
+                                print_event, pose_options):
+        print_event(dict(summary, event="summary"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Multi-person counting from one inference pass per frame.
+
+A single PoseLandmarker call (pose.create_landmarker with num_poses=N) finds
+everyone in the frame.  Their landmarks land in one (P, 33, 4) array, so
+compute_features runs once for all people, and TrackAssigner gives each
+person a stable ID by matching torso centres between frames.  Every track
+owns its own RepCounter / HoldTimer, created on first sight and retired
+after the person has been gone for a while.  The per-person cost on top
+of the shared inference is a few hundred float ops.
+"""
+import numpy as np
+
+from . import pose as lazy
+from . import registry
+from .angles import LEFT_HIP, LEFT_SHOULDER, RIGHT_HIP, RIGHT_SHOULDER, compute_features
+from .events import EXERCISE, REP, STAGE, EventBus, EventEmitter
+from .headless import print_event
+
+_TORSO = [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP]
+
+
+class PeopleDetector:
+    """PoseLandmarker wrapper returning a reused (P, 33, 4) float32 array."""
+
+    def __init__(self, model_path, max_people=4, **options):
+        self.landmarker = lazy.create_landmarker(model_path, num_poses=max_people, **options)
+        self.max_people = max_people
+        self._buffer = np.zeros((max_people, 33, 4), dtype=np.float32)
+        self._last_ms = -1
+
+    def detect(self, rgb, t):
+        """Landmarks of everyone in an RGB frame captured at t seconds."""
+        mp = lazy.mediapipe()
+        # VIDEO mode rejects repeated or decreasing timestamps
+        ms = max(int(t * 1000), self._last_ms + 1)
+        self._last_ms = ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        result = self.landmarker.detect_for_video(image, ms)
+        buffer = self._buffer
+        for i, person in enumerate(result.pose_landmarks[:self.max_people]):
+            for j, lm in enumerate(person):
+                buffer[i, j] = (lm.x, lm.y, lm.z, lm.visibility)
+        return buffer[:len(result.pose_landmarks)]
+
+    def close(self):
+        self.landmarker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrackAssigner:
+    """Stable IDs for people across frames, by greedy nearest torso centre.
+
+    max_distance is in normalized image units; a track survives max_missed
+    frames without a match before its ID is retired.
+    """
+
+    def __init__(self, max_distance=0.15, max_missed=30):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.centres = np.zeros((0, 2), dtype=np.float32)
+        self.missed = np.zeros(0, dtype=np.int64)
+        self._next_id = 0
+
+    def reset(self):
+        self.ids = self.ids[:0]
+        self.centres = self.centres[:0]
+        self.missed = self.missed[:0]
+
+    def assign(self, landmarks):
+        """Track ID for each of the (P, 33, 4) detections; also retires lost tracks.
+
+        Returns (ids, retired) as arrays.
+        """
+        centres = landmarks[:, _TORSO, :2].mean(axis=1)
+        n_tracks, n_people = len(self.ids), len(centres)
+        assigned = np.full(n_people, -1, dtype=np.int64)
+        matched = np.zeros(n_tracks, dtype=bool)
+
+        if n_tracks and n_people:
+            distance = np.linalg.norm(self.centres[:, None, :] - centres[None, :, :], axis=-1)
+            for flat in np.argsort(distance, axis=None):
+                track, person = divmod(int(flat), n_people)
+                if distance[track, person] > self.max_distance:
+                    break
+                if matched[track] or assigned[person] >= 0:
+                    continue
+                matched[track] = True
+                assigned[person] = track
+
+        ids = np.empty(n_people, dtype=np.int64)
+        for person in range(n_people):
+            track = assigned[person]
+            if track >= 0:
+                ids[person] = self.ids[track]
+                self.centres[track] = centres[person]
+            else:
+                ids[person] = self._next_id
+                self._next_id += 1
+
+        self.missed[matched] = 0
+        self.missed[~matched] += 1
+        keep = self.missed <= self.max_missed
+        retired = self.ids[~keep]
+        new = assigned < 0
+        self.ids = np.concatenate([self.ids[keep], ids[new]])
+        self.centres = np.concatenate([self.centres[keep], centres[new]])
+        self.missed = np.concatenate([self.missed[keep], np.zeros(new.sum(), dtype=np.int64)])
+        return ids, retired
+
+
+class MultiPersonCounter:
+    """One counter per tracked person, all fed from a single feature pass."""
+
+    def __init__(self, exercise, tracker=None):
+        registry.create(exercise)   # fail fast on unknown names
+        self.exercise = exercise
+        self.tracker = tracker or TrackAssigner()
+        self.counters = {}          # live tracks
+        self.finished = {}          # tracks that left the frame, kept for the summary
+
+    def step(self, landmarks, t=None, before_step=None):
+        """Step every person in a (P, 33, 4) array; returns [(track_id, counter, shown value)].
+
+        before_step(track_id, counter) is called just before each counter steps.
+        """
+        ids, retired = self.tracker.assign(landmarks)
+        for track in retired.tolist():
+            if track in self.counters:
+                self.finished[track] = self.counters.pop(track)
+        if not len(ids):
+            return []
+        values, visibility = compute_features(landmarks)
+        stepped = []
+        for i, track in enumerate(ids.tolist()):
+            counter = self.counters.get(track)
+            if counter is None:
+                counter = self.counters[track] = registry.create(self.exercise)
+            if before_step is not None:
+                before_step(track, counter)
+            _, _, value = counter.step(values[i], visibility[i], t)
+            stepped.append((track, counter, value))
+        return stepped
+
+
+def run_people(read, prepare, detector, people, on_event=print_event, render=None, bus=None, angle_interval=None):
+    """Count reps for everyone in a stream.
+
+    read / prepare      -- as for headless.run_headless
+    detector            -- PeopleDetector
+    people              -- MultiPersonCounter
+    render(display, landmarks, stepped) -- optional; return False to stop
+    bus                 -- optional events.EventBus; each track gets an EventEmitter on it
+    angle_interval      -- as for EventEmitter (debug angle samples)
+    on_event(dict)      -- used through a private bus when no `bus` is given
+    Events carry the track ID as "source".  Returns a summary dict.
+    """
+    own_bus = None
+    if bus is None and on_event is not None:
+        bus = own_bus = EventBus()
+        bus.subscribe(lambda event: on_event(event.as_dict()), kinds=(EXERCISE, STAGE, REP))
+    emitters = {}
+
+    def before_step(track, counter):
+        emitter = emitters.get(track)
+        if emitter is None:
+            emitter = emitters[track] = EventEmitter(bus, counter, source=track, angle_interval=angle_interval)
+        emitter.before()
+
+    frame_index = 0
+    try:
+        while True:
+            item = read()
+            if item is None:
+                break
+            frame, t = item
+            display, rgb = prepare(frame)
+            landmarks = detector.detect(rgb, t)
+            stepped = people.step(landmarks, t, before_step if bus is not None else None)
+            if bus is not None:
+                for track, _, value in stepped:
+                    emitters[track].after(frame_index, t, value)
+                for track in [track for track in emitters if track not in people.counters]:
+                    del emitters[track]
+            frame_index += 1
+            if render is not None and render(display, landmarks, stepped) is False:
+                break
+    finally:
+        if own_bus is not None:
+            own_bus.close()
+
+    counters = dict(people.finished)
+    counters.update(people.counters)
+    return {"exercise": people.exercise, "frames": frame_index,
+            "people": {str(track): {"exercise": c.spec.name, "reps": c.reps, "stage": c.stage}
+                       for track, c in sorted(counters.items())}}
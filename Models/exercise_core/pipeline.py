@@ -0,0 +1,123 @@
+"""Pipelined capture / inference / render loop.
+
+Three stages connected by small bounded queues:
+
+    capture thread  --frames-->  inference thread  --packets-->  render (caller's thread)
+
+Decoding and display overlap with pose inference instead of running one
+after another.  For live sources the frame queue drops the oldest frame when
+full, so a slow inference stage skips stale frames rather than building
+latency; for files pass drop_stale=False to process every frame.  The packet
+queue always blocks, which bounds how many rendered frames are in flight so
+inference can write into a fixed ring of output buffers.
+"""
+import queue
+import threading
+
+_END = object()
+
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue whose put_latest() evicts the oldest item instead of blocking."""
+
+    def __init__(self, maxsize=1):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item):
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class Pipeline:
+    """Run read -> infer -> render as overlapping stages.
+
+    read()          -- returns the next frame, or None at end of stream
+    infer(frame)    -- returns a packet for the renderer (runs on a worker thread)
+    render(packet)  -- draws/displays; return False to stop (runs on the calling
+                       thread, since GUI toolkits expect imshow on the main thread)
+    """
+
+    def __init__(self, read, infer, render, depth=1, drop_stale=True):
+        self.read = read
+        self.infer = infer
+        self.render = render
+        self.drop_stale = drop_stale
+        self.frames = DropOldestQueue(depth)
+        self.packets = DropOldestQueue(depth)
+        self.stop_event = threading.Event()
+        self.errors = []
+
+    # ----------------------------- Stages -----------------------------
+    def _put(self, q, item, drop=False):
+        if drop and item is not _END:
+            q.put_latest(item)
+            return
+        # Blocking put; the end marker waits so the last real frame is not evicted
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, q):
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _END
+
+    def _capture(self):
+        try:
+            while not self.stop_event.is_set():
+                frame = self.read()
+                if frame is None:
+                    break
+                self._put(self.frames, frame, drop=self.drop_stale)
+        except Exception as e:
+            self.errors.append(e)
+        finally:
+            self._put(self.frames, _END)
+
+    def _inference(self):
+        try:
+            while True:
+                frame = self._get(self.frames)
+                if frame is _END:
+                    break
+                self._put(self.packets, self.infer(frame))
+        except Exception as e:
+            self.errors.append(e)
+            self.stop_event.set()
+        finally:
+            self._put(self.packets, _END)
+
+    # ----------------------------- Driver -----------------------------
+    def run(self):
+        """Block until the stream ends or render() returns False."""
+        workers = [threading.Thread(target=self._capture, name="capture", daemon=True),
+                   threading.Thread(target=self._inference, name="inference", daemon=True)]
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                packet = self._get(self.packets)
+                if packet is _END or self.render(packet) is False:
+                    break
+        finally:
+            self.stop_event.set()
+            for worker in workers:
+                worker.join(timeout=1.0)
+        if self.errors:
+            raise self.errors[0]
+        return {"dropped_frames": self.frames.dropped, "dropped_packets": self.packets.dropped}
@@ -0,0 +1,91 @@
+"""Lazy access to MediaPipe and OpenCV.
+
+Nothing heavy is imported until a pose model or video frame is actually
+needed, so code that only replays stored landmarks through the counters
+starts without paying for `import mediapipe` / `import cv2`.  Long-running
+processes can call `prewarm()` once at startup to build the pose graph and
+push a blank frame through it before the first real request arrives.
+"""
+import threading
+
+_modules = {}
+_warm = {}
+_lock = threading.Lock()
+
+DEFAULT_POSE_OPTIONS = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+
+
+# ----------------------------- Lazy modules -----------------------------
+def cv2():
+    """Return the cv2 module, importing it on first use."""
+    mod = _modules.get("cv2")
+    if mod is None:
+        import cv2 as mod
+        _modules["cv2"] = mod
+    return mod
+
+
+def mediapipe():
+    """Return the mediapipe module, importing it on first use."""
+    mod = _modules.get("mediapipe")
+    if mod is None:
+        import mediapipe as mod
+        _modules["mediapipe"] = mod
+    return mod
+
+
+def mp_pose():
+    return mediapipe().solutions.pose
+
+
+def mp_drawing():
+    return mediapipe().solutions.drawing_utils
+
+
+# ----------------------------- Pose models -----------------------------
+def create_pose(**options):
+    """Build a new mp.solutions.pose.Pose with the repo defaults."""
+    kwargs = dict(DEFAULT_POSE_OPTIONS)
+    kwargs.update(options)
+    return mp_pose().Pose(**kwargs)
+
+
+def prewarm(**options):
+    """Build a Pose graph and run one blank frame through it.
+
+    The warmed instance is cached per option set and handed out by the next
+    `get_pose()` call with the same options.
+    """
+    import numpy as np
+
+    key = tuple(sorted(options.items()))
+    with _lock:
+        if key not in _warm:
+            pose = create_pose(**options)
+            pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+            _warm[key] = pose
+    return _warm[key]
+
+
+def get_pose(**options):
+    """Return a pre-warmed Pose if one exists for these options, else a new one."""
+    key = tuple(sorted(options.items()))
+    with _lock:
+        pose = _warm.pop(key, None)
+    return pose if pose is not None else create_pose(**options)
+
+
+def create_landmarker(model_path, num_poses=4, **options):
+    """Build a MediaPipe Tasks PoseLandmarker that finds up to num_poses people per frame.
+
+    model_path is a pose_landmarker_{lite,full,heavy}.task bundle.  The
+    landmarker runs in VIDEO mode, so timestamps passed to it must increase.
+    """
+    mp = mediapipe()
+    vision = mp.tasks.vision
+    kwargs = {"min_pose_detection_confidence": DEFAULT_POSE_OPTIONS["min_detection_confidence"],
+              "min_tracking_confidence": DEFAULT_POSE_OPTIONS["min_tracking_confidence"]}
+    kwargs.update(options)
+    return vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+        running_mode=vision.RunningMode.VIDEO, num_poses=num_poses, **kwargs))
@@ -0,0 +1,176 @@
+"""Per-stage timing for the pose loop.
+
+    prof = create_profiler(enabled=args.profile, report_every=10)
+    with prof.stage("decode"):
+        frame = read()
+    ...
+    prof.frame_done()          # prints a report every `report_every` seconds
+    print(prof.format_report())
+
+Each stage records time.perf_counter() deltas into a LatencyHistogram of
+log-spaced buckets (20 per decade from 1 us to 100 s), so memory is fixed
+and percentiles are read back to within about 6%.  frame_done() also
+records the whole frame time (one call to the next) as the "frame" row.  A disabled profiler
+is NULL_PROFILER: stage() returns one shared object whose __enter__ and
+__exit__ do nothing, and frame_done() returns at once.  It can therefore
+stay wired into the loop in production.
+
+A stage object is reused across frames, so a given stage name must only be
+timed from one thread at a time (the pipelined loop times capture and
+inference stages under different names).
+"""
+import math
+import sys
+import time
+
+_MIN_S = 1e-6
+_PER_DECADE = 20
+_BUCKETS = 8 * _PER_DECADE + 1
+
+
+class LatencyHistogram:
+    """Fixed-size log histogram of durations in seconds."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        index = int(math.log10(seconds / _MIN_S) * _PER_DECADE) if seconds > _MIN_S else 0
+        self.counts[min(index, _BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """Approximate p-th percentile (0-100) in seconds: the geometric centre of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(_MIN_S * 10 ** ((index + 0.5) / _PER_DECADE), self.max)
+        return self.max
+
+    def as_dict(self):
+        ms = 1000.0
+        return {"count": self.count,
+                "mean_ms": round(self.total / self.count * ms, 3) if self.count else 0.0,
+                "p50_ms": round(self.percentile(50) * ms, 3),
+                "p95_ms": round(self.percentile(95) * ms, 3),
+                "p99_ms": round(self.percentile(99) * ms, 3),
+                "max_ms": round(self.max * ms, 3)}
+
+
+class _Stage:
+    __slots__ = ("histogram", "_start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self._start)
+        return False
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, report_every=None, out=None):
+        self.report_every = report_every
+        self.out = out
+        self.histograms = {}
+        self._stages = {}
+        self._frames = 0
+        self.frame = LatencyHistogram()
+        self._started = time.monotonic()
+        self._last_frame = time.perf_counter()
+        self._next_report = self._started + report_every if report_every else None
+
+    def stage(self, name):
+        """Context manager timing one stage; reused for every frame."""
+        stage = self._stages.get(name)
+        if stage is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+            stage = self._stages[name] = _Stage(histogram)
+        return stage
+
+    def record(self, name, seconds):
+        """Add a duration measured elsewhere."""
+        self.stage(name).histogram.record(seconds)
+
+    def frame_done(self):
+        self._frames += 1
+        now = time.perf_counter()
+        self.frame.record(now - self._last_frame)
+        self._last_frame = now
+        if self._next_report is not None:
+            now = time.monotonic()
+            if now >= self._next_report:
+                self._next_report = now + self.report_every
+                print(self.format_report(), file=self.out or sys.stderr)
+
+    def report(self):
+        elapsed = time.monotonic() - self._started
+        return {"frames": self._frames, "fps": round(self._frames / elapsed, 1) if elapsed > 0 else 0.0,
+                "frame": self.frame.as_dict(),
+                "stages": {name: h.as_dict() for name, h in self.histograms.items()}}
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"profile: {report['frames']} frames, {report['fps']} fps",
+                 f"  {'stage':<10} {'count':>7} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)"]
+        for name, s in [("frame", report["frame"])] + list(report["stages"].items()):
+            lines.append(f"  {name:<10} {s['count']:>7} {s['mean_ms']:>8.2f} {s['p50_ms']:>8.2f} "
+                         f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}")
+        return "\n".join(lines)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullProfiler:
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name):
+        return self._stage
+
+    def record(self, name, seconds):
+        pass
+
+    def frame_done(self):
+        pass
+
+    def report(self):
+        return {}
+
+    def format_report(self):
+        return ""
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def create_profiler(enabled=True, report_every=None, out=None):
+    """A Profiler, or NULL_PROFILER when disabled."""
+    return Profiler(report_every, out) if enabled else NULL_PROFILER
@@ -0,0 +1,333 @@
+"""Table-driven exercise counters.
+
+Each exercise is a declarative spec (features, thresholds, visibility floor,
+overlay label) registered under a normalized name.  A spec compiles into a
+small state machine that is looked up once per session and stepped once per
+frame with the (values, visibility) pair from angles.compute_features, so
+adding exercises never adds work to the hot loop.
+"""
+import time
+
+import numpy as np
+
+from .angles import FEATURE_INDEX, NUM_FEATURES, compute_features, landmarks_to_array
+
+# Stage codes used by the compiled machines
+NO_STAGE, HIGH, LOW = 0, 1, 2
+
+EXERCISES = {}
+_ALIASES = {}
+
+
+def normalize_name(name):
+    """'Glute Bridge', 'glute_bridge' and 'GluteBridge' all map to 'glutebridge'."""
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+# ----------------------------- Specs -----------------------------
+class RepSpec:
+    """Up/down hysteresis counter over one or more averaged features.
+
+    metrics  -- tuple of feature-name groups; each group is averaged into one metric
+    high/low -- per-metric thresholds; the HIGH stage is entered when every
+                metric is above `high`, the LOW stage when every metric is below `low`
+    signs    -- optional -1 per metric to flip a comparison (e.g. "hands above" = low y)
+    count_on -- "high" or "low": which stage entry completes a rep
+    posture  -- (min, max) torso_tilt in degrees the exercise is done in; used
+                by multi.ExerciseClassifier to tell apart specs on the same joint
+    """
+
+    kind = "reps"
+
+    def __init__(self, name, title, label, metrics, high, low, stages=("up", "down"),
+                 count_on="low", signs=None, min_visibility=None, display=None,
+                 fmt="{:.0f}", color=(0, 255, 255), aliases=(), posture=None):
+        self.name = name
+        self.title = title
+        self.label = label
+        self.metrics = tuple(tuple(group) for group in metrics)
+        self.signs = tuple(signs) if signs is not None else (1,) * len(self.metrics)
+        self.high = tuple(high)
+        self.low = tuple(low)
+        self.stages = stages
+        self.count_on = HIGH if count_on == "high" else LOW
+        self.min_visibility = min_visibility
+        self.display = tuple(display) if display is not None else self.metrics[0]
+        self.fmt = fmt
+        self.color = color
+        self.aliases = aliases
+        self.posture = posture
+
+        # Compiled form: metrics = weights @ values, thresholds already signed
+        self.weights = np.zeros((len(self.metrics), NUM_FEATURES), dtype=np.float32)
+        for row, (group, sign) in enumerate(zip(self.metrics, self.signs)):
+            for feature in group:
+                self.weights[row, FEATURE_INDEX[feature]] = sign / len(group)
+        self.high_signed = np.array([h * s for h, s in zip(self.high, self.signs)], dtype=np.float32)
+        self.low_signed = np.array([l * s for l, s in zip(self.low, self.signs)], dtype=np.float32)
+        self.span = self.high_signed - self.low_signed
+        self.display_index = np.array([FEATURE_INDEX[f] for f in self.display])
+        self.visibility_index = np.array(sorted({FEATURE_INDEX[f] for g in self.metrics for f in g}))
+
+    def build(self):
+        return RepCounter(self)
+
+
+class HoldSpec:
+    """Timer that runs while a feature stays above a threshold (e.g. plank)."""
+
+    kind = "hold"
+
+    def __init__(self, name, title, label, feature, threshold, span=20, min_visibility=None,
+                 fmt="{:d} sec", color=(0, 255, 255), aliases=(), posture=None):
+        self.name = name
+        self.title = title
+        self.label = label
+        self.feature = feature
+        self.threshold = threshold
+        self.span = span
+        self.min_visibility = min_visibility
+        self.fmt = fmt
+        self.color = color
+        self.aliases = aliases
+        self.posture = posture
+        self.index = FEATURE_INDEX[feature]
+
+    def build(self):
+        return HoldTimer(self)
+
+
+# ----------------------------- State machines -----------------------------
+class RepCounter:
+    """Compiled RepSpec; call step() once per frame.
+
+    Counters never print; events.EventEmitter reports their changes.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.state = NO_STAGE
+        self.reps = 0
+        self.visible = True         # False while below spec.min_visibility
+        self._weights = spec.weights
+        self._high = spec.high_signed
+        self._low = spec.low_signed
+        self._display = spec.display_index
+        self._vis = spec.visibility_index
+        self._min_vis = spec.min_visibility
+        self._labels = (None,) + tuple(spec.stages)
+
+    @property
+    def stage(self):
+        return self._labels[self.state]
+
+    @stage.setter
+    def stage(self, label):
+        # Labels from another exercise (or None) start without a stage
+        self.state = self._labels.index(label) if label in self._labels else NO_STAGE
+
+    def reset(self):
+        self.state = NO_STAGE
+        self.reps = 0
+
+    def step(self, values, visibility, t=None):
+        """Advance on one frame at capture time t; returns (stage, reps, display value)."""
+        shown = float(values[self._display].mean())
+        self.visible = self._min_vis is None or visibility[self._vis].min() >= self._min_vis
+        if not self.visible:
+            return self._labels[self.state], self.reps, shown
+
+        metrics = self._weights @ values
+        state = self.state
+        if (metrics > self._high).all():
+            if state != HIGH:
+                if state == LOW and self.spec.count_on == HIGH:
+                    self.reps += 1
+                self.state = HIGH
+        elif (metrics < self._low).all():
+            if state != LOW:
+                if state == HIGH and self.spec.count_on == LOW:
+                    self.reps += 1
+                self.state = LOW
+        return self._labels[self.state], self.reps, shown
+
+    def margin(self, values):
+        """How far the metrics are from the next stage change, in threshold spans.
+
+        0 means a transition can happen now; 1 means the full high-low gap away.
+        """
+        metrics = self._weights @ values
+        to_low = (np.maximum(metrics - self._low, 0) / self.spec.span).max()
+        to_high = (np.maximum(self._high - metrics, 0) / self.spec.span).max()
+        if self.state == HIGH:
+            return float(to_low)
+        if self.state == LOW:
+            return float(to_high)
+        return float(min(to_low, to_high))
+
+    def overlay(self, value):
+        return f"{self.spec.label}: {self.spec.fmt.format(value)}"
+
+
+class HoldTimer:
+    """Compiled HoldSpec; reps stays 0 and the display value is the hold in seconds.
+
+    Pass the frame's capture timestamp as `t` so recorded video can be
+    processed faster than realtime; without it the wall clock is used.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.reps = 0
+        self.hold_start = None
+        self.duration = 0
+        self.visible = True
+
+    @property
+    def stage(self):
+        return "holding" if self.hold_start is not None else None
+
+    def reset(self):
+        self.hold_start = None
+        self.duration = 0
+
+    def step(self, values, visibility, t=None):
+        spec = self.spec
+        self.visible = spec.min_visibility is None or visibility[spec.index] >= spec.min_visibility
+        if self.visible and values[spec.index] > spec.threshold:
+            now = time.monotonic() if t is None else t
+            if self.hold_start is None:
+                self.hold_start = now
+            self.duration = int(now - self.hold_start)
+        else:
+            self.hold_start = None
+            self.duration = 0
+        return self.stage, self.reps, self.duration
+
+    def margin(self, values):
+        """Distance from the hold threshold, in units of spec.span."""
+        return abs(float(values[self.spec.index]) - self.spec.threshold) / self.spec.span
+
+    def overlay(self, value):
+        return f"{self.spec.label}: {self.spec.fmt.format(value)}"
+
+
+# ----------------------------- Registry -----------------------------
+def register(spec):
+    EXERCISES[spec.name] = spec
+    for alias in (spec.name,) + tuple(spec.aliases):
+        _ALIASES[normalize_name(alias)] = spec.name
+    return spec
+
+
+def get_spec(name):
+    """Look up a spec by any spelling of its name or aliases; raises KeyError."""
+    key = _ALIASES.get(normalize_name(name))
+    if key is None:
+        raise KeyError(f"Unknown exercise {name!r}; choose one of: {', '.join(EXERCISES)}")
+    return EXERCISES[key]
+
+
+def create(name):
+    """Build a fresh state machine for one session; 'auto' detects the exercise."""
+    if normalize_name(name) == "auto":
+        from .multi import AutoCounter
+        return AutoCounter()
+    return get_spec(name).build()
+
+
+def make_counter(spec):
+    """Adapter with the old `f(landmarks, stage, rep_count)` signature.
+
+    `spec` is a registered name or a spec object.  Stage and count come from
+    the caller, but the adapter keeps one machine for its lifetime, so state
+    the old signature cannot carry (a HoldTimer's hold_start) survives between
+    calls: make one adapter per caller.
+    """
+    spec = get_spec(spec) if isinstance(spec, str) else spec
+    machine = spec.build()
+
+    def counter(landmarks, stage, rep_count):
+        if spec.kind == "reps":
+            machine.stage = stage
+        machine.reps = rep_count
+        return machine.step(*compute_features(landmarks_to_array(landmarks)))
+
+    counter.__name__ = spec.name
+    return counter
+
+
+# ----------------------------- Exercise table -----------------------------
+register(RepSpec("pushup", "Push-up", "Push-up Angle",
+                 metrics=[("elbow_l", "elbow_r")], high=[160], low=[90],
+                 stages=("up", "down"), count_on="low", aliases=("pushups", "push up"),
+                 posture=(55, 90)))
+
+register(RepSpec("squat", "Squat", "Squat Angle",
+                 # Frontal view: hip height (smaller y is higher in the image)
+                 metrics=[("hip_y",)], signs=[-1], high=[0.50], low=[0.55],
+                 stages=("up", "down"), count_on="low", display=("knee_l", "knee_r"),
+                 aliases=("squats",), posture=(0, 35)))
+
+register(RepSpec("squat_side", "Squat", "Squat Angle",
+                 metrics=[("knee_l", "knee_r")], high=[160], low=[90],
+                 stages=("up", "down"), count_on="low", posture=(0, 35)))
+
+register(RepSpec("deadlift", "Deadlift", "Deadlift Angle",
+                 metrics=[("knee_l", "knee_r"), ("trunk_l", "trunk_r")],
+                 high=[160, 160], low=[120, 110],
+                 stages=("up", "down"), count_on="high", min_visibility=0.5, posture=(0, 70)))
+
+register(RepSpec("glutebridge", "Glute Bridge", "Hip Angle",
+                 # Hip nearly straight when lying flat, bent when the bridge is up
+                 metrics=[("hip_l",)], high=[170], low=[130],
+                 stages=("down", "up"), count_on="high", min_visibility=0.6,
+                 color=(0, 255, 180), posture=(55, 90)))
+
+register(RepSpec("lyinglegraise", "Lying Leg Raise", "Lying Leg Raise Angle",
+                 metrics=[("trunk_l",)], high=[160], low=[100],
+                 stages=("down", "up"), count_on="low", min_visibility=0.6,
+                 aliases=("legraise",), posture=(55, 90)))
+
+register(RepSpec("chestpress", "Chest Press", "Chest Press Angle",
+                 metrics=[("elbow_r",)], high=[160], low=[90],
+                 stages=("up", "down"), count_on="high", min_visibility=0.6,
+                 aliases=("inclinechestpress",), posture=(25, 90)))
+
+register(RepSpec("bicepcurl", "Bicep Curl", "Bicep Curl Angle",
+                 metrics=[("elbow_r",)], high=[160], low=[50],
+                 stages=("down", "up"), count_on="low", min_visibility=0.6, posture=(0, 35)))
+
+register(RepSpec("row", "Row", "Row Angle",
+                 metrics=[("elbow_l",)], high=[120], low=[70],
+                 stages=("down", "up"), count_on="low", min_visibility=0.6,
+                 color=(255, 255, 0), aliases=("rows",), posture=(0, 80)))
+
+register(RepSpec("crunch", "Crunch", "Crunch Angle",
+                 # Angle between hip, shoulder and ear
+                 metrics=[("neck_l",)], high=[122], low=[110],
+                 stages=("down", "up"), count_on="low", min_visibility=0.6,
+                 aliases=("crunches",), posture=(55, 90)))
+
+register(RepSpec("shouldershrug", "Shoulder Shrug", "Shoulder Shrug Diff",
+                 # Shoulder y minus ear y shrinks as the shoulders rise
+                 metrics=[("shrug",)], high=[0.12], low=[0.05],
+                 stages=("down", "up"), count_on="low", fmt="{:.2f}", posture=(0, 35)))
+
+register(HoldSpec("plankhold", "Plank Hold", "Plank Hold Duration",
+                  feature="trunk_l", threshold=160, aliases=("plank",), posture=(55, 90)))
+
+register(RepSpec("lateralraise", "Lateral Raise", "Lateral Raise Angle",
+                 metrics=[("elbow_l",)], high=[80], low=[30],
+                 stages=("up", "down"), count_on="high", posture=(0, 35)))
+
+register(RepSpec("lunges", "Lunges", "Lunges Angle",
+                 metrics=[("knee_l",)], high=[160], low=[100],
+                 stages=("up", "down"), count_on="high", aliases=("lunge",), posture=(0, 35)))
+
+register(RepSpec("jumpingjacks", "Jumping Jack", "Jumping Jacks Foot Distance",
+                 # Open: feet apart and hands above 0.4; closed: feet together, hands below 0.6
+                 metrics=[("foot_spread",), ("hand_y",)], signs=[1, -1],
+                 high=[0.4, 0.4], low=[0.2, 0.6],
+                 stages=("open", "closed"), count_on="high", fmt="{:.2f}",
+                 aliases=("jumpingjack",), posture=(0, 35)))
@@ -0,0 +1,105 @@
+"""Person region-of-interest tracking for pose inference.
+
+Instead of handing MediaPipe the whole frame, RoiTracker crops a padded box
+around the landmarks from the previous frame, runs inference on the crop and
+maps the landmarks back to full-frame normalized coordinates.  The box is
+sticky: it is only recomputed when the person approaches its edge or
+becomes much smaller than it, which keeps MediaPipe's own frame-to-frame
+tracking stable.  When no pose is found in the crop the same frame is
+retried on the full image and tracking restarts from there.
+"""
+import numpy as np
+
+from .angles import landmarks_to_array
+
+
+class RoiTracker:
+    def __init__(self, padding=0.5, edge_margin=0.1, shrink_ratio=0.3, min_size=0.4, min_visibility=0.5):
+        self.padding = padding              # fraction of the person box added on each side
+        self.edge_margin = edge_margin      # re-centre when landmarks come this close to the crop edge
+        self.shrink_ratio = shrink_ratio    # re-fit when the person fills less than this of the crop
+        self.min_size = min_size            # minimum crop side, as a fraction of the frame
+        self.min_visibility = min_visibility
+        self.box = None                     # (x0, y0, x1, y1) normalized, or None for full frame
+        self.full_frame_runs = 0
+        self.crop_runs = 0
+        self._array = None
+
+    def reset(self):
+        self.box = None
+
+    # ----------------------------- Geometry -----------------------------
+    def _fit(self, points):
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        w, h = x1 - x0, y1 - y0
+        pad_x = max(w * self.padding, (self.min_size - w) / 2, 0)
+        pad_y = max(h * self.padding, (self.min_size - h) / 2, 0)
+        return (max(0.0, x0 - pad_x), max(0.0, y0 - pad_y), min(1.0, x1 + pad_x), min(1.0, y1 + pad_y))
+
+    def update(self, landmarks):
+        """Refresh the box from full-frame normalized (33, 4) landmarks.
+
+        Occluded landmarks still carry a position estimate, so all of them are
+        used for the box; fitting only visible ones shrinks it mid-rep.
+        """
+        if (landmarks[:, 3] >= self.min_visibility).sum() < 4:
+            self.box = None
+            return
+        points = np.clip(landmarks[:, :2], 0.0, 1.0)
+        if self.box is None:
+            self.box = self._fit(points)
+            return
+
+        x0, y0, x1, y1 = self.box
+        mx, my = (x1 - x0) * self.edge_margin, (y1 - y0) * self.edge_margin
+        px0, py0 = points.min(axis=0)
+        px1, py1 = points.max(axis=0)
+        near_edge = ((px0 < x0 + mx and x0 > 0) or (py0 < y0 + my and y0 > 0)
+                     or (px1 > x1 - mx and x1 < 1) or (py1 > y1 - my and y1 < 1))
+        too_loose = (px1 - px0) * (py1 - py0) < self.shrink_ratio * (x1 - x0) * (y1 - y0) * (1 + self.padding) ** -2
+        if near_edge or too_loose:
+            self.box = self._fit(points)
+
+    @staticmethod
+    def _pixels(box, width, height):
+        x0, y0, x1, y1 = box
+        return int(x0 * width), int(y0 * height), max(int(x0 * width) + 1, int(np.ceil(x1 * width))), \
+            max(int(y0 * height) + 1, int(np.ceil(y1 * height)))
+
+    @staticmethod
+    def map_to_full(landmark_list, pixel_box, width, height):
+        """Rewrite MediaPipe landmarks from crop-normalized to frame-normalized, in place."""
+        x0, y0, x1, y1 = pixel_box
+        sx, sy = (x1 - x0) / width, (y1 - y0) / height
+        ox, oy = x0 / width, y0 / height
+        for lm in landmark_list.landmark:
+            lm.x = lm.x * sx + ox
+            lm.y = lm.y * sy + oy
+            lm.z = lm.z * sx
+
+    # ----------------------------- Inference -----------------------------
+    def process(self, pose, rgb):
+        """pose.process on the tracked crop, falling back to the full frame."""
+        height, width = rgb.shape[:2]
+        if self.box is not None:
+            pixel_box = self._pixels(self.box, width, height)
+            x0, y0, x1, y1 = pixel_box
+            crop = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+            crop.flags.writeable = False
+            results = pose.process(crop)
+            self.crop_runs += 1
+            if results.pose_landmarks:
+                self.map_to_full(results.pose_landmarks, pixel_box, width, height)
+                self._array = landmarks_to_array(results.pose_landmarks.landmark, self._array)
+                self.update(self._array)
+                return results
+            # Lost the person: retry this frame on the full image
+            self.box = None
+
+        results = pose.process(rgb)
+        self.full_frame_runs += 1
+        if results.pose_landmarks:
+            self._array = landmarks_to_array(results.pose_landmarks.landmark, self._array)
+            self.update(self._array)
+        return results
@@ -0,0 +1,91 @@
+"""Adaptive pose-inference scheduling.
+
+Running pose.process on every frame of a 60 second plank or a still yoga
+hold mostly re-measures the same landmarks.  AdaptiveScheduler skips
+inference while the body is still and the counter is far from its next
+threshold, and fills skipped frames by extrapolating landmarks from the last
+two inferences.  The interval backs off exponentially up to `max_interval`
+and snaps back to every frame as soon as landmarks move quickly or the
+counter's margin (see RepCounter.margin) drops below `near_margin`.
+
+    scheduler = AdaptiveScheduler()
+    if scheduler.due():
+        ...run pose.process...
+        scheduler.observe(landmark_array, t, counter.margin(values))
+    else:
+        landmark_array = scheduler.predict(t)
+"""
+import numpy as np
+
+from .angles import NUM_LANDMARKS
+
+
+class AdaptiveScheduler:
+    def __init__(self, max_interval=6, still_speed=0.1, near_margin=0.3, min_visibility=0.5,
+                 max_extrapolate=0.5):
+        self.max_interval = max_interval
+        self.still_speed = still_speed          # normalized image units per second
+        self.near_margin = near_margin          # in counter threshold spans
+        self.min_visibility = min_visibility
+        self.max_extrapolate = max_extrapolate  # seconds
+        self.interval = 1
+        self.inferred = 0
+        self.skipped = 0
+        self._since = 0
+        self._last = None
+        self._last_t = None
+        self._velocity = np.zeros((NUM_LANDMARKS, 2), dtype=np.float32)
+        self._predicted = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+
+    def reset(self):
+        self.interval = 1
+        self._since = 0
+        self._last = None
+        self._last_t = None
+        self._velocity[:] = 0
+
+    def due(self):
+        """True if this frame should run pose inference."""
+        return self._last is None or self._since + 1 >= self.interval
+
+    def observe(self, landmarks, t, margin=None):
+        """Record a fresh inference result and choose the next interval."""
+        self.inferred += 1
+        self._since = 0
+        if self._last is not None and t is not None and self._last_t is not None and t > self._last_t:
+            dt = t - self._last_t
+            np.subtract(landmarks[:, :2], self._last[:, :2], out=self._velocity)
+            self._velocity /= dt
+            visible = landmarks[:, 3] >= self.min_visibility
+            speed = float(np.abs(self._velocity[visible]).max()) if visible.any() else 0.0
+        else:
+            speed = float("inf")
+
+        if speed > self.still_speed or (margin is not None and margin < self.near_margin):
+            self.interval = 1
+        else:
+            self.interval = min(self.max_interval, self.interval * 2)
+
+        if self._last is None:
+            self._last = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._last[:] = landmarks
+        self._last_t = t
+
+    def nearing(self, margin):
+        """Check a margin computed on predicted landmarks; infer next frame if close."""
+        if margin < self.near_margin:
+            self.interval = 1
+
+    def predict(self, t):
+        """Extrapolated landmarks for a skipped frame (linear, bounded horizon)."""
+        self.skipped += 1
+        self._since += 1
+        dt = 0.0 if t is None or self._last_t is None else min(t - self._last_t, self.max_extrapolate)
+        self._predicted[:] = self._last
+        self._predicted[:, :2] += self._velocity * dt
+        return self._predicted
+
+    def stats(self):
+        total = self.inferred + self.skipped
+        return {"inferred": self.inferred, "skipped": self.skipped,
+                "inference_rate": round(self.inferred / total, 3) if total else 1.0}
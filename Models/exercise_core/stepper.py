@@ -0,0 +1,75 @@
+"""Per-frame glue between pose inference and a counter.
+
+FrameStepper owns the reusable landmark buffer, runs pose.process (on a
+cropped window with a RoiTracker, or not at all on frames an
+AdaptiveScheduler skips) and steps the counter, so the live, pipelined and
+headless loops all share one code path.  An optional LandmarkSmoother
+filters landmarks before the counter sees them; optional RepAnalytics and
+events.EventEmitter observe the counter after every frame.
+"""
+from .angles import compute_features, landmarks_to_array
+from .profiler import NULL_PROFILER
+
+
+class FrameStepper:
+    def __init__(self, pose, counter, scheduler=None, roi=None, smoother=None, analytics=None, events=None,
+                 profiler=NULL_PROFILER):
+        self.pose = pose
+        self.counter = counter
+        self.scheduler = scheduler
+        self.roi = roi
+        self.smoother = smoother
+        self.analytics = analytics
+        self.events = events
+        self.profiler = profiler
+        self.landmarks = None       # (33, 4) array for the current frame, or None
+        self.results = None         # last MediaPipe results (reused on skipped frames)
+        self.inferred = False
+        self.frame = 0
+        self.record = None          # analytics record of the rep finished on this frame
+
+    def step(self, rgb, t):
+        """Process one RGB frame at capture time t; returns (results, display value or None)."""
+        events = self.events
+        if events is not None:
+            events.before()
+        value = self._process(rgb, t)
+        counter = self.counter
+        with self.profiler.stage("events"):
+            if self.analytics is not None:
+                self.record = self.analytics.update(counter.stage, counter.reps, value, t)
+            if events is not None:
+                events.after(self.frame, t, value, self.record)
+        self.frame += 1
+        return self.results, value
+
+    def _process(self, rgb, t):
+        counter = self.counter
+        scheduler = self.scheduler
+        profiler = self.profiler
+        self.inferred = scheduler is None or scheduler.due()
+
+        if self.inferred:
+            with profiler.stage("pose"):
+                self.results = self.roi.process(self.pose, rgb) if self.roi is not None else self.pose.process(rgb)
+            if not self.results.pose_landmarks:
+                if scheduler is not None:
+                    scheduler.reset()
+                if self.smoother is not None:
+                    self.smoother.reset()
+                return None
+            with profiler.stage("count"):
+                self.landmarks = landmarks_to_array(self.results.pose_landmarks.landmark, self.landmarks)
+                if self.smoother is not None:
+                    self.smoother.apply(self.landmarks, t)
+                values, visibility = compute_features(self.landmarks)
+                _, _, value = counter.step(values, visibility, t)
+                if scheduler is not None:
+                    scheduler.observe(self.landmarks, t, counter.margin(values))
+            return value
+
+        with profiler.stage("count"):
+            values, visibility = compute_features(scheduler.predict(t))
+            _, _, value = counter.step(values, visibility, t)
+            scheduler.nearing(counter.margin(values))
+        return value
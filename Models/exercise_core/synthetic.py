@@ -0,0 +1,250 @@
+"""Deterministic synthetic motion for exercising the counters without video.
+
+    python -m exercise_core.synthetic --frames 1000000
+    python -m exercise_core.synthetic --exercise pushup --noise 0.1 --dropout 0.01
+
+rep_trace(spec, reps) builds the feature stream a spec counts on directly:
+every metric swings as a cosine between its low and high thresholds (plus
+`overshoot` of the half span on each side), starting and ending at the high
+end, so a clean stream counts exactly `reps`.  landmark_trace(frames)
+builds a (T, 33, 4) skeleton whose elbows and knees flex in the same way,
+for timing compute_features.  Both are seeded, so a given set of
+parameters always yields the same stream, and both have the
+traces.Trace interface (len, .times, .features()), so traces.replay runs on
+them unchanged.
+
+Stress knobs, all deterministic under `seed`:
+
+    tempo            seconds per rep
+    noise            Gaussian jitter, as a fraction of the threshold span
+    dropout          chance per frame that a burst of missed detections starts
+    visibility_loss  chance per frame that a burst of low visibility starts
+    burst            frames per dropout / visibility burst
+
+The CLI times each counter's step() in ns/frame, plus AutoCounter and
+compute_features, and checks that clean streams count what was planned.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from . import registry
+from .angles import (FEATURE_INDEX, LEFT_ANKLE, LEFT_ELBOW, LEFT_HIP, LEFT_KNEE, LEFT_SHOULDER, LEFT_WRIST,
+                     NUM_FEATURES, NUM_LANDMARKS, RIGHT_ANKLE, RIGHT_ELBOW, RIGHT_HIP, RIGHT_KNEE,
+                     RIGHT_SHOULDER, RIGHT_WRIST, TORSO_TILT, compute_features)
+from .traces import Trace, replay
+
+# Feature values used for anything a spec does not move
+NEUTRAL_ANGLE = 170.0
+NEUTRAL = {"hip_y": 0.5, "shrug": 0.1, "foot_spread": 0.1, "hand_y": 0.5}
+VISIBLE = 0.95
+LOW_VISIBILITY = 0.1
+
+# Standing, facing the camera, arms and legs straight: (x, y) per landmark
+_SKELETON = {
+    0: (0.50, 0.15), 1: (0.49, 0.14), 2: (0.48, 0.14), 3: (0.47, 0.14), 4: (0.51, 0.14),
+    5: (0.52, 0.14), 6: (0.53, 0.14), 7: (0.46, 0.15), 8: (0.54, 0.15), 9: (0.49, 0.18),
+    10: (0.51, 0.18), 11: (0.42, 0.25), 12: (0.58, 0.25), 13: (0.40, 0.38), 14: (0.60, 0.38),
+    15: (0.39, 0.50), 16: (0.61, 0.50), 17: (0.39, 0.52), 18: (0.61, 0.52), 19: (0.39, 0.53),
+    20: (0.61, 0.53), 21: (0.40, 0.52), 22: (0.60, 0.52), 23: (0.45, 0.55), 24: (0.55, 0.55),
+    25: (0.45, 0.72), 26: (0.55, 0.72), 27: (0.45, 0.89), 28: (0.55, 0.89), 29: (0.44, 0.91),
+    30: (0.56, 0.91), 31: (0.46, 0.93), 32: (0.54, 0.93),
+}
+# (parent, hinge, distal landmark, direction the limb folds: +1 counter-clockwise)
+_HINGES = ((LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST, 1), (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST, -1),
+           (LEFT_HIP, LEFT_KNEE, LEFT_ANKLE, -1), (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE, 1))
+
+
+class FeatureTrace:
+    """Synthetic per-frame features with the traces.Trace interface."""
+
+    def __init__(self, values, visibility, valid, times, planned_reps):
+        self.values = values
+        self.visibility = visibility
+        self.valid = valid
+        self.times = times
+        self.planned_reps = planned_reps
+
+    def __len__(self):
+        return len(self.values)
+
+    def features(self):
+        return self.values, self.visibility, self.valid
+
+
+# ----------------------------- Generators -----------------------------
+def _bursts(rng, frames, rate, burst):
+    """Boolean mask of frames covered by bursts starting with probability `rate` per frame."""
+    mask = np.zeros(frames, dtype=bool)
+    if rate <= 0:
+        return mask
+    for start in np.flatnonzero(rng.random(frames) < rate):
+        mask[start:start + burst] = True
+    return mask
+
+
+def _phase(frames, tempo, fps):
+    times = np.arange(frames, dtype=np.float64) / fps
+    return times, np.cos(2 * math.pi * times / tempo)
+
+
+def rep_trace(spec, reps=10, tempo=2.0, fps=30.0, noise=0.0, dropout=0.0, visibility_loss=0.0,
+              burst=10, overshoot=0.25, seed=0):
+    """Features for `reps` clean repetitions of a spec (a name or RepSpec / HoldSpec)."""
+    if isinstance(spec, str):
+        spec = registry.get_spec(spec)
+    rng = np.random.default_rng(seed)
+    frames = int(round(reps * tempo * fps)) + 1
+    times, wave = _phase(frames, tempo, fps)
+
+    values = np.full((frames, NUM_FEATURES), NEUTRAL_ANGLE, dtype=np.float32)
+    for name, value in NEUTRAL.items():
+        values[:, FEATURE_INDEX[name]] = value
+    low, high = spec.posture or (0, 90)
+    values[:, TORSO_TILT] = (low + high) / 2
+
+    if spec.kind == "reps":
+        for group, sign, hi, lo in zip(spec.metrics, spec.signs, spec.high_signed, spec.low_signed):
+            half = (hi - lo) / 2
+            metric = (hi + lo) / 2 + half * (1 + overshoot) * wave
+            for feature in group:
+                column = metric * sign
+                if noise:
+                    column = column + rng.normal(0.0, noise * (hi - lo), frames)
+                values[:, FEATURE_INDEX[feature]] = column
+        planned = reps
+    else:
+        column = spec.threshold + spec.span * (1 + overshoot) * wave
+        if noise:
+            column = column + rng.normal(0.0, noise * spec.span, frames)
+        values[:, spec.index] = column
+        planned = 0
+
+    visibility = np.full((frames, NUM_FEATURES), VISIBLE, dtype=np.float32)
+    visibility[_bursts(rng, frames, visibility_loss, burst)] = LOW_VISIBILITY
+    valid = ~_bursts(rng, frames, dropout, burst)
+    return FeatureTrace(values, visibility, valid, times, planned)
+
+
+def landmark_trace(frames, tempo=2.0, fps=30.0, noise=0.0, dropout=0.0, visibility_loss=0.0,
+                   burst=10, flex=(40.0, 175.0), seed=0):
+    """A (T, 33, 4) skeleton whose elbows and knees swing through `flex` degrees; a traces.Trace."""
+    rng = np.random.default_rng(seed)
+    times, wave = _phase(frames, tempo, fps)
+    landmarks = np.empty((frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    for index, (x, y) in _SKELETON.items():
+        landmarks[:, index] = (x, y, 0.0, VISIBLE)
+
+    # Interior angle at the hinge: flex[1] straight at wave=1, flex[0] folded at wave=-1
+    angle = np.radians((flex[0] + flex[1]) / 2 + (flex[1] - flex[0]) / 2 * wave)
+    for parent, joint, distal, side in _HINGES:
+        upper = landmarks[0, joint, :2] - landmarks[0, parent, :2]
+        length = float(np.hypot(*(landmarks[0, distal, :2] - landmarks[0, joint, :2])))
+        # Turn the lower limb away from the line of the upper one by (180 - angle)
+        heading = math.atan2(upper[1], upper[0])
+        bend = heading + side * (math.pi - angle)
+        landmarks[:, distal, 0] = landmarks[:, joint, 0] + length * np.cos(bend)
+        landmarks[:, distal, 1] = landmarks[:, joint, 1] + length * np.sin(bend)
+
+    if noise:
+        landmarks[..., :2] += rng.normal(0.0, noise * 0.01, (frames, NUM_LANDMARKS, 2))
+    landmarks[_bursts(rng, frames, visibility_loss, burst), :, 3] = LOW_VISIBILITY
+    landmarks[_bursts(rng, frames, dropout, burst)] = np.nan
+    return Trace(landmarks, times, {"synthetic": True, "frames": frames, "tempo": tempo, "fps": fps})
+
+
+# ----------------------------- Microbenchmarks -----------------------------
+def time_counter(counter, trace):
+    """Step a counter over every valid frame; returns ns per stepped frame."""
+    values, visibility, valid = trace.features()
+    times = trace.times
+    step = counter.step
+    indices = np.flatnonzero(valid).tolist()
+    started = time.perf_counter_ns()
+    for i in indices:
+        step(values[i], visibility[i], times[i])
+    elapsed = time.perf_counter_ns() - started
+    return elapsed / max(len(indices), 1)
+
+
+def time_features(trace, batch=True):
+    """ns per frame for compute_features, batched over the trace or one frame at a time."""
+    landmarks = trace.landmarks
+    started = time.perf_counter_ns()
+    if batch:
+        compute_features(landmarks)
+    else:
+        for frame in landmarks:
+            compute_features(frame)
+    return (time.perf_counter_ns() - started) / max(len(landmarks), 1)
+
+
+def run_microbench(exercises=None, frames=200000, **stream_options):
+    """Yield one result dict per benchmark."""
+    tempo = stream_options.get("tempo", 2.0)
+    fps = stream_options.get("fps", 30.0)
+    reps = max(1, int(frames / (tempo * fps)))
+    for name in exercises or list(registry.EXERCISES):
+        spec = registry.get_spec(name)
+        trace = rep_trace(spec, reps, **stream_options)
+        counter = registry.create(name)
+        ns = time_counter(counter, trace)
+        yield {"bench": spec.name, "frames": len(trace), "ns_per_frame": round(ns, 1),
+               "reps": counter.reps, "planned": trace.planned_reps}
+
+        if name == "pushup":
+            auto = registry.create("auto")
+            ns = time_counter(auto, trace)
+            yield {"bench": "auto (all counters)", "frames": len(trace), "ns_per_frame": round(ns, 1),
+                   "reps": auto.reps, "planned": trace.planned_reps}
+
+    lm_options = {k: v for k, v in stream_options.items() if k not in ("overshoot",)}
+    landmarks = landmark_trace(frames, **lm_options)
+    yield {"bench": "compute_features (batched)", "frames": frames,
+           "ns_per_frame": round(time_features(landmarks, batch=True), 1)}
+    single = landmark_trace(min(frames, 50000), **lm_options)
+    yield {"bench": "compute_features (per frame)", "frames": len(single),
+           "ns_per_frame": round(time_features(single, batch=False), 1)}
+    # The curl counts at each folded trough, half a period into every rep
+    summary = replay(landmarks, "bicepcurl")
+    yield {"bench": "landmarks -> bicepcurl replay", "frames": frames, "reps": summary["reps"],
+           "planned": int((frames - 1) / (tempo * fps) + 0.5)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the counters on synthetic landmark streams")
+    parser.add_argument("--exercise", action="append", help="counter to time (repeatable); default: all")
+    parser.add_argument("--frames", type=int, default=200000, help="frames per stream")
+    parser.add_argument("--tempo", type=float, default=2.0, help="seconds per rep")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--noise", type=float, default=0.0, help="jitter as a fraction of the threshold span")
+    parser.add_argument("--dropout", type=float, default=0.0, help="per-frame chance a missed-detection burst starts")
+    parser.add_argument("--visibility-loss", type=float, default=0.0,
+                        help="per-frame chance a low-visibility burst starts")
+    parser.add_argument("--burst", type=int, default=10, help="frames per dropout / visibility burst")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    options = {"tempo": args.tempo, "fps": args.fps, "noise": args.noise, "dropout": args.dropout,
+               "visibility_loss": args.visibility_loss, "burst": args.burst, "seed": args.seed}
+    clean = not (args.noise or args.dropout or args.visibility_loss)
+    try:
+        for names in args.exercise or ():
+            registry.get_spec(names)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+    for result in run_microbench(args.exercise, args.frames, **options):
+        line = f"{result['bench']:<30} {result['frames']:>9} frames"
+        if "ns_per_frame" in result:
+            line += f" {result['ns_per_frame']:>10.1f} ns/frame"
+        if "planned" in result:
+            line += f"   reps {result['reps']}/{result['planned']}"
+            if clean and result["reps"] != result["planned"]:
+                line += "  MISMATCH"
+        print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Memory-mapped landmark trace cache.
+
+Pose inference dominates the cost of re-checking rep counts on the videos in
+Data/.  A trace stores its output once per video:
+
+    <key>.landmarks.npy   float32 (frames, 33, 4), NaN where no pose was found
+    <key>.times.npy       float64 (frames,) capture timestamps in seconds
+    <key>.json            video path, settings and frame count
+
+The key hashes the video content together with the inference settings, so a
+changed video or different pose options simply miss the cache.  Arrays are
+memory-mapped on load and replayed through any counter in the registry far
+faster than realtime.
+
+    python -m exercise_core.traces Data/pushup_data/pushup_1.mp4 --exercise pushup
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from . import pose as lazy
+from . import registry
+from .angles import NUM_LANDMARKS, compute_features, landmarks_to_array
+from .frames import CaptureClock, FramePath
+
+# 2: timestamps fall back to frame index / FPS where the backend reports none
+# 3: frames are fitted inside `size` with FramePath instead of stretched to it
+TRACE_VERSION = 3
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "exercise_assistant", "traces")
+
+
+def cache_dir():
+    return os.environ.get("EXERCISE_TRACE_CACHE", DEFAULT_CACHE_DIR)
+
+
+def trace_settings(mirror=True, size=None, **pose_options):
+    """Everything that changes the landmarks, in a JSON-stable form."""
+    options = dict(lazy.DEFAULT_POSE_OPTIONS)
+    options.update(pose_options)
+    return {"version": TRACE_VERSION, "mirror": bool(mirror),
+            "size": list(size) if size else None, "pose": options}
+
+
+# ----------------------------- Keys -----------------------------
+_hash_memo = {}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of the file content, memoized on (size, mtime) for this process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+        digest = _hash_memo[memo_key] = h.hexdigest()
+    return digest
+
+
+def trace_key(video_path, settings):
+    h = hashlib.sha256(file_digest(video_path).encode())
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()[:32]
+
+
+# ----------------------------- Trace -----------------------------
+class Trace:
+    def __init__(self, landmarks, times, meta):
+        self.landmarks = landmarks
+        self.times = times
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def features(self):
+        """(values, visibility, valid) for every frame in one vectorized pass."""
+        valid = ~np.isnan(self.landmarks[:, 0, 0])
+        values, visibility = compute_features(self.landmarks)
+        return values, visibility, valid
+
+
+def extract_trace(video_path, settings, pose=None):
+    """Decode a video and run pose inference on every frame."""
+    cv2 = lazy.cv2()
+    cap = cv2.VideoCapture(video_path)
+    own_pose = pose is None
+    if own_pose:
+        pose = lazy.create_pose(**settings["pose"])
+
+    # Some backends report CAP_PROP_POS_MSEC as 0; the clock falls back to index / FPS
+    clock = CaptureClock(cap, live=False)
+    # The same aspect-preserving fit and mirror as the live loop, so angles match it
+    frame_path = FramePath(settings["size"], mirror=settings["mirror"])
+    landmarks, times = [], []
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            times.append(clock())
+            _, rgb = frame_path.prepare(frame)
+            results = pose.process(rgb)
+            if results.pose_landmarks:
+                landmarks.append(landmarks_to_array(results.pose_landmarks.landmark))
+            else:
+                landmarks.append(np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+        if own_pose:
+            pose.close()
+
+    landmarks = np.stack(landmarks) if landmarks else np.empty((0, NUM_LANDMARKS, 4), np.float32)
+    meta = {"video": os.path.abspath(video_path), "frames": len(landmarks),
+            "fps": fps, "settings": settings}
+    return Trace(landmarks, np.asarray(times, dtype=np.float64), meta)
+
+
+def _paths(key, directory):
+    base = os.path.join(directory, key)
+    return base + ".landmarks.npy", base + ".times.npy", base + ".json"
+
+
+def save_trace(trace, key, directory=None):
+    directory = directory or cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    landmarks_path, times_path, meta_path = _paths(key, directory)
+    # Write arrays first and the metadata last (atomically), so a reader never
+    # sees metadata for a half-written trace
+    for path, array in ((landmarks_path, trace.landmarks), (times_path, trace.times)):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp, path)
+    meta = dict(trace.meta, key=key)
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, meta_path)
+
+
+def load_trace(key, settings=None, directory=None):
+    """Memory-map a cached trace; None if missing or recorded with other settings."""
+    landmarks_path, times_path, meta_path = _paths(key, directory or cache_dir())
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        landmarks = np.load(landmarks_path, mmap_mode="r")
+        times = np.load(times_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if settings is not None and meta.get("settings") != settings:
+        return None
+    if landmarks.shape != (meta.get("frames"), NUM_LANDMARKS, 4) or len(times) != meta["frames"]:
+        return None
+    return Trace(landmarks, times, meta)
+
+
+def get_trace(video_path, directory=None, pose=None, **settings_kwargs):
+    """Load the cached trace for a video, extracting and caching it on a miss."""
+    settings = trace_settings(**settings_kwargs)
+    key = trace_key(video_path, settings)
+    trace = load_trace(key, settings, directory)
+    if trace is None:
+        save_trace(extract_trace(video_path, settings, pose=pose), key, directory)
+        trace = load_trace(key, settings, directory)
+    return trace
+
+
+# ----------------------------- Replay -----------------------------
+def replay(trace, exercise, features=None):
+    """Run one counter over a trace; returns a summary dict."""
+    counter = registry.create(exercise)
+    values, visibility, valid = features if features is not None else trace.features()
+    times = np.asarray(trace.times)
+    for i in np.flatnonzero(valid):
+        counter.step(values[i], visibility[i], times[i])
+    return {"exercise": counter.spec.name, "frames": len(trace),
+            "reps": counter.reps, "stage": counter.stage}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache a video's landmarks and replay counters over it")
+    parser.add_argument("video")
+    parser.add_argument("--exercise", action="append", help="counter to replay (repeatable); default: all")
+    parser.add_argument("--cache-dir", help=f"trace directory (default: $EXERCISE_TRACE_CACHE or {DEFAULT_CACHE_DIR})")
+    args = parser.parse_args(argv)
+
+    trace = get_trace(args.video, directory=args.cache_dir)
+    features = trace.features()
+    for name in args.exercise or list(registry.EXERCISES):
+        print(json.dumps(replay(trace, name, features)))
+
+
+if __name__ == "__main__":
+    main()
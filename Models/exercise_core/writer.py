@@ -0,0 +1,65 @@
+"""Background writer for annotated output video.
+
+Encoding runs on its own thread so it never stalls counting.  Frames are
+copied on submit (the live loop reuses its buffers), can be sub-sampled with
+`every`, and are dropped rather than queued without bound if the encoder
+cannot keep up.
+"""
+import queue
+import threading
+
+from . import pose as lazy
+
+_STOP = object()
+
+
+class AsyncVideoWriter:
+    def __init__(self, path, fps=30.0, every=1, fourcc="mp4v", maxsize=64):
+        self.path = path
+        self.every = max(1, int(every))
+        self.fps = fps / self.every
+        self.fourcc = fourcc
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self._thread.start()
+
+    def wants(self, frame_index):
+        """True if this frame survives sub-sampling (skip drawing otherwise)."""
+        return frame_index % self.every == 0
+
+    def write(self, frame):
+        try:
+            self._queue.put_nowait(frame.copy())
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        cv2 = lazy.cv2()
+        writer = None
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is _STOP:
+                    break
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                             self.fps, (width, height))
+                writer.write(frame)
+                self.written += 1
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def close(self):
+        """Flush queued frames and finalize the file."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
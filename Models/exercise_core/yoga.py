@@ -0,0 +1,256 @@
+"""Yoga pose templates scored all at once.
+
+Each asana is a YogaPose: target values with a tolerance for the features
+it cares about (names from angles.FEATURE_NAMES).  PoseLibrary compiles the
+registered poses into (K, NUM_FEATURES) target and inverse-tolerance
+matrices, so one broadcast subtraction and a row-wise max scores a frame
+against every pose:
+
+    error[k] = max over features f of |values[f] - target[k, f]| / tolerance[k, f]
+
+A pose matches when error <= 1 and the features it uses are visible
+enough (min_visibility; None means no visibility check).  Tadasana has no
+check, like the original yogaModel test it replaces, so recordings where
+the feet are barely visible count as they always did.  Features a pose
+ignores have zero weight, so adding poses only
+adds rows.  Asymmetric poses registered with mirror=True also get a
+left/right swapped copy ("vrikshasana" and "vrikshasana_mirror").
+
+PoseHoldCounter turns the per-frame match into held repetitions, as
+yogaModel.py has always counted Tadasana.
+"""
+import numpy as np
+
+from .angles import FEATURE_INDEX, NUM_FEATURES
+
+POSES = {}
+MIRROR_SUFFIX = "_mirror"
+
+
+# ----------------------------- Templates -----------------------------
+class YogaPose:
+    """Target (value, tolerance) per feature for one asana."""
+
+    def __init__(self, name, title, targets, min_visibility=0.5, mirror=False):
+        for feature in targets:
+            if feature not in FEATURE_INDEX:
+                raise KeyError(f"Unknown feature {feature!r} in pose {name!r}")
+        self.name = name
+        self.title = title
+        self.targets = dict(targets)
+        self.min_visibility = min_visibility
+        self.mirror = mirror
+
+    def mirrored(self):
+        """The same pose with left and right features swapped."""
+        def swap(feature):
+            if feature.endswith("_l"):
+                return feature[:-2] + "_r"
+            if feature.endswith("_r"):
+                return feature[:-2] + "_l"
+            return feature
+        return YogaPose(self.name + MIRROR_SUFFIX, self.title, {swap(f): v for f, v in self.targets.items()},
+                        self.min_visibility)
+
+
+def register(pose):
+    POSES[pose.name] = pose
+    if pose.mirror:
+        mirrored = pose.mirrored()
+        POSES[mirrored.name] = mirrored
+    return pose
+
+
+def base_name(name):
+    """'vrikshasana_mirror' -> 'vrikshasana'."""
+    return name[:-len(MIRROR_SUFFIX)] if name and name.endswith(MIRROR_SUFFIX) else name
+
+
+# ----------------------------- Library -----------------------------
+class PoseLibrary:
+    """Registered poses compiled into matrices; scores every pose per frame."""
+
+    def __init__(self, poses=None):
+        poses = list(POSES.values()) if poses is None else [POSES[p] if isinstance(p, str) else p for p in poses]
+        self.poses = poses
+        self.names = [pose.name for pose in poses]
+        self.index = {name: k for k, name in enumerate(self.names)}
+        self.target = np.zeros((len(poses), NUM_FEATURES), dtype=np.float32)
+        self.inv_tolerance = np.zeros((len(poses), NUM_FEATURES), dtype=np.float32)
+        self.used = np.zeros((len(poses), NUM_FEATURES), dtype=bool)
+        for k, pose in enumerate(poses):
+            for feature, (value, tolerance) in pose.targets.items():
+                f = FEATURE_INDEX[feature]
+                self.target[k, f] = value
+                self.inv_tolerance[k, f] = 1.0 / tolerance
+                self.used[k, f] = True
+        # Unused features (and poses without a visibility check) get a floor of -inf
+        floors = np.array([[-np.inf if p.min_visibility is None else p.min_visibility] for p in poses],
+                          dtype=np.float32)
+        self._vis_floor = np.where(self.used, floors, -np.inf)
+
+    def __len__(self):
+        return len(self.poses)
+
+    def errors(self, values):
+        """Normalized error of every pose: (K,) for one frame, (..., K) for a batch of feature rows."""
+        values = np.asarray(values, dtype=np.float32)
+        return (np.abs(values[..., None, :] - self.target) * self.inv_tolerance).max(axis=-1)
+
+    def visible(self, visibility):
+        """Whether each pose's features are visible enough, shaped like errors()."""
+        visibility = np.asarray(visibility, dtype=np.float32)
+        return (visibility[..., None, :] >= self._vis_floor).all(axis=-1)
+
+    def scores(self, values, visibility=None):
+        """Error per pose, with poses whose features are not visible set to inf."""
+        errors = self.errors(values)
+        if visibility is not None:
+            errors = np.where(self.visible(visibility), errors, np.inf)
+        return errors
+
+    def classify(self, values, visibility=None):
+        """Name of the best matching pose (error <= 1) for one frame, or None."""
+        errors = self.scores(values, visibility)
+        best = int(np.argmin(errors))
+        return self.names[best] if errors[best] <= 1.0 else None
+
+    def matches(self, name, values, visibility=None):
+        """Whether one frame matches the named pose."""
+        return bool(self.scores(values, visibility)[self.index[name]] <= 1.0)
+
+
+class PoseHoldCounter:
+    """Counts a repetition each time a pose is held for `hold` seconds.
+
+    pose -- only count this pose (either side if mirrored), even where another
+            template fits better; None counts whichever pose fits best.
+    """
+
+    def __init__(self, library=None, pose=None, hold=5.0):
+        self.library = library or PoseLibrary()
+        if pose is not None and pose not in self.library.index:
+            raise KeyError(f"Unknown yoga pose {pose!r}; choose one of: "
+                           f"{', '.join(n for n in self.library.names if not n.endswith(MIRROR_SUFFIX))}")
+        self.pose = pose
+        self._rows = None if pose is None else [k for k, name in enumerate(self.library.names)
+                                                if base_name(name) == pose]
+        self.hold = hold
+        self.reps = {}
+        self.current = None
+        self.start = None
+
+    def reset(self):
+        self.reps = {}
+        self.current = None
+        self.start = None
+
+    @property
+    def total(self):
+        return sum(self.reps.values())
+
+    def step(self, values, visibility, t):
+        """Advance on one frame at capture time t.
+
+        Returns (pose name or None, True if a hold just completed).
+        """
+        if self._rows is None:
+            name = base_name(self.library.classify(values, visibility))
+        else:
+            errors = self.library.scores(values, visibility)[self._rows]
+            name = self.pose if errors.min() <= 1.0 else None
+        if name is None or name != self.current:
+            self.current, self.start = name, t
+            return name, False
+        if t - self.start >= self.hold:
+            self.reps[name] = self.reps.get(name, 0) + 1
+            # Start timing the next hold from here
+            self.start = t
+            return name, True
+        return name, False
+
+    def interrupt(self):
+        """End the current hold without counting it (e.g. nobody in frame)."""
+        self.current = None
+        self.start = None
+
+    def held(self, t):
+        """Seconds the current pose has been held at time t."""
+        return 0.0 if self.current is None else t - self.start
+
+
+# ----------------------------- Pose table -----------------------------
+# Angles in degrees (angles.JOINT_ANGLES); foot_spread in image widths;
+# torso_tilt 0 standing, 90 lying.  Mirrored poses are written with the
+# left leg doing the work.
+register(YogaPose("tadasana", "Tadasana", {
+    # Arms straight (150-180) and toes lifted (ankle-heel-toe over 30)
+    "elbow_l": (165, 15), "elbow_r": (165, 15),
+    "foot_l": (105, 75), "foot_r": (105, 75),
+}, min_visibility=None))
+
+register(YogaPose("urdhvahastasana", "Urdhva Hastasana", {
+    "elbow_l": (165, 15), "elbow_r": (165, 15),
+    "shoulder_l": (165, 20), "shoulder_r": (165, 20),
+    "knee_l": (170, 15), "knee_r": (170, 15), "torso_tilt": (0, 15),
+}))
+
+register(YogaPose("vrikshasana", "Vrikshasana", {
+    "knee_l": (50, 30), "knee_r": (170, 15), "hip_l": (130, 30),
+    "shoulder_l": (165, 25), "shoulder_r": (165, 25), "torso_tilt": (0, 15),
+}, mirror=True))
+
+register(YogaPose("utkatasana", "Utkatasana", {
+    "knee_l": (115, 25), "knee_r": (115, 25), "hip_l": (105, 25), "hip_r": (105, 25),
+    "shoulder_l": (160, 25), "shoulder_r": (160, 25),
+}))
+
+register(YogaPose("virabhadrasana1", "Virabhadrasana I", {
+    "knee_l": (100, 20), "knee_r": (165, 15),
+    "shoulder_l": (165, 20), "shoulder_r": (165, 20), "torso_tilt": (5, 15),
+}, mirror=True))
+
+register(YogaPose("virabhadrasana2", "Virabhadrasana II", {
+    "knee_l": (100, 20), "knee_r": (165, 15),
+    "shoulder_l": (90, 20), "shoulder_r": (90, 20), "elbow_l": (165, 15), "elbow_r": (165, 15),
+    "foot_spread": (0.35, 0.15),
+}, mirror=True))
+
+register(YogaPose("trikonasana", "Trikonasana", {
+    "knee_l": (170, 15), "knee_r": (170, 15), "elbow_l": (165, 15), "elbow_r": (165, 15),
+    "torso_tilt": (60, 25), "foot_spread": (0.35, 0.15),
+}, mirror=True))
+
+register(YogaPose("uttanasana", "Uttanasana", {
+    # Standing forward fold: legs straight, hips closed
+    "hip_l": (45, 25), "hip_r": (45, 25), "knee_l": (170, 15), "knee_r": (170, 15),
+}))
+
+register(YogaPose("adhomukhasvanasana", "Adho Mukha Svanasana", {
+    "hip_l": (70, 25), "hip_r": (70, 25), "knee_l": (165, 20), "knee_r": (165, 20),
+    "elbow_l": (165, 15), "elbow_r": (165, 15), "shoulder_l": (170, 20), "shoulder_r": (170, 20),
+}))
+
+register(YogaPose("phalakasana", "Phalakasana", {
+    "trunk_l": (170, 12), "trunk_r": (170, 12), "elbow_l": (165, 15), "elbow_r": (165, 15),
+    "torso_tilt": (75, 15),
+}))
+
+register(YogaPose("bhujangasana", "Bhujangasana", {
+    "hip_l": (135, 25), "hip_r": (135, 25), "knee_l": (170, 15), "knee_r": (170, 15),
+    "elbow_l": (150, 30), "elbow_r": (150, 30), "torso_tilt": (55, 25),
+}))
+
+register(YogaPose("dandasana", "Dandasana", {
+    "hip_l": (90, 20), "hip_r": (90, 20), "knee_l": (170, 15), "knee_r": (170, 15),
+    "torso_tilt": (10, 15),
+}))
+
+register(YogaPose("balasana", "Balasana", {
+    "knee_l": (40, 30), "knee_r": (40, 30), "hip_l": (45, 30), "hip_r": (45, 30),
+}))
+
+register(YogaPose("navasana", "Navasana", {
+    "hip_l": (80, 20), "hip_r": (80, 20), "knee_l": (165, 20), "knee_r": (165, 20),
+    "torso_tilt": (40, 20),
+}))
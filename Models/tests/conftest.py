@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The scripts import exercise_core from Models/, which is not a package, and
+# the web server's modules live next to app.py in "Updated Model/"
+_MODELS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _MODELS)
+sys.path.insert(1, os.path.join(os.path.dirname(_MODELS), "Updated Model"))
@@ -0,0 +1,97 @@
+"""RepAnalytics records and RunningStats over scripted counter output."""
+import math
+import statistics
+
+import pytest
+
+from exercise_core.analytics import RepAnalytics, RunningStats
+
+FPS = 10.0
+
+
+def feed(analytics, frames, start=0.0):
+    """frames: [(stage, reps, value)] one per 1/FPS s; returns the records emitted."""
+    records = []
+    for i, (stage, reps, value) in enumerate(frames):
+        record = analytics.update(stage, reps, value, start + i / FPS)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def rep(reps, down_s=1.0, up_s=1.0, low=90.0, high=170.0):
+    """One push-up as a counter reports it: the stage flips to "down" at the bottom
+    after lowering for down_s, and back to "up" (with the rep counted) at the top."""
+    frames = []
+    n_down, n_up = int(down_s * FPS), int(up_s * FPS)
+    for i in range(n_down - 1):
+        frames.append(("up", reps, high - (high - low) * (i + 1) / n_down))
+    frames.append(("down", reps, low))
+    for i in range(n_up - 1):
+        frames.append(("down", reps, low + (high - low) * (i + 1) / n_up))
+    frames.append(("up", reps + 1, high))
+    return frames
+
+
+def session(reps, **kwargs):
+    frames = [("up", 0, 170.0)]
+    for r in range(reps):
+        frames += rep(r, **kwargs)
+    return frames
+
+
+def test_records_phases_tempo_and_range():
+    analytics = RepAnalytics()
+    records = feed(analytics, session(3, down_s=2.0, up_s=1.0))
+    assert [r["rep"] for r in records] == [1, 2, 3]
+    last = records[-1]
+    assert last["eccentric_s"] == pytest.approx(2.0, abs=0.11)
+    assert last["concentric_s"] == pytest.approx(1.0, abs=0.11)
+    assert last["tut_s"] == pytest.approx(3.0, abs=0.11)
+    assert last["duration_s"] == pytest.approx(3.0, abs=0.11)
+    assert (last["min"], last["max"], last["rom"]) == pytest.approx((90.0, 170.0, 80.0))
+    assert last["mean_velocity"] == pytest.approx(160.0 / last["tut_s"], rel=1e-3)
+    assert 0 < last["peak_velocity"] <= 80.0 / 1.0 * 1.01
+
+
+def test_stats_aggregate_every_rep_and_keep_few_records():
+    analytics = RepAnalytics(keep=2)
+    feed(analytics, session(5))
+    summary = analytics.summary()
+    assert summary["reps"] == 5
+    assert summary["stats"]["rom"]["count"] == 5
+    assert len(summary["recent"]) == 2 and analytics.last["rep"] == 5
+
+
+def test_counter_reset_starts_over():
+    analytics = RepAnalytics()
+    feed(analytics, session(2, down_s=2.0))
+    # The counter is reset mid-rep (or auto mode switched exercise) with other stage names
+    frames = [("open", 0, 40.0), ("closed", 0, 10.0), ("open", 0, 40.0), ("closed", 1, 10.0)]
+    records = feed(analytics, frames, start=100.0)
+    assert len(records) == 1
+    record = records[0]
+    assert set(record["phases_s"]) == {"open", "closed"}
+    assert "eccentric_s" not in record
+    # Timed from the first stage change after the reset
+    assert record["duration_s"] == pytest.approx(0.2)
+    assert (record["min"], record["max"]) == (10.0, 40.0)
+
+
+def test_skipped_reps_emit_no_record():
+    analytics = RepAnalytics()
+    frames = [("up", 0, 170.0), ("down", 0, 90.0), ("up", 3, 170.0)]
+    assert feed(analytics, frames) == []
+    assert feed(analytics, rep(3), start=1.0)[0]["rep"] == 4
+
+
+def test_running_stats_match_statistics():
+    data = [3.0, 1.5, 4.0, 1.0, 5.5, 9.0, 2.5]
+    stats = RunningStats()
+    for x in data:
+        stats.add(x)
+    assert stats.mean == pytest.approx(statistics.mean(data))
+    assert stats.std == pytest.approx(statistics.stdev(data))
+    assert (stats.min, stats.max) == (1.0, 9.0)
+    assert RunningStats().as_dict() == {"count": 0}
+    assert not math.isnan(RunningStats().std)
@@ -0,0 +1,96 @@
+"""compute_features against the scalar calculate_angle the scripts used to call."""
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from exercise_core.angles import (FEATURE_INDEX, JOINT_ANGLES, NUM_FEATURES, NUM_LANDMARKS, calculate_angle,
+                                  compute_features, landmarks_to_array)
+
+
+def legacy_angle(a, b, c):
+    """calculate_angle as it was in Base_model.py / exercise_logic.py."""
+    ab = [a[0] - b[0], a[1] - b[1]]
+    cb = [c[0] - b[0], c[1] - b[1]]
+    dot = ab[0] * cb[0] + ab[1] * cb[1]
+    mag_ab = math.sqrt(ab[0] ** 2 + ab[1] ** 2)
+    mag_cb = math.sqrt(cb[0] ** 2 + cb[1] ** 2)
+    if mag_ab * mag_cb == 0:
+        return 0
+    return math.degrees(math.acos(max(-1.0, min(1.0, dot / (mag_ab * mag_cb)))))
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.random((200, NUM_LANDMARKS, 4)).astype(np.float32)
+
+
+def expected_angles(frame):
+    return [legacy_angle(frame[a, :2].tolist(), frame[b, :2].tolist(), frame[c, :2].tolist())
+            for _, a, b, c in JOINT_ANGLES]
+
+
+def test_single_frame_angles_match_legacy(frames):
+    for frame in frames:
+        values, _ = compute_features(frame)
+        assert values.shape == (NUM_FEATURES,)
+        np.testing.assert_allclose(values[:len(JOINT_ANGLES)], expected_angles(frame), atol=1e-3)
+
+
+def test_batch_matches_single_frames(frames):
+    values, visibility = compute_features(frames)
+    assert values.shape == visibility.shape == (len(frames), NUM_FEATURES)
+    for i in range(0, len(frames), 17):
+        single, single_vis = compute_features(frames[i])
+        np.testing.assert_allclose(values[i], single, atol=1e-3)
+        np.testing.assert_array_equal(visibility[i], single_vis)
+
+
+def test_degenerate_angle_is_zero():
+    frame = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    values, _ = compute_features(frame)
+    assert not values[:len(JOINT_ANGLES)].any()
+    assert calculate_angle((0.5, 0.5), (0.5, 0.5), (0.1, 0.2)) == 0
+
+
+def test_visibility_is_the_weakest_landmark():
+    frame = np.full((NUM_LANDMARKS, 4), 0.5, dtype=np.float32)
+    frame[:, 3] = 0.9
+    frame[14, 3] = 0.2      # right elbow
+    _, visibility = compute_features(frame)
+    assert visibility[FEATURE_INDEX["elbow_r"]] == pytest.approx(0.2)
+    assert visibility[FEATURE_INDEX["elbow_l"]] == pytest.approx(0.9)
+
+
+def test_positional_features():
+    frame = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    frame[[11, 12], 1] = 0.3      # shoulders
+    frame[[7, 8], 1] = 0.2        # ears
+    frame[[23, 24], 1] = 0.6      # hips
+    frame[27, 0], frame[28, 0] = 0.4, 0.7   # ankles
+    values, _ = compute_features(frame)
+    assert values[FEATURE_INDEX["hip_y"]] == pytest.approx(0.6)
+    assert values[FEATURE_INDEX["shrug"]] == pytest.approx(0.1)
+    assert values[FEATURE_INDEX["foot_spread"]] == pytest.approx(0.3)
+    assert values[FEATURE_INDEX["torso_tilt"]] == pytest.approx(0.0)
+    # Lying down: shoulders and hips level
+    frame[[11, 12], 0], frame[[11, 12], 1] = 0.2, 0.6
+    frame[[23, 24], 0] = 0.7
+    assert compute_features(frame)[0][FEATURE_INDEX["torso_tilt"]] == pytest.approx(90.0)
+
+
+def test_calculate_angle_accepts_landmark_objects():
+    a, b, c = (SimpleNamespace(x=x, y=y) for x, y in ((0.0, 1.0), (0.0, 0.0), (1.0, 0.0)))
+    assert calculate_angle(a, b, c) == pytest.approx(90.0)
+    assert calculate_angle((0, 1), (0, 0), (0, -1)) == pytest.approx(180.0)
+
+
+def test_landmarks_to_array(frames):
+    objects = [SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v)) for x, y, z, v in frames[0]]
+    np.testing.assert_array_equal(landmarks_to_array(objects), frames[0])
+    out = np.zeros((2, NUM_LANDMARKS, 4), dtype=np.float32)
+    assert landmarks_to_array(objects, out[1]) is not None
+    np.testing.assert_array_equal(out[1], frames[0])
+    assert not out[0].any()
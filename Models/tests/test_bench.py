@@ -0,0 +1,43 @@
+"""Benchmark config parsing and baseline comparison (no videos are run)."""
+import pytest
+
+from exercise_core.bench import compare, parse_config, video_key
+
+
+def test_parse_config():
+    assert parse_config("roi+adaptive+target=30") == {"roi": True, "adaptive": True, "target_ms": 30.0}
+    assert parse_config("lite") == {"model_complexity": 0}
+    with pytest.raises(ValueError, match="turbo"):
+        parse_config("roi+turbo")
+
+
+@pytest.mark.parametrize("path, key", [
+    ("/home/ci/repo/Data/test_data/row_data/row_1.webm", "test_data/row_data/row_1.webm"),
+    ("C:\\Users\\me\\Exercise-Assistant\\Data\\pushup_data\\pushup_1.mp4", "pushup_data/pushup_1.mp4"),
+    ("../Data/pushup_data/pushup_1.mp4", "pushup_data/pushup_1.mp4"),
+    ("clips/squat.mp4", "clips/squat.mp4"),
+])
+def test_video_key(path, key):
+    assert video_key(path) == key
+
+
+def result(video, fps, p95=10.0, reps=5, config="default"):
+    return {"video": video, "config": config, "fps": fps, "reps": reps, "peak_rss_mb": 200.0,
+            "latency_ms": {"p95_ms": p95}}
+
+
+def test_baseline_from_another_checkout_is_matched():
+    baseline = {"runs": [result("/ci/build/Data/pushup_data/pushup_1.mp4", 30.0),
+                         result("/ci/build/Data/test_data/row_data/row_1.webm", 30.0)]}
+    current = {"runs": [result("/home/me/src/Data/pushup_data/pushup_1.mp4", 20.0),
+                        result("/home/me/src/Data/test_data/row_data/row_1.webm", 30.0, reps=4)]}
+    rows, regressions = compare(current, baseline)
+    assert len(rows) == 3       # two runs and the geometric mean
+    assert any("pushup_1.mp4" in r and "fps 30 -> 20" in r for r in regressions)
+    assert any("reps 5 -> 4" in r for r in regressions)
+
+
+def test_changes_within_tolerance_pass():
+    baseline = {"runs": [result("/a/Data/pushup_data/pushup_1.mp4", 30.0, p95=10.0)]}
+    current = {"runs": [result("/b/Data/pushup_data/pushup_1.mp4", 28.0, p95=11.0)]}
+    assert compare(current, baseline, tolerance=0.15)[1] == []
@@ -0,0 +1,59 @@
+"""Chunked stitching against a sequential run over the same synthetic stream."""
+import numpy as np
+import pytest
+
+from exercise_core import registry, synthetic
+from exercise_core.chunked import plan_segments, segment_transfer, stitch
+
+REP_SPECS = [name for name, spec in registry.EXERCISES.items() if spec.kind == "reps"]
+
+
+def sequential(spec, trace):
+    counter = spec.build()
+    values, visibility, valid = trace.features()
+    timeline, rep_frames = [], []
+    for i in np.flatnonzero(valid):
+        state, reps = counter.state, counter.reps
+        counter.step(values[i], visibility[i], trace.times[i])
+        if counter.state != state:
+            timeline.append((int(i), counter.stage))
+        if counter.reps != reps:
+            rep_frames.append(int(i))
+    return {"exercise": spec.name, "reps": counter.reps, "stage": counter.stage,
+            "timeline": timeline, "rep_frames": rep_frames}
+
+
+def chunked(spec, trace, bounds):
+    values, visibility, valid = trace.features()
+    segments = [{"transfer": segment_transfer(spec, values[a:b], visibility[a:b], valid[a:b], a, trace.times[a:b])}
+                for a, b in bounds]
+    return stitch(spec, segments)
+
+
+@pytest.mark.parametrize("name", REP_SPECS)
+def test_stitch_matches_sequential_run(name):
+    spec = registry.get_spec(name)
+    trace = synthetic.rep_trace(spec, reps=20, noise=0.1, dropout=0.01, visibility_loss=0.01, seed=7)
+    # Cuts at arbitrary frames, mid-rep and inside dropout bursts included
+    rng = np.random.default_rng(1)
+    cuts = np.sort(rng.choice(np.arange(1, len(trace)), size=6, replace=False))
+    bounds = list(zip([0, *cuts], [*cuts, len(trace)]))
+    assert chunked(spec, trace, bounds) == sequential(spec, trace)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 8])
+def test_planned_segments_cover_the_stream(workers):
+    spec = registry.get_spec("squat")
+    trace = synthetic.rep_trace(spec, reps=30, noise=0.05, seed=2)
+    bounds = plan_segments(len(trace), workers, min_frames=100)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(trace)
+    assert all(a == b for (_, a), (b, _) in zip(bounds, bounds[1:]))
+    assert chunked(spec, trace, bounds) == sequential(spec, trace)
+
+
+def test_empty_trailing_segment_is_harmless():
+    # The header frame count can overshoot; a segment past the real end decodes nothing
+    spec = registry.get_spec("pushup")
+    trace = synthetic.rep_trace(spec, reps=5)
+    bounds = [(0, 100), (100, len(trace)), (len(trace), len(trace))]
+    assert chunked(spec, trace, bounds) == sequential(spec, trace)
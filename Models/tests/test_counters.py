@@ -0,0 +1,103 @@
+"""Every registered counter over synthetic feature streams."""
+import pytest
+
+from exercise_core import registry, synthetic
+from exercise_core.multi import AutoCounter
+from exercise_core.traces import replay
+
+REP_SPECS = [name for name, spec in registry.EXERCISES.items() if spec.kind == "reps"]
+HOLD_SPECS = [name for name, spec in registry.EXERCISES.items() if spec.kind == "hold"]
+
+
+@pytest.mark.parametrize("name", REP_SPECS)
+def test_clean_stream_counts_planned_reps(name):
+    trace = synthetic.rep_trace(name, reps=8)
+    summary = replay(trace, name)
+    assert summary["reps"] == trace.planned_reps == 8
+    # The stream ends where it started, at the high end
+    assert summary["stage"] == registry.get_spec(name).stages[0]
+
+
+@pytest.mark.parametrize("name", REP_SPECS)
+def test_noisy_stream_never_overcounts(name):
+    trace = synthetic.rep_trace(name, reps=10, noise=0.05, dropout=0.01, visibility_loss=0.01, seed=3)
+    # A dropout burst can swallow a rep, but noise around a threshold must not add any
+    assert 7 <= replay(trace, name)["reps"] <= 10
+
+
+@pytest.mark.parametrize("name", REP_SPECS)
+def test_reset_forgets_reps(name):
+    counter = registry.create(name)
+    values, visibility, _ = synthetic.rep_trace(name, reps=2).features()
+    for v, vis in zip(values, visibility):
+        counter.step(v, vis, 0.0)
+    assert counter.reps == 2
+    counter.reset()
+    assert counter.reps == 0 and counter.stage is None
+
+
+@pytest.mark.parametrize("name", HOLD_SPECS)
+def test_hold_timer_times_each_hold(name):
+    # One 20 s period: above the threshold for the first and last 5 s
+    trace = synthetic.rep_trace(name, reps=1, tempo=20.0)
+    values, visibility, _ = trace.features()
+    counter = registry.create(name)
+    durations, stages = [], []
+    for v, vis, t in zip(values, visibility, trace.times):
+        durations.append(counter.step(v, vis, t)[2])
+        stages.append(counter.stage)
+    middle = len(trace) // 2
+    assert max(durations[:middle]) == 4
+    assert stages[middle] is None and durations[middle] == 0
+    assert stages[-1] == "holding"
+    assert counter.reps == 0
+
+
+def test_auto_counter_detects_and_counts_every_exercise():
+    for name in REP_SPECS:
+        trace = synthetic.rep_trace(name, reps=6)
+        auto = AutoCounter()
+        values, visibility, _ = trace.features()
+        for v, vis, t in zip(values, visibility, trace.times):
+            auto.step(v, vis, t)
+        assert auto.spec.name == name
+        assert auto.reps == 6
+
+
+def test_auto_counter_switches_exercise():
+    auto = AutoCounter()
+    for name in ("pushup", "squat"):
+        trace = synthetic.rep_trace(name, reps=6)
+        values, visibility, _ = trace.features()
+        for v, vis, t in zip(values, visibility, trace.times):
+            auto.step(v, vis, t)
+        assert auto.spec.name == name
+    counts = auto.bank.counts()
+    assert counts["squat"] == 6
+
+
+def test_auto_counter_margin_follows_detected_spec():
+    auto, pushup = AutoCounter(), registry.create("pushup")
+    values, visibility, _ = synthetic.rep_trace("pushup", reps=6).features()
+    for v, vis in zip(values, visibility):
+        auto.step(v, vis, 0.0)
+        pushup.step(v, vis, 0.0)
+    assert auto.classifier.settled
+    for v in values[::7]:
+        assert auto.margin(v) == pytest.approx(pushup.margin(v), abs=1e-5)
+
+
+def test_auto_counter_reports_the_detected_spec_visibility():
+    name = next(n for n in REP_SPECS if registry.get_spec(n).min_visibility is not None)
+    auto = AutoCounter()
+    values, visibility, _ = synthetic.rep_trace(name, reps=6).features()
+    assert auto.visible
+    for v, vis in zip(values, visibility):
+        auto.step(v, vis, 0.0)
+    assert auto.spec.name == name and auto.visible
+    hidden = visibility[-1].copy()
+    hidden[:] = synthetic.LOW_VISIBILITY
+    auto.step(values[-1], hidden, 0.0)
+    assert not auto.visible
+    auto.step(values[-1], visibility[-1], 0.0)
+    assert auto.visible
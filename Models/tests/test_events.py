@@ -0,0 +1,127 @@
+"""EventBus delivery and EventEmitter over synthetic counter runs."""
+import io
+import json
+import threading
+
+import numpy as np
+
+from exercise_core import registry, synthetic
+from exercise_core.events import (ANGLE, EXERCISE, HOLD, LOW_VISIBILITY, REP, STAGE, EventBus, EventEmitter,
+                                  RepCompleted, StageChanged, json_lines)
+from exercise_core.multi import AutoCounter
+
+
+def collect(*kinds):
+    bus, events = EventBus(), []
+    bus.subscribe(events.append, kinds=kinds or None)
+    return bus, events
+
+
+def run(counter, trace, bus, **kwargs):
+    emitter = EventEmitter(bus, counter, **kwargs)
+    values, visibility, valid = trace.features()
+    for i in np.flatnonzero(valid):
+        emitter.before()
+        _, _, value = counter.step(values[i], visibility[i], trace.times[i])
+        emitter.after(int(i), trace.times[i], value)
+    bus.close()
+
+
+def test_bus_delivers_in_order_to_matching_subscribers():
+    bus = EventBus()
+    reps, everything = [], []
+    bus.subscribe(reps.append, kinds=(REP,))
+    bus.subscribe(everything.append)
+    assert bus.wants(REP) and bus.wants(ANGLE)
+    for i in range(5):
+        bus.publish(StageChanged("pushup", i, i / 30, "down"))
+        bus.publish(RepCompleted("pushup", i, i / 30, i + 1))
+    bus.close()
+    assert [e.reps for e in reps] == [1, 2, 3, 4, 5]
+    assert [e.kind for e in everything] == [STAGE, REP] * 5
+
+
+def test_unwanted_kinds_are_not_wanted():
+    bus, _ = collect(REP)
+    assert bus.wants(REP) and not bus.wants(ANGLE)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    bus = EventBus(maxsize=2)
+    release = threading.Event()
+    bus.subscribe(lambda event: release.wait(5))
+    results = [bus.publish(RepCompleted("pushup", i, 0.0, i)) for i in range(10)]
+    release.set()
+    bus.close()
+    assert not all(results)
+    assert bus.dropped == results.count(False)
+
+
+def test_failing_subscriber_does_not_stop_delivery():
+    bus = EventBus()
+    delivered = []
+
+    def broken(event):
+        raise RuntimeError("subscriber bug")
+
+    bus.subscribe(broken)
+    bus.subscribe(delivered.append)
+    for i in range(3):
+        bus.publish(RepCompleted("pushup", i, 0.0, i))
+    bus.close()
+    assert len(delivered) == 3
+
+
+def test_emitter_reports_every_stage_and_rep():
+    bus, events = collect(REP, STAGE)
+    run(registry.create("pushup"), synthetic.rep_trace("pushup", reps=4), bus, source="cam0")
+    reps = [e for e in events if e.kind == REP]
+    assert [e.reps for e in reps] == [1, 2, 3, 4]
+    assert all(e.source == "cam0" and e.exercise == "pushup" for e in events)
+    stages = [e.stage for e in events if e.kind == STAGE]
+    assert stages[:3] == ["up", "down", "up"]
+
+
+def test_low_visibility_is_reported_once_per_dropout():
+    name = next(n for n, s in registry.EXERCISES.items() if s.kind == "reps" and s.min_visibility is not None)
+    trace = synthetic.rep_trace(name, reps=6)
+    trace.visibility[40:60] = synthetic.LOW_VISIBILITY
+    trace.visibility[100:110] = synthetic.LOW_VISIBILITY
+    bus, events = collect(LOW_VISIBILITY)
+    run(registry.create(name), trace, bus)
+    assert [e.frame for e in events] == [40, 100]
+
+
+def test_auto_mode_reports_detection_and_low_visibility():
+    name = next(n for n, s in registry.EXERCISES.items() if s.kind == "reps" and s.min_visibility is not None)
+    trace = synthetic.rep_trace(name, reps=8)
+    trace.visibility[-60:-40] = synthetic.LOW_VISIBILITY
+    bus, events = collect(EXERCISE, LOW_VISIBILITY)
+    run(AutoCounter(), trace, bus)
+    assert [e.kind for e in events] == [EXERCISE, LOW_VISIBILITY]
+    assert events[0].exercise == name
+
+
+def test_hold_ticks_once_per_second():
+    trace = synthetic.rep_trace("plankhold", reps=1, tempo=20.0)
+    bus, events = collect(HOLD)
+    run(registry.create("plankhold"), trace, bus)
+    assert [e.seconds for e in events] == [1, 2, 3, 4, 1, 2, 3, 4]
+
+
+def test_angle_samples_are_rate_limited():
+    trace = synthetic.rep_trace("pushup", reps=2, fps=30.0)     # 4 s
+    bus, events = collect(ANGLE)
+    run(registry.create("pushup"), trace, bus, angle_interval=0.5)
+    assert len(events) == 9
+    assert np.allclose(np.diff([e.t for e in events]), 0.5, atol=1 / 30)
+
+
+def test_json_lines_writes_one_object_per_event():
+    out = io.StringIO()
+    bus = EventBus()
+    bus.subscribe(json_lines(out))
+    bus.publish(RepCompleted("pushup", 12, 0.123456, 3, source=1))
+    bus.close()
+    assert json.loads(out.getvalue()) == {"event": "rep", "exercise": "pushup", "frame": 12, "t": 0.123,
+                                          "source": 1, "reps": 3}
@@ -0,0 +1,75 @@
+"""FramePath's fitted, mirrored, buffer-reusing frame preparation."""
+import numpy as np
+import pytest
+
+from exercise_core.frames import FramePath
+
+
+def gradient(width, height):
+    """BGR frame whose blue channel grows left to right, so mirroring is visible."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    frame[..., 2] = 50
+    return frame
+
+
+@pytest.mark.parametrize("width, height, fitted", [
+    (640, 480, (640, 480)),
+    (1280, 720, (640, 360)),      # 16:9 is letterboxed, not stretched
+    (1080, 1920, (270, 480)),     # portrait phone video
+    (320, 240, (320, 240)),       # smaller frames are never upscaled
+])
+def test_prepare_keeps_aspect_ratio(width, height, fitted):
+    display, rgb = FramePath().prepare(gradient(width, height))
+    assert display.shape == rgb.shape == (fitted[1], fitted[0], 3)
+
+
+def test_prepare_mirrors_and_converts_to_rgb():
+    frame = gradient(640, 480)
+    display, rgb = FramePath().prepare(frame)
+    np.testing.assert_array_equal(display, frame[:, ::-1])
+    np.testing.assert_array_equal(rgb, display[..., ::-1])
+    assert not rgb.flags.writeable
+
+
+def test_prepare_without_mirror_passes_the_frame_through():
+    frame = gradient(640, 480)
+    display, _ = FramePath(mirror=False).prepare(frame)
+    assert display is frame
+
+
+def test_buffers_rotate_through_the_ring():
+    path = FramePath(ring=3)
+    frame = gradient(1280, 720)
+    outputs = [path.prepare(frame)[0] for _ in range(4)]
+    # Consecutive frames never share a buffer; the ring wraps after three
+    assert len({id(o) for o in outputs[:3]}) == 3
+    assert np.shares_memory(outputs[0], outputs[3])
+
+
+class FakeCapture:
+    def __init__(self, count):
+        self.count = count
+        self.buffers = []
+
+    def read(self, image=None):
+        if self.count == 0:
+            return False, None
+        self.count -= 1
+        self.buffers.append(image)
+        return True, gradient(64, 48) if image is None else image
+
+
+def test_read_reuses_buffers_unless_asked_not_to():
+    cap = FakeCapture(5)
+    path = FramePath(ring=2)
+    frames = [path.read(cap) for _ in range(5)]
+    assert path.read(cap) is None
+    assert cap.buffers[:2] == [None, None]
+    assert cap.buffers[2] is frames[0] and cap.buffers[3] is frames[1]
+
+    cap = FakeCapture(3)
+    path = FramePath(ring=2, reuse_reads=False)
+    for _ in range(3):
+        path.read(cap)
+    assert cap.buffers == [None, None, None]
@@ -0,0 +1,114 @@
+"""LatencyController's level ladder and the One Euro LandmarkSmoother."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from exercise_core import latency
+from exercise_core.angles import NUM_LANDMARKS
+from exercise_core.latency import LandmarkSmoother, LatencyController
+
+
+class FakePose:
+    def __init__(self, model_complexity=1, **options):
+        self.model_complexity = model_complexity
+        self.shapes = []
+        self.closed = False
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape[:2])
+        return SimpleNamespace(pose_landmarks=None)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def poses(monkeypatch):
+    built = {}
+
+    def create_pose(model_complexity=1, **options):
+        pose = built[model_complexity] = FakePose(model_complexity, **options)
+        return pose
+
+    monkeypatch.setattr(latency.lazy, "create_pose", create_pose)
+    return built
+
+
+def test_over_budget_steps_down_after_patience(poses):
+    controller = LatencyController(20, patience=5)
+    for _ in range(4):
+        controller._record(0.050)
+    assert controller.level == 1
+    controller._record(0.050)
+    assert controller.level == 2 and controller.switches == 1
+    # Latency of the new level is measured afresh
+    assert controller.latency is None
+
+
+def test_headroom_steps_back_up_after_cooldown(poses):
+    controller = LatencyController(20, start_level=3, cooldown=10)
+    for _ in range(9):
+        controller._record(0.005)
+    assert controller.level == 3
+    controller._record(0.005)
+    assert controller.level == 2
+
+
+def test_within_budget_holds_the_level(poses):
+    controller = LatencyController(20, patience=3, cooldown=3)
+    for _ in range(50):
+        controller._record(0.015)
+    assert controller.level == 1 and controller.switches == 0
+
+
+def test_process_scales_the_input_and_uses_the_level_model(poses):
+    controller = LatencyController(1000, start_level=2)     # (1, 0.75)
+    controller.process(np.zeros((480, 640, 3), dtype=np.uint8))
+    assert poses[1].shapes == [(360, 480)]
+    assert controller.stats()["model_complexity"] == 1
+    controller.close()
+    assert poses[1].closed
+
+
+def test_unavailable_model_is_dropped_from_the_ladder(monkeypatch, poses, capsys):
+    def create_pose(model_complexity=1, **options):
+        if model_complexity == 0:
+            raise OSError("offline")
+        return FakePose(model_complexity)
+
+    monkeypatch.setattr(latency.lazy, "create_pose", create_pose)
+    controller = LatencyController(20, start_level=2, patience=1)   # (1, 0.75); next is (0, 1.0)
+    controller._record(0.050)
+    assert controller.levels == ((2, 1.0), (1, 1.0), (1, 0.75))
+    assert controller.levels[controller.level] == (1, 0.75)
+    assert "unavailable" in capsys.readouterr().err
+
+
+def landmarks(x):
+    array = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    array[:, 0] = x
+    array[:, 3] = 0.7
+    return array
+
+
+def test_smoother_removes_jitter_but_follows_motion():
+    rng = np.random.default_rng(0)
+    smoother = LandmarkSmoother()
+    raw = 0.5 + rng.normal(0, 0.005, 300)
+    still = [smoother.apply(landmarks(x), i / 30)[0, 0] for i, x in enumerate(raw)]
+    # The defaults are light: they take the edge off jitter without lagging reps
+    assert np.std(still[10:]) < 0.8 * np.std(raw[10:])
+
+    smoother.reset()
+    ramp = [smoother.apply(landmarks(i / 90), i / 30)[0, 0] for i in range(90)]
+    # A steady movement is followed within a frame or two
+    assert ramp[-1] == pytest.approx(89 / 90, abs=2 / 90)
+
+
+def test_smoother_leaves_visibility_and_restarts_on_time_jumps():
+    smoother = LandmarkSmoother()
+    smoother.apply(landmarks(0.2), 1.0)
+    out = smoother.apply(landmarks(0.8), 0.5)     # time went backwards: start over
+    assert out[0, 0] == pytest.approx(0.8)
+    assert out[0, 3] == pytest.approx(0.7)
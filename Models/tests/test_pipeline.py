@@ -0,0 +1,79 @@
+"""DropOldestQueue and the threaded Pipeline."""
+import threading
+import time
+
+import pytest
+
+from exercise_core.pipeline import DropOldestQueue, Pipeline
+
+
+def test_put_latest_evicts_the_oldest():
+    q = DropOldestQueue(2)
+    for item in range(5):
+        q.put_latest(item)
+    assert q.dropped == 3
+    assert [q.get_nowait(), q.get_nowait()] == [3, 4]
+
+
+def test_put_latest_never_blocks_under_contention():
+    q = DropOldestQueue(1)
+
+    def producer():
+        for item in range(2000):
+            q.put_latest(item)
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert q.qsize() == 1
+    assert q.dropped == 4 * 2000 - 1
+
+
+def frames(count):
+    items = iter(range(count))
+    return lambda: next(items, None)
+
+
+def test_files_keep_every_frame_in_order():
+    rendered = []
+    stats = Pipeline(frames(200), lambda f: f * 2, rendered.append, drop_stale=False).run()
+    assert rendered == [f * 2 for f in range(200)]
+    assert stats["dropped_frames"] == 0
+
+
+def test_live_sources_skip_stale_frames():
+    def infer(frame):
+        time.sleep(0.002)
+        return frame
+
+    rendered = []
+    stats = Pipeline(frames(500), infer, rendered.append, drop_stale=True).run()
+    # The last frame always gets through; a slow stage only ever skips older ones
+    assert rendered == sorted(rendered) and rendered[-1] == 499
+    assert len(rendered) < 500
+    assert stats["dropped_frames"] == 500 - len(rendered)
+
+
+def test_render_false_stops_the_stream():
+    rendered = []
+
+    def render(packet):
+        rendered.append(packet)
+        return len(rendered) < 3
+
+    def read():
+        return 1
+
+    Pipeline(read, lambda f: f, render).run()
+    assert len(rendered) == 3
+
+
+def test_stage_errors_are_raised_from_run():
+    def infer(frame):
+        raise ValueError("inference failed")
+
+    with pytest.raises(ValueError, match="inference failed"):
+        Pipeline(frames(10), infer, lambda p: None, drop_stale=False).run()
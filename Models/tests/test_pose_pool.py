@@ -0,0 +1,229 @@
+"""PosePool load shedding, deadlines and worker restarts.
+
+The pool's process context is swapped for threads running the real _worker
+loop, with MediaPipe replaced by a Pose whose speed the test controls.
+"""
+import os
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+import pose_pool
+from exercise_core import pose as lazy
+from pose_pool import Overloaded, PosePool
+
+JPEG = cv2.imencode(".jpg", np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+
+
+class FakeProcess:
+    """A worker thread standing in for a process; terminate() only marks it dead."""
+
+    def __init__(self, target, args, name=None, daemon=None):
+        # Ready signals carry os.getpid(), which is the test process here
+        self.pid = os.getpid()
+        self.killed = False
+        self._thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread.is_alive() and not self.killed
+
+    def terminate(self):
+        self.killed = True
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+
+class FakePose:
+    def __init__(self, gate):
+        self.gate = gate
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        self.gate.wait()
+        landmark = SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=0.9)
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[landmark] * 33))
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Workers:
+    """The Poses the pool's workers create, and the gates that let them run."""
+
+    def __init__(self):
+        self.loading = threading.Event()
+        self.loading.set()
+        self.poses = []
+        self.gates = []
+
+    def create_pose(self, **options):
+        self.loading.wait()
+        gate = threading.Event()
+        gate.set()          # workers run freely until a test holds their gate
+        self.gates.append(gate)
+        self.poses.append(FakePose(gate))
+        return self.poses[-1]
+
+    def release(self):
+        self.loading.set()
+        for gate in self.gates:
+            gate.set()
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    workers = Workers()
+    monkeypatch.setattr(lazy, "create_pose", workers.create_pose)
+    return workers
+
+
+@pytest.fixture
+def make_pool(workers):
+    pools = []
+
+    def make(**kwargs):
+        pool = PosePool(workers=1, **kwargs)
+        pool._ctx = SimpleNamespace(Queue=queue.Queue, Process=FakeProcess)
+        pools.append(pool)
+        return pool
+
+    yield make
+    workers.release()
+    for pool in pools:
+        pool.close(timeout=1.0)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.01)
+
+
+def started(pool):
+    pool.start()
+    wait_for(lambda: pool.health()["status"] == "ok")
+    return pool
+
+
+def worker_health(pool):
+    return pool.health()["workers"][0]
+
+
+# ----------------------------- Requests -----------------------------
+def test_frames_come_back_as_landmark_arrays(make_pool):
+    pool = started(make_pool())
+    landmarks = pool.process("a", JPEG)
+    assert landmarks.shape == (33, 4) and landmarks[0, 3] == pytest.approx(0.9)
+    with pytest.raises(RuntimeError, match="could not decode"):
+        pool.process("a", b"not a jpeg")
+    health = worker_health(pool)
+    assert health["served"] == 2 and health["in_flight"] == 0
+    assert pool.health()["latency"]["count"] == 2
+
+
+def test_a_loading_worker_sheds(make_pool, workers):
+    workers.loading.clear()
+    pool = make_pool()
+    pool.start()
+    with pytest.raises(Overloaded, match="starting"):
+        pool.submit("a", JPEG)
+    assert pool.health()["status"] == "down"
+    workers.loading.set()
+    wait_for(lambda: pool.health()["status"] == "ok")
+    assert pool.process("a", JPEG) is not None
+
+
+def test_a_full_worker_sheds(make_pool, workers):
+    pool = started(make_pool(queue_depth=2))
+    workers.gates[0].clear()
+    futures = [pool.submit("a", JPEG) for _ in range(2)]
+    with pytest.raises(Overloaded, match="busy"):
+        pool.submit("a", JPEG)
+    assert worker_health(pool)["shed"] == 1
+    workers.gates[0].set()
+    assert all(f.result(1.0) is not None for f in futures)
+    assert worker_health(pool)["in_flight"] == 0
+
+
+# ----------------------------- Timeouts -----------------------------
+def test_timed_out_requests_stay_in_flight_until_the_worker_skips_them(make_pool, workers):
+    pool = started(make_pool(queue_depth=3, max_timeouts=10))
+    pose = workers.poses[0]
+    workers.gates[0].clear()
+    for _ in range(3):
+        with pytest.raises(Overloaded, match="timed out"):
+            pool.process("a", JPEG, timeout=0.05)
+    health = worker_health(pool)
+    assert health["timed_out"] == 3 and health["in_flight"] == 3
+    # The queue behind the stuck frame is full, so it cannot keep growing
+    with pytest.raises(Overloaded, match="busy"):
+        pool.submit("a", JPEG)
+
+    workers.gates[0].set()
+    wait_for(lambda: worker_health(pool)["in_flight"] == 0)
+    # Only the frame already being inferred ran; the expired ones were skipped
+    assert pose.calls == 1
+    assert worker_health(pool)["served"] == 0
+    assert pool.process("a", JPEG) is not None
+
+
+def test_expired_tasks_are_skipped_by_the_worker(workers):
+    tasks, results = queue.Queue(), queue.Queue()
+    thread = threading.Thread(target=pose_pool._worker, args=(0, tasks, results, {}), daemon=True)
+    thread.start()
+    tasks.put((1, "a", JPEG, time.time() - 1.0))
+    tasks.put((2, "a", JPEG, time.time() + 60.0))
+    tasks.put(None)
+    thread.join(5.0)
+    assert results.get_nowait()[0] is None          # ready
+    assert results.get_nowait() == (1, None, pose_pool.EXPIRED)
+    request_id, landmarks, error = results.get_nowait()
+    assert request_id == 2 and error is None and landmarks.shape == (33, 4)
+    assert workers.poses[0].calls == 1
+
+
+def test_a_hung_worker_is_restarted(make_pool, workers):
+    pool = started(make_pool(queue_depth=4, max_timeouts=2))
+    workers.gates[0].clear()
+    pending = pool.submit("b", JPEG, timeout=60.0)
+    for _ in range(2):
+        with pytest.raises(Overloaded, match="timed out"):
+            pool.process("a", JPEG, timeout=0.05)
+    assert not worker_health(pool)["alive"]
+
+    wait_for(lambda: worker_health(pool)["restarts"] == 1 and pool.health()["status"] == "ok")
+    # Requests queued on the hung worker fail rather than wait out their timeout
+    with pytest.raises(Overloaded, match="restarted"):
+        pending.result(1.0)
+    health = worker_health(pool)
+    assert health["in_flight"] == 0 and health["timed_out"] == 2
+    assert pool.process("a", JPEG) is not None      # the new worker's gate is open
+
+
+def test_an_answer_in_time_clears_the_timeout_streak(make_pool, workers):
+    pool = started(make_pool(max_timeouts=2))
+    workers.gates[0].clear()
+    with pytest.raises(Overloaded):
+        pool.process("a", JPEG, timeout=0.05)
+    workers.gates[0].set()
+    wait_for(lambda: worker_health(pool)["in_flight"] == 0)
+    assert pool.process("a", JPEG) is not None
+    workers.gates[0].clear()
+    with pytest.raises(Overloaded):
+        pool.process("a", JPEG, timeout=0.05)
+    health = worker_health(pool)
+    assert health["alive"] and health["timed_out"] == 2 and health["restarts"] == 0
@@ -0,0 +1,73 @@
+"""LatencyHistogram accuracy and the Profiler / NULL_PROFILER pair."""
+import io
+
+import numpy as np
+import pytest
+
+from exercise_core.profiler import NULL_PROFILER, LatencyHistogram, Profiler, create_profiler
+
+# Bucket width: 20 per decade, so the bucket centre is within 10**(1/40) of any sample in it
+BUCKET_ERROR = 10 ** (1 / 40) - 1
+
+
+@pytest.mark.parametrize("p", [50, 90, 95, 99])
+def test_percentiles_within_one_bucket(p):
+    samples = np.random.default_rng(0).lognormal(mean=np.log(0.02), sigma=0.6, size=20000)
+    histogram = LatencyHistogram()
+    for s in samples:
+        histogram.record(float(s))
+    assert histogram.percentile(p) == pytest.approx(np.percentile(samples, p), rel=BUCKET_ERROR + 0.01)
+
+
+def test_summary_fields():
+    histogram = LatencyHistogram()
+    for ms in (1, 2, 3, 4, 100):
+        histogram.record(ms / 1000)
+    d = histogram.as_dict()
+    assert d["count"] == 5
+    assert d["mean_ms"] == pytest.approx(22.0)
+    assert d["max_ms"] == pytest.approx(100.0)
+    assert d["p99_ms"] <= d["max_ms"]
+    assert d["p50_ms"] == pytest.approx(3.0, rel=BUCKET_ERROR)
+
+
+def test_extremes_land_in_the_end_buckets():
+    histogram = LatencyHistogram()
+    histogram.record(0.0)
+    histogram.record(1e6)
+    assert histogram.counts[0] == 1 and histogram.counts[-1] == 1
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_profiler_times_stages_and_frames():
+    profiler = Profiler()
+    for _ in range(5):
+        with profiler.stage("pose"):
+            pass
+        profiler.record("decode", 0.004)
+        profiler.frame_done()
+    report = profiler.report()
+    assert report["frames"] == 5 and report["frame"]["count"] == 5
+    assert report["stages"]["pose"]["count"] == 5
+    assert report["stages"]["decode"]["p50_ms"] == pytest.approx(4.0, rel=BUCKET_ERROR)
+    assert profiler.stage("pose") is profiler.stage("pose")
+    text = profiler.format_report()
+    assert "decode" in text and "pose" in text and text.startswith("profile: 5 frames")
+
+
+def test_periodic_report_goes_to_out():
+    out = io.StringIO()
+    profiler = Profiler(report_every=1e-9, out=out)
+    profiler.frame_done()
+    assert out.getvalue().startswith("profile: 1 frames")
+
+
+def test_disabled_profiler_is_a_no_op():
+    profiler = create_profiler(False)
+    assert profiler is NULL_PROFILER and not profiler.enabled
+    with profiler.stage("pose"):
+        pass
+    profiler.record("pose", 1.0)
+    profiler.frame_done()
+    assert profiler.report() == {} and profiler.format_report() == ""
+    assert create_profiler(True).enabled
@@ -0,0 +1,109 @@
+"""RoiTracker box fitting and crop-to-frame landmark mapping."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from exercise_core.angles import NUM_LANDMARKS
+from exercise_core.roi import RoiTracker
+
+WIDTH, HEIGHT = 200, 160
+
+
+def person(x0, y0, x1, y1, visibility=0.9):
+    """(33, 4) landmarks spread evenly over a normalized box."""
+    landmarks = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, 0] = np.linspace(x0, x1, NUM_LANDMARKS)
+    landmarks[:, 1] = np.linspace(y0, y1, NUM_LANDMARKS)
+    landmarks[:, 2] = 0.0
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+def frame():
+    """RGB image whose pixels encode their own coordinates, so a fake pose can tell where a crop came from."""
+    image = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    image[..., 0] = np.arange(WIDTH)[None, :]
+    image[..., 1] = np.arange(HEIGHT)[:, None]
+    return image
+
+
+class FakePose:
+    """Finds `person` (full-frame normalized) in whatever image it gets."""
+
+    def __init__(self, landmarks, find_in_crops=True):
+        self.landmarks = landmarks
+        self.find_in_crops = find_in_crops
+        self.shapes = []
+
+    def process(self, image):
+        self.shapes.append(image.shape[:2])
+        height, width = image.shape[:2]
+        x0, y0 = int(image[0, 0, 0]), int(image[0, 0, 1])
+        if (height, width) != (HEIGHT, WIDTH) and not self.find_in_crops:
+            return SimpleNamespace(pose_landmarks=None)
+        # Express the full-frame landmarks in this image's normalized coordinates
+        points = [SimpleNamespace(x=(x * WIDTH - x0) / width, y=(y * HEIGHT - y0) / height, z=z, visibility=v)
+                  for x, y, z, v in self.landmarks.tolist()]
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=points))
+
+
+def test_box_is_padded_around_the_person():
+    tracker = RoiTracker(padding=0.5, min_size=0.0)
+    tracker.update(person(0.4, 0.3, 0.6, 0.7))
+    np.testing.assert_allclose(tracker.box, (0.3, 0.1, 0.7, 0.9), atol=1e-6)
+
+
+def test_box_is_clipped_and_kept_above_min_size():
+    tracker = RoiTracker(padding=0.5, min_size=0.4)
+    tracker.update(person(0.0, 0.45, 0.1, 0.55))
+    x0, y0, x1, y1 = tracker.box
+    assert x0 == 0.0
+    assert y1 - y0 == pytest.approx(0.4)
+
+
+def test_box_is_sticky_until_the_person_nears_an_edge():
+    tracker = RoiTracker(padding=0.5, min_size=0.0)
+    tracker.update(person(0.4, 0.3, 0.6, 0.7))
+    box = tracker.box
+    tracker.update(person(0.41, 0.3, 0.61, 0.7))
+    assert tracker.box == box
+    tracker.update(person(0.5, 0.3, 0.7, 0.7))
+    assert tracker.box != box
+
+
+def test_box_is_refitted_when_the_person_gets_small():
+    tracker = RoiTracker(padding=0.5, min_size=0.0)
+    tracker.update(person(0.3, 0.2, 0.7, 0.8))
+    tracker.update(person(0.48, 0.45, 0.52, 0.55))
+    x0, y0, x1, y1 = tracker.box
+    assert x1 - x0 < 0.2
+
+
+def test_few_visible_landmarks_drop_the_box():
+    tracker = RoiTracker()
+    tracker.update(person(0.4, 0.3, 0.6, 0.7))
+    tracker.update(person(0.4, 0.3, 0.6, 0.7, visibility=0.1))
+    assert tracker.box is None
+
+
+def test_crop_landmarks_map_back_to_the_full_frame():
+    expected = person(0.4, 0.3, 0.6, 0.7)
+    pose = FakePose(expected)
+    tracker = RoiTracker()
+    tracker.process(pose, frame())          # full frame, sets the box
+    results = tracker.process(pose, frame())  # crop
+    assert pose.shapes[0] == (HEIGHT, WIDTH) and pose.shapes[1] != (HEIGHT, WIDTH)
+    got = np.array([(lm.x, lm.y) for lm in results.pose_landmarks.landmark])
+    np.testing.assert_allclose(got, expected[:, :2], atol=1e-5)
+    assert (tracker.full_frame_runs, tracker.crop_runs) == (1, 1)
+
+
+def test_lost_person_retries_the_full_frame():
+    pose = FakePose(person(0.4, 0.3, 0.6, 0.7), find_in_crops=False)
+    tracker = RoiTracker()
+    tracker.process(pose, frame())
+    results = tracker.process(pose, frame())
+    assert results.pose_landmarks is not None
+    assert pose.shapes[-1] == (HEIGHT, WIDTH)
+    assert (tracker.full_frame_runs, tracker.crop_runs) == (2, 1)
@@ -0,0 +1,72 @@
+"""AdaptiveScheduler back-off, wake-up and extrapolation."""
+import numpy as np
+import pytest
+
+from exercise_core.angles import NUM_LANDMARKS
+from exercise_core.scheduler import AdaptiveScheduler
+
+
+def body(offset=0.0):
+    landmarks = np.full((NUM_LANDMARKS, 4), 0.5, dtype=np.float32)
+    landmarks[:, 0] += offset
+    landmarks[:, 3] = 0.9
+    return landmarks
+
+
+def run(scheduler, positions, fps=30.0, margin=None):
+    """Feed one x offset per frame; returns the indices of inferred frames."""
+    inferred = []
+    for i, offset in enumerate(positions):
+        t = i / fps
+        if scheduler.due():
+            scheduler.observe(body(offset), t, margin)
+            inferred.append(i)
+        else:
+            scheduler.predict(t)
+    return inferred
+
+
+def test_still_body_backs_off_to_max_interval():
+    scheduler = AdaptiveScheduler(max_interval=6)
+    inferred = run(scheduler, [0.0] * 60)
+    gaps = np.diff(inferred)
+    assert gaps.max() == 6
+    assert list(gaps[:4]) == [1, 2, 4, 6]
+    assert scheduler.stats()["inferred"] == len(inferred)
+    assert scheduler.stats()["skipped"] == 60 - len(inferred)
+
+
+def test_motion_infers_every_frame():
+    scheduler = AdaptiveScheduler()
+    assert run(scheduler, np.linspace(0, 0.3, 30)) == list(range(30))
+
+
+def test_near_threshold_infers_every_frame():
+    scheduler = AdaptiveScheduler(near_margin=0.3)
+    assert run(scheduler, [0.0] * 30, margin=0.1) == list(range(30))
+
+
+def test_nearing_snaps_back():
+    scheduler = AdaptiveScheduler()
+    run(scheduler, [0.0] * 20)
+    assert scheduler.interval > 1
+    scheduler.nearing(0.05)
+    assert scheduler.interval == 1
+
+
+def test_predict_extrapolates_within_the_horizon():
+    scheduler = AdaptiveScheduler(max_extrapolate=0.5)
+    scheduler.observe(body(0.0), 0.0)
+    scheduler.observe(body(0.01), 0.1)     # 0.1 units per second
+    np.testing.assert_allclose(scheduler.predict(0.2)[:, 0], 0.51 + 0.01, atol=1e-6)
+    # Never further than max_extrapolate past the last inference
+    np.testing.assert_allclose(scheduler.predict(5.0)[:, 0], 0.51 + 0.05, atol=1e-6)
+    # Visibility is carried over untouched
+    assert scheduler.predict(0.2)[:, 3] == pytest.approx(0.9)
+
+
+def test_reset_forces_inference():
+    scheduler = AdaptiveScheduler()
+    run(scheduler, [0.0] * 20)
+    scheduler.reset()
+    assert scheduler.due() and scheduler.interval == 1
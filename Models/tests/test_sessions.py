@@ -0,0 +1,198 @@
+"""Per-client sessions: Session, the in-process LRU/TTL store and the Redis store."""
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+import sessions
+from exercise_core import synthetic
+from sessions import AUTO, REST, RedisSessionStore, Session, SessionStore, create_store, exercise_key
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions.time, "time", clock)
+    return clock
+
+
+def count_reps(session, name, reps):
+    values, visibility, _ = synthetic.rep_trace(name, reps=reps).features()
+    for v, vis in zip(values, visibility):
+        session.step(v, vis, 0.0)
+
+
+# ----------------------------- Session -----------------------------
+def test_exercise_key():
+    assert exercise_key("Squats") == "squat"
+    assert exercise_key(None) == AUTO
+    assert exercise_key("Rest") == REST
+    with pytest.raises(KeyError, match="Unknown exercise"):
+        exercise_key("cartwheel")
+
+
+def test_new_session_detects_the_exercise():
+    session = Session("a")
+    assert session.exercise == AUTO and not session.resting
+    count_reps(session, "squat", 6)
+    assert session.state() == {"session": "a", "exercise": AUTO, "reps": 6, "stage": "up", "detected": "squat"}
+
+
+def test_select_restarts_the_count_only_on_a_change():
+    session = Session("a", "pushup")
+    count_reps(session, "pushup", 3)
+    session.select("Pushup")
+    assert session.state()["reps"] == 3
+    session.select("squat")
+    assert session.state()["reps"] == 0
+    session.select(REST)
+    assert session.resting and session.state()["reps"] == 0
+
+
+# ----------------------------- In-process store -----------------------------
+def test_store_keeps_one_session_per_id(clock):
+    store = SessionStore()
+    with store.session("a", "pushup") as session:
+        count_reps(session, "pushup", 2)
+    with store.session("a") as again:
+        assert again is session and again.state()["reps"] == 2
+    with store.session("b") as other:
+        assert other is not session and other.exercise == AUTO
+    assert len(store) == 2
+
+
+def test_least_recently_used_is_evicted_first(clock):
+    store = SessionStore(max_sessions=2)
+    for session_id in ("a", "b"):
+        with store.session(session_id):
+            pass
+    with store.session("a"):
+        pass
+    with store.session("c"):
+        pass
+    assert len(store) == 2 and store.evicted == 1
+    with store.session("b", "pushup") as session:
+        assert session.state()["reps"] == 0     # "b" was evicted and starts afresh
+    assert store.evicted == 2                   # ... which pushed out "a"
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(ttl=60)
+    with store.session("a"):
+        pass
+    clock.now += 30
+    with store.session("b"):
+        pass
+    clock.now += 31
+    with store.session("b"):
+        pass
+    assert len(store) == 1 and store.evicted == 1
+    assert store.stats()["evicted"] == 1
+
+
+def test_drop(clock):
+    store = SessionStore()
+    with store.session("a"):
+        pass
+    assert store.drop("a") and not store.drop("a")
+    assert len(store) == 0
+
+
+def test_frames_of_one_session_are_serialized():
+    store = SessionStore()
+    inside, overlaps = [0], []
+
+    def frame():
+        with store.session("a"):
+            inside[0] += 1
+            overlaps.append(inside[0])
+            threading.Event().wait(0.001)
+            inside[0] -= 1
+
+    threads = [threading.Thread(target=frame) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(overlaps) == 1
+
+
+# ----------------------------- Redis store -----------------------------
+class FakeRedis:
+    """The handful of redis.Redis calls RedisSessionStore makes, in memory."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.lock_calls = []
+        self._locks = {}
+
+    @contextmanager
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        self.lock_calls.append((name, timeout, blocking_timeout))
+        with self._locks.setdefault(name, threading.Lock()):
+            yield
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    module = SimpleNamespace(Redis=SimpleNamespace(from_url=lambda url: client))
+    monkeypatch.setattr(sessions, "_redis", lambda: module)
+    return client
+
+
+def test_redis_sessions_survive_across_workers(fake_redis):
+    # Two stores stand for two web processes sharing one Redis
+    first = RedisSessionStore("redis://x", ttl=120, lock_timeout=12.0)
+    second = RedisSessionStore("redis://x", ttl=120, lock_timeout=12.0)
+    with first.session("a", "pushup") as session:
+        count_reps(session, "pushup", 2)
+    with second.session("a") as session:
+        assert session.state()["reps"] == 2
+        count_reps(session, "pushup", 1)
+    with first.session("a") as session:
+        assert session.state()["reps"] == 3
+    key = "exercise:session:a"
+    assert fake_redis.expiry[key] == 120
+    assert set(fake_redis.lock_calls) == {(key + ":lock", 12.0, 12.0)}
+    assert first.drop("a") and not second.drop("a")
+
+
+def test_create_store_picks_the_backend(fake_redis):
+    assert isinstance(create_store(None), SessionStore)
+    store = create_store("redis://x", lock_timeout=20.0)
+    assert isinstance(store, RedisSessionStore) and store.lock_timeout == 20.0
+
+
+def test_missing_redis_package_is_explained(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+
+    def no_redis(name, *args, **kwargs):
+        if name == "redis":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_redis)
+    with pytest.raises(RuntimeError, match="pip install redis"):
+        RedisSessionStore("redis://x")
@@ -0,0 +1,64 @@
+"""Trace extraction geometry and the trace cache round trip."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from exercise_core import traces  # noqa: E402
+
+
+class RecordingPose:
+    """Stands in for MediaPipe: remembers what it was given, finds nobody."""
+
+    def __init__(self):
+        self.shapes = []
+
+    def process(self, rgb):
+        self.shapes.append(rgb.shape)
+        return SimpleNamespace(pose_landmarks=None)
+
+
+@pytest.fixture
+def widescreen(tmp_path):
+    path = str(tmp_path / "wide.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (1280, 720))
+    for i in range(12):
+        writer.write(np.full((720, 1280, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_extract_fits_frames_instead_of_stretching(widescreen):
+    pose = RecordingPose()
+    trace = traces.extract_trace(widescreen, traces.trace_settings(size=(640, 480)), pose=pose)
+    assert len(trace) == 12
+    assert set(pose.shapes) == {(360, 640, 3)}
+    assert np.isnan(trace.landmarks).all()
+    np.testing.assert_allclose(np.diff(trace.times), 0.1, atol=1e-6)
+
+
+def test_extract_without_size_keeps_source_resolution(widescreen):
+    pose = RecordingPose()
+    traces.extract_trace(widescreen, traces.trace_settings(), pose=pose)
+    assert set(pose.shapes) == {(720, 1280, 3)}
+
+
+def test_settings_carry_the_trace_version():
+    assert traces.trace_settings()["version"] == traces.TRACE_VERSION
+
+
+def test_cache_round_trip_and_version_miss(widescreen, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    pose = RecordingPose()
+    first = traces.get_trace(widescreen, directory=cache, pose=pose, size=(640, 480))
+    second = traces.get_trace(widescreen, directory=cache, pose=pose, size=(640, 480))
+    assert len(pose.shapes) == 12    # the second call was served from the cache
+    assert isinstance(second.landmarks, np.memmap)
+    np.testing.assert_array_equal(first.times, second.times)
+
+    # Traces written by an older version are rebuilt, not reused
+    monkeypatch.setattr(traces, "TRACE_VERSION", traces.TRACE_VERSION + 1)
+    traces.get_trace(widescreen, directory=cache, pose=pose, size=(640, 480))
+    assert len(pose.shapes) == 24
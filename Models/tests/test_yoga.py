@@ -0,0 +1,126 @@
+"""PoseHoldCounter and FlowMatcher over synthetic pose sequences."""
+import numpy as np
+import pytest
+
+from exercise_core import synthetic
+from exercise_core.angles import FEATURE_INDEX, NUM_FEATURES
+from exercise_core.flow import FLOWS, FlowMatcher
+from exercise_core.yoga import POSES, PoseHoldCounter, PoseLibrary, base_name
+
+FPS = 30.0
+VISIBILITY = np.full(NUM_FEATURES, synthetic.VISIBLE, dtype=np.float32)
+
+
+def pose_frame(pose):
+    """Features that sit exactly on a pose's targets; everything else neutral and standing."""
+    values = np.full(NUM_FEATURES, synthetic.NEUTRAL_ANGLE, dtype=np.float32)
+    for name, value in synthetic.NEUTRAL.items():
+        values[FEATURE_INDEX[name]] = value
+    values[FEATURE_INDEX["torso_tilt"]] = 0.0
+    for feature, (target, _) in POSES[pose].targets.items():
+        values[FEATURE_INDEX[feature]] = target
+    return values
+
+
+def sequence(steps):
+    """[(pose or None, seconds)] -> list of (values, t); None is a frame that matches nothing."""
+    nothing = np.zeros(NUM_FEATURES, dtype=np.float32)
+    frames, t = [], 0.0
+    for pose, seconds in steps:
+        values = nothing if pose is None else pose_frame(pose)
+        for _ in range(int(round(seconds * FPS))):
+            frames.append((values, t))
+            t += 1 / FPS
+    return frames
+
+
+@pytest.fixture(scope="module")
+def library():
+    return PoseLibrary()
+
+
+@pytest.mark.parametrize("pose", sorted(POSES))
+def test_templates_classify_as_themselves(library, pose):
+    assert base_name(library.classify(pose_frame(pose), VISIBILITY)) == base_name(pose)
+
+
+def test_hold_counts_once_per_hold_period(library):
+    counter = PoseHoldCounter(library, pose="tadasana", hold=5.0)
+    completed = [counter.step(v, VISIBILITY, t)[1] for v, t in sequence([("tadasana", 11.0)])]
+    assert sum(completed) == 2
+    assert counter.reps == {"tadasana": 2}
+
+
+def test_hold_restarts_when_pose_breaks(library):
+    counter = PoseHoldCounter(library, pose="tadasana", hold=5.0)
+    for v, t in sequence([("tadasana", 4.0), (None, 1.0), ("tadasana", 4.0)]):
+        counter.step(v, VISIBILITY, t)
+    assert counter.total == 0
+
+
+def test_interrupt_drops_the_current_hold(library):
+    counter = PoseHoldCounter(library, pose="tadasana", hold=5.0)
+    frames = sequence([("tadasana", 8.0)])
+    for v, t in frames[:120]:
+        counter.step(v, VISIBILITY, t)
+    counter.interrupt()
+    assert counter.held(frames[120][1]) == 0.0
+    for v, t in frames[120:]:
+        counter.step(v, VISIBILITY, t)
+    assert counter.total == 0
+
+
+def test_any_pose_counts_each_pose_and_folds_mirrors(library):
+    counter = PoseHoldCounter(library, hold=3.0)
+    for v, t in sequence([("vrikshasana", 3.5), ("vrikshasana_mirror", 3.5), ("balasana", 3.5)]):
+        counter.step(v, VISIBILITY, t)
+    assert counter.reps == {"vrikshasana": 2, "balasana": 1}
+
+
+@pytest.mark.parametrize("name", sorted(FLOWS))
+def test_flow_cycles_at_expected_tempo(library, name):
+    flow = FLOWS[name]
+    cycle = list(zip(flow.poses, flow.seconds))
+    matcher = FlowMatcher(flow, library=library)
+    records = []
+    # Three cycles, then back into the first step so the third one closes
+    for v, t in sequence(cycle * 3 + [(flow.poses[0], 1.0)]):
+        records.extend(record for _, record in matcher.step(v, VISIBILITY, t))
+    assert matcher.completed[0] == 3
+    assert [r["cycle"] for r in records] == [1, 2, 3]
+    for record in records:
+        assert record["tempo"] == pytest.approx(1.0, abs=0.05)
+        assert [s["pose"] for s in record["steps"]] == flow.poses
+
+
+def test_flow_does_not_count_a_skipped_step(library):
+    flow = FLOWS["warrior"]
+    cycle = list(zip(flow.poses, flow.seconds))
+    matcher = FlowMatcher(flow, library=library)
+    for v, t in sequence((cycle[:2] + cycle[3:]) * 2 + [(flow.poses[0], 1.0)]):
+        matcher.step(v, VISIBILITY, t)
+    assert matcher.completed[0] == 0
+
+
+def test_flow_tracks_users_independently(library):
+    flow = FLOWS["warrior"]
+    matcher = FlowMatcher(flow, users=2, library=library)
+    frames = sequence(list(zip(flow.poses, flow.seconds)) * 2 + [(flow.poses[0], 1.0)])
+    still = pose_frame(flow.poses[0])
+    for v, t in frames:
+        matcher.step(np.stack([v, still]), np.stack([VISIBILITY, VISIBILITY]), t)
+    assert list(matcher.completed) == [2, 0]
+
+
+def test_check_tadasana_pose_accepts_landmarks_arrays_and_features():
+    from types import SimpleNamespace
+
+    from exercise_core.angles import compute_features
+    from yogaModel import check_tadasana_pose
+
+    trace = synthetic.landmark_trace(61, tempo=2.0)     # frame 0 straight, frame 30 folded
+    for frame, expected in ((trace.landmarks[0], True), (trace.landmarks[30], False)):
+        objects = [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in frame.tolist()]
+        assert check_tadasana_pose(objects) is expected
+        assert check_tadasana_pose(frame) is expected
+        assert check_tadasana_pose(compute_features(frame)) is expected
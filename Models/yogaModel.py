@@ -1,119 +1,197 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import time
-
-# Initialize MediaPipe
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
-
-# Angle calculation function
-def calculate_angle(a, b, c):
-    a, b, c = np.array(a), np.array(b), np.array(c)
-    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-    angle = np.abs(radians * 180.0 / np.pi)
-    return 360 - angle if angle > 180.0 else angle
+import argparse
+from exercise_core import pose as lazy
+from exercise_core.angles import compute_features, landmarks_to_array
+from exercise_core.flow import FLOWS, FlowMatcher
+from exercise_core.frames import CaptureClock
+from exercise_core.headless import print_event
+from exercise_core.profiler import create_profiler
+from exercise_core.scheduler import AdaptiveScheduler
+from exercise_core.writer import AsyncVideoWriter
+from exercise_core.yoga import POSES, PoseHoldCounter, PoseLibrary
+
+# MediaPipe and OpenCV are loaded by main(), so check_tadasana_pose can be
+# imported without opening a camera window.
+
+# Every asana is a template in exercise_core.yoga; a frame is scored against
+# all of them with one matrix operation.
+_library = PoseLibrary()
+
 
 # Tadasana pose checking function
+# landmarks = results.pose_landmarks.landmark, as before; a (33, 4) landmark
+# array or a (values, visibility) pair from compute_features also works
 def check_tadasana_pose(landmarks):
-    # Left and right arms
-    l_sh = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-            landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-    l_el = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-            landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-    l_wr = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-            landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-
-    r_sh = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-            landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-    r_el = [landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].x,
-            landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].y]
-    r_wr = [landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].x,
-            landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y]
-
-    # Arm angles
-    left_arm_angle = calculate_angle(l_sh, l_el, l_wr)
-    right_arm_angle = calculate_angle(r_sh, r_el, r_wr)
-    arms_straight = 150 <= left_arm_angle <= 180 and 150 <= right_arm_angle <= 180
-
-    # Foot keypoints
-    l_ank = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x,
-             landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-    l_heel = [landmarks[mp_pose.PoseLandmark.LEFT_HEEL.value].x,
-              landmarks[mp_pose.PoseLandmark.LEFT_HEEL.value].y]
-    l_toe = [landmarks[mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].x,
-             landmarks[mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].y]
-
-    r_ank = [landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].x,
-             landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].y]
-    r_heel = [landmarks[mp_pose.PoseLandmark.RIGHT_HEEL.value].x,
-              landmarks[mp_pose.PoseLandmark.RIGHT_HEEL.value].y]
-    r_toe = [landmarks[mp_pose.PoseLandmark.RIGHT_FOOT_INDEX.value].x,
-             landmarks[mp_pose.PoseLandmark.RIGHT_FOOT_INDEX.value].y]
-
-    # Toe lift angles
-    left_toe_angle = calculate_angle(l_ank, l_heel, l_toe)
-    right_toe_angle = calculate_angle(r_ank, r_heel, r_toe)
-
-    # Toes must be lifted (angle > threshold)
-    toe_lift_ok = left_toe_angle > 30 and right_toe_angle > 30
-
-    return arms_straight and toe_lift_ok
-
-# Initialize video
-cap = cv2.VideoCapture(r"C:\Users\harsh\OneDrive\Desktop\Self-Care-Chatbot\Data\pushup_data\tadasana.webm")
-
-# Tracking variables
-reps = 0
-pose_held = False
-start_time = None
-min_pose_duration = 5  # seconds
-
-# Pose detection
-with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.flip(frame, 1)
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-
-        results = pose.process(image)
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        try:
-            landmarks = results.pose_landmarks.landmark
-            is_tadasana = check_tadasana_pose(landmarks)
-
-            if is_tadasana:
-                if not pose_held:
-                    start_time = time.time()
-                    pose_held = True
-                elif time.time() - start_time >= min_pose_duration:
-                    reps += 1
-                    print(f"✅ Tadasana held for {min_pose_duration} seconds | Reps: {reps}")
-                    pose_held = False  # Reset for next rep
-            else:
-                pose_held = False
-                start_time = None
-
-            mp_drawing.draw_landmarks(image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-        except Exception as e:
-            print("Pose detection error:", e)
-
-        # Overlay rep count
-        cv2.putText(image, f"Tadasana Reps: {reps}", (20, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-        image = cv2.resize(image, (640, 480))
-        cv2.imshow('Yoga Pose: Tadasana', image)
-
-        if cv2.waitKey(10) & 0xFF == ord('q'):
-            break
-
-cap.release()
-cv2.destroyAllWindows()
+    # Arms straight (150-180) and toes lifted (ankle-heel-toe over 30)
+    if isinstance(landmarks, tuple) and len(landmarks) == 2:
+        values = landmarks[0]
+    else:
+        array = landmarks if hasattr(landmarks, "shape") else landmarks_to_array(landmarks)
+        values, _ = compute_features(array)
+    return _library.matches("tadasana", values)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Yoga pose hold counter")
+    parser.add_argument("--source", default="0", help="camera index or path to a video file")
+    parser.add_argument("--pose", default="tadasana",
+                        help="pose to count, e.g. tadasana or vrikshasana; 'any' counts every recognised pose")
+    parser.add_argument("--hold", type=float, default=5, help="seconds a pose must be held to count")
+    parser.add_argument("--flow", choices=sorted(FLOWS),
+                        help="also follow this pose sequence: current step, step timing and completed cycles")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window; print rep events as JSON lines")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="skip pose inference while the body is still")
+    parser.add_argument("--output", help="write annotated video to this file (runs on a background thread)")
+    parser.add_argument("--output-every", type=int, default=1, help="keep every Nth frame in --output")
+    parser.add_argument("--profile", nargs="?", type=float, const=0, metavar="SECONDS",
+                        help="time each loop stage; report on exit, or every SECONDS if given")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = int(args.source) if str(args.source).isdigit() else args.source
+    try:
+        counter = PoseHoldCounter(_library, pose=None if args.pose == "any" else args.pose, hold=args.hold)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+    title = "Yoga" if counter.pose is None else POSES[counter.pose].title
+    flow = FlowMatcher(args.flow, library=_library) if args.flow else None
+
+    # Initialize MediaPipe
+    cv2 = lazy.cv2()
+    mp_drawing = lazy.mp_drawing()
+    mp_pose = lazy.mp_pose()
+
+    # Initialize video
+    cap = cv2.VideoCapture(source)
+    # Hold time is measured on the capture clock so recordings can run faster than realtime
+    clock = CaptureClock(cap, live=isinstance(source, int))
+    writer = None
+    if args.output:
+        writer = AsyncVideoWriter(args.output, fps=cap.get(cv2.CAP_PROP_FPS) or 30, every=args.output_every)
+    frame_index = 0
+
+    # Tracking variables
+    landmark_array = None
+    results = None
+    current = None
+    scheduler = AdaptiveScheduler() if args.adaptive else None
+    profiler = create_profiler(args.profile is not None, report_every=args.profile or None)
+
+    # Pose detection
+    with lazy.get_pose() as pose:
+        while cap.isOpened():
+            with profiler.stage("decode"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            now = clock()
+
+            with profiler.stage("flip"):
+                frame = cv2.flip(frame, 1)
+
+            try:
+                detected = True
+                if scheduler is None or scheduler.due():
+                    with profiler.stage("convert"):
+                        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                        image.flags.writeable = False
+                    with profiler.stage("pose"):
+                        results = pose.process(image)
+                    detected = bool(results.pose_landmarks)
+                    if not detected:
+                        # Nobody in frame: drop the hold and the motion model, count nothing
+                        if scheduler is not None:
+                            scheduler.reset()
+                        counter.interrupt()
+                        current = None
+                    else:
+                        landmark_array = landmarks_to_array(results.pose_landmarks.landmark, landmark_array)
+                        if scheduler is not None:
+                            scheduler.observe(landmark_array, now)
+                else:
+                    # Still body: reuse extrapolated landmarks instead of running inference
+                    landmark_array = scheduler.predict(now)
+                if detected:
+                    with profiler.stage("check"):
+                        values, visibility = compute_features(landmark_array)
+                        current, completed = counter.step(values, visibility, now)
+                        cycles = flow.step(values, visibility, now) if flow is not None else ()
+
+                    for _, cycle in cycles:
+                        if args.headless:
+                            print_event(dict(cycle, event="flow_cycle", frame=frame_index))
+                        else:
+                            print(f"✅ {flow.flow.title} cycle {cycle['cycle']} in {cycle['duration_s']:.1f}s")
+
+                    if completed:
+                        reps = counter.reps[current]
+                        if args.headless:
+                            print_event({"event": "rep", "frame": frame_index, "pose": current, "reps": reps})
+                        else:
+                            print(f"✅ {POSES[current].title} held for {args.hold:g} seconds | Reps: {reps}")
+
+            except Exception as e:
+                if not args.headless:
+                    print("Pose detection error:", e)
+
+            # Nothing is drawn unless a window or the output file will show it
+            keep = writer is not None and writer.wants(frame_index)
+            draw = not args.headless or keep
+            frame_index += 1
+            profiler.frame_done()
+            if not draw:
+                continue
+
+            with profiler.stage("draw"):
+                if results is not None and results.pose_landmarks:
+                    # Draw on the flipped BGR frame; no need to convert the RGB copy back
+                    mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+
+                # Overlay rep count and the pose being held
+                cv2.putText(frame, f"{title} Reps: {counter.total}", (20, 40),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                if current is not None:
+                    cv2.putText(frame, f"{POSES[current].title}: {counter.held(now):.0f}s", (20, 80),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+                if flow is not None:
+                    state = flow.state(0, now)
+                    cv2.putText(frame, f"{flow.flow.title} {state['step'] + 1}/{len(flow.flow)} "
+                                       f"{state['title']} {state['in_step_s']:.0f}/{state['expected_s']:.0f}s "
+                                       f"cycles {state['cycles']}", (20, 120),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+                frame = cv2.resize(frame, (640, 480))
+                if keep:
+                    writer.write(frame)
+            if args.headless:
+                continue
+            with profiler.stage("display"):
+                cv2.imshow(f"Yoga Pose: {title}", frame)
+                key = cv2.waitKey(10) & 0xFF
+
+            if key == ord('q'):
+                break
+
+    if writer is not None:
+        writer.close()
+    cap.release()
+    if args.headless:
+        summary = {"event": "summary", "frames": frame_index, "reps": counter.total, "poses": counter.reps}
+        if flow is not None:
+            summary["flow"] = {"name": flow.flow.name, "cycles": int(flow.completed[0])}
+        if scheduler is not None:
+            summary["scheduler"] = scheduler.stats()
+        if profiler.enabled:
+            summary["profile"] = profiler.report()
+        print_event(summary)
+    else:
+        if profiler.enabled:
+            print(profiler.format_report())
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""sys.path setup for the web app.
+
+The server shares exercise_core with the webcam scripts in Models/.  Entry
+points (app.py, exercise_logic.py) call add_models_dir() before importing
+it; sessions.py and pose_pool.py rely on that having happened.  Pose
+workers are spawned with the parent's sys.path, so they need nothing more.
+"""
+import os
+import sys
+
+MODELS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models"))
+
+
+def add_models_dir():
+    """Make Models/ importable; safe to call more than once."""
+    if MODELS_DIR not in sys.path:
+        sys.path.insert(0, MODELS_DIR)
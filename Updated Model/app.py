@@ -1,16 +1,33 @@
-from flask import Flask, render_template, Response, request, jsonify
-import cv2
-import numpy as np
-import mediapipe as mp
-from exercise_logic import Pushup  # import other functions as needed
+import _paths
+_paths.add_models_dir()
+
+from flask import Flask, render_template, request, jsonify
+import binascii
+import os
+import time
+from sessions import create_store, exercise_key, new_session_id
+from pose_pool import Overloaded, PosePool
+from exercise_core.angles import compute_features
 import base64
 
 app = Flask(__name__)
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
 
-stage = None
-rep_count = 0
+# Pose inference runs in worker processes, one Pose graph each; a session's
+# frames always go to the same worker. Full workers shed load with a 503.
+pose_timeout = float(os.environ.get("POSE_TIMEOUT", 5))
+pool = PosePool(workers=int(os.environ.get("POSE_WORKERS", 0)) or None,
+                queue_depth=int(os.environ.get("POSE_QUEUE_DEPTH", 4)),
+                timeout=pose_timeout)
+# Nothing starts at import: spawned workers and the debug reloader's watcher
+# process import this module too and must not start pools of their own.  The
+# pool starts on the first request, or up front when run as a script below.
+
+# Each browser tab has its own exercise and counter. Set SESSION_STORE_URL
+# (redis://...) to share sessions between several web processes. A session
+# stays locked while its frame is inferred, so the lock outlasts the pool timeout.
+sessions = create_store(os.environ.get("SESSION_STORE_URL"),
+                        ttl=float(os.environ.get("SESSION_TTL", 15 * 60)),
+                        lock_timeout=pose_timeout + 5)
 
 @app.route('/')
 def index():
@@ -20,23 +37,72 @@ def index():
 def protein():
     return render_template('protein.html')
 
+def decode_image(data):
+    """JPEG bytes from the canvas's 'data:image/jpeg;base64,...' URL; ValueError says what is wrong."""
+    if not isinstance(data, str) or not data:
+        raise ValueError("'image' is required: a base64 data URL of the frame")
+    header, comma, encoded = data.partition(',')
+    if not comma or not header.startswith('data:image/') or not header.endswith(';base64'):
+        raise ValueError("'image' must be a data URL like data:image/jpeg;base64,...")
+    try:
+        return base64.b64decode(encoded, validate=True)
+    except binascii.Error:
+        raise ValueError("'image' is not valid base64") from None
+
 @app.route('/process_frame', methods=['POST'])
 def process_frame():
-    global stage, rep_count
-    data = request.json['image']
-    encoded_data = data.split(',')[1]
-    frame_data = base64.b64decode(encoded_data)
-    np_img = np.frombuffer(frame_data, np.uint8)
-    frame = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({'error': 'expected a JSON object body'}), 400
+    session_id = body.get('session') or request.headers.get('X-Session-Id') or new_session_id()
+    # No exercise (or an empty one) keeps the session's current one; new sessions start on auto
+    exercise = body.get('exercise') or None
+    if exercise is not None:
+        try:
+            exercise_key(exercise)
+        except KeyError as e:
+            return jsonify({'error': e.args[0], 'session': session_id}), 400
+
+    with sessions.session(session_id, exercise) as session:
+        if session.resting:
+            return jsonify(session.state())
+
+        try:
+            frame_data = decode_image(body.get('image'))
+        except ValueError as e:
+            return jsonify(dict(session.state(), error=str(e))), 400
+
+        # Decoding and inference happen in the session's pose worker
+        try:
+            landmarks = pool.process(session_id, frame_data)
+        except Overloaded as e:
+            response = jsonify(dict(session.state(), error=str(e)))
+            response.headers['Retry-After'] = '1'
+            return response, 503
+
+        if landmarks is not None:
+            values, visibility = compute_features(landmarks)
+            # Wall-clock time so hold timers agree across worker processes
+            session.step(values, visibility, time.time())
+
+        return jsonify(session.state())
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(rgb)
+@app.route('/session/<session_id>', methods=['DELETE'])
+def end_session(session_id):
+    return jsonify({'session': session_id, 'dropped': sessions.drop(session_id)})
 
-    if results.pose_landmarks:
-        landmarks = results.pose_landmarks.landmark
-        stage, rep_count, _ = Pushup(landmarks, stage, rep_count)  # example
+@app.route('/sessions')
+def session_stats():
+    return jsonify(sessions.stats())
 
-    return jsonify({'reps': rep_count, 'stage': stage})
+@app.route('/health')
+def health():
+    report = pool.health()
+    report['sessions'] = sessions.stats()
+    return jsonify(report), 503 if report['status'] == 'down' else 200
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Load the models before the first request. The reloader would run this
+    # file again in a child process, with a second pool of workers.
+    pool.start()
+    app.run(debug=True, use_reloader=False)
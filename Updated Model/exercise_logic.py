@@ -1,117 +1,62 @@
-import math
-
-def calculate_angle(a, b, c):
-    a = [a.x, a.y]
-    b = [b.x, b.y]
-    c = [c.x, c.y]
-
-    radians = math.atan2(c[1]-b[1], c[0]-b[0]) - math.atan2(a[1]-b[1], a[0]-b[0])
-    angle = abs(radians * 180.0 / math.pi)
-    if angle > 180.0:
-        angle = 360 - angle
-    return angle
-
-def Pushup(landmarks, stage, counter):
-    shoulder = landmarks[12]
-    elbow = landmarks[14]
-    wrist = landmarks[16]
-
-    angle = calculate_angle(shoulder, elbow, wrist)
-
-    if angle > 160:
-        stage = "down"
-    if angle < 90 and stage == "down":
-        stage = "up"
-        counter += 1
-
-    return stage, counter, angle
-
-def Squats(landmarks, stage, counter):
-    hip = landmarks[24]
-    knee = landmarks[26]
-    ankle = landmarks[28]
-
-    angle = calculate_angle(hip, knee, ankle)
-
-    if angle > 160:
-        stage = "up"
-    if angle < 90 and stage == "up":
-        stage = "down"
-        counter += 1
-
-    return stage, counter, angle
-
-def Deadlift(landmarks, stage, counter):
-    shoulder = landmarks[12]
-    hip = landmarks[24]
-    knee = landmarks[26]
-
-    angle = calculate_angle(shoulder, hip, knee)
-
-    if angle > 160:
-        stage = "up"
-    if angle < 90 and stage == "up":
-        stage = "down"
-        counter += 1
-
-    return stage, counter, angle
-
-def Crunches(landmarks, stage, counter):
-    shoulder = landmarks[12]
-    hip = landmarks[24]
-    knee = landmarks[26]
-
-    angle = calculate_angle(shoulder, hip, knee)
-
-    if angle > 140:
-        stage = "down"
-    if angle < 90 and stage == "down":
-        stage = "up"
-        counter += 1
-
-    return stage, counter, angle
-
-def GluteBridge(landmarks, stage, counter):
-    knee = landmarks[26]
-    hip = landmarks[24]
-    shoulder = landmarks[12]
-
-    angle = calculate_angle(knee, hip, shoulder)
-
-    if angle > 160:
-        stage = "down"
-    if angle < 140 and stage == "down":
-        stage = "up"
-        counter += 1
-
-    return stage, counter, angle
-
-def LyingLegRaise(landmarks, stage, counter):
-    hip = landmarks[24]
-    knee = landmarks[26]
-    ankle = landmarks[28]
-
-    angle = calculate_angle(hip, knee, ankle)
-
-    if angle > 160:
-        stage = "down"
-    if angle < 90 and stage == "down":
-        stage = "up"
-        counter += 1
-
-    return stage, counter, angle
-
-def ChestPress(landmarks, stage, counter):
-    shoulder = landmarks[12]
-    elbow = landmarks[14]
-    wrist = landmarks[16]
-
-    angle = calculate_angle(shoulder, elbow, wrist)
-
-    if angle > 160:
-        stage = "down"
-    if angle < 90 and stage == "down":
-        stage = "up"
-        counter += 1
-
-    return stage
+"""Legacy f(landmarks, stage, counter) -> (stage, counter, value) counters.
+
+These are served by exercise_core's RepCounter through make_counter, but
+with the specs this module has always used, which differ from the
+registered ones the webcam and web app count with:
+
+- every exercise reads one right-side angle and has no visibility floor;
+- Squats: right knee 160/90, not the frontal hip height of "squat";
+- Deadlift: shoulder-hip-knee 160/90, not knee plus trunk;
+- Crunches: shoulder-hip-knee 140/90, not the neck angle;
+- Pushup, GluteBridge, LyingLegRaise and ChestPress label the extended
+  position "down" and count on reaching "up", as before;
+- a stage the spec does not know (None at the start) is passed back
+  unchanged until the first stage is reached, as before.
+
+ChestPress now returns the same (stage, counter, angle) tuple as the
+others instead of the stage alone.
+"""
+import _paths
+_paths.add_models_dir()
+
+from exercise_core.registry import RepSpec, make_counter
+
+
+def _legacy(name, feature, high, low, stages):
+    return RepSpec(name, name, name + " Angle", metrics=[(feature,)], high=[high], low=[low],
+                   stages=stages, count_on="low")
+
+
+def _legacy_counter(spec):
+    counter = make_counter(spec)
+    first = spec.stages[0]
+
+    def step(landmarks, stage, count):
+        new_stage, count, value = counter(landmarks, stage, count)
+        # The old functions only moved to the counting stage from the first one
+        if stage not in spec.stages and new_stage != first:
+            new_stage = stage
+        return new_stage, count, value
+
+    step.__name__ = spec.name
+    return step
+
+
+# Not registered: these exist only to keep the old counts for existing callers
+LEGACY_SPECS = {
+    "Pushup": _legacy("Pushup", "elbow_r", 160, 90, ("down", "up")),
+    "Squats": _legacy("Squats", "knee_r", 160, 90, ("up", "down")),
+    "Deadlift": _legacy("Deadlift", "hip_r", 160, 90, ("up", "down")),
+    "Crunches": _legacy("Crunches", "hip_r", 140, 90, ("down", "up")),
+    "GluteBridge": _legacy("GluteBridge", "hip_r", 160, 140, ("down", "up")),
+    "LyingLegRaise": _legacy("LyingLegRaise", "knee_r", 160, 90, ("down", "up")),
+    "ChestPress": _legacy("ChestPress", "elbow_r", 160, 90, ("down", "up")),
+}
+
+Pushup = _legacy_counter(LEGACY_SPECS["Pushup"])
+Squats = _legacy_counter(LEGACY_SPECS["Squats"])
+Deadlift = _legacy_counter(LEGACY_SPECS["Deadlift"])
+Crunches = _legacy_counter(LEGACY_SPECS["Crunches"])
+GluteBridge = _legacy_counter(LEGACY_SPECS["GluteBridge"])
+LyingLegRaise = _legacy_counter(LEGACY_SPECS["LyingLegRaise"])
+ChestPress = _legacy_counter(LEGACY_SPECS["ChestPress"])
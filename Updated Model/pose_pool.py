@@ -0,0 +1,314 @@
+"""Pose inference worker processes behind /process_frame.
+
+Each worker process owns one MediaPipe Pose graph and its own task queue.
+A session is always sent to the same worker (crc32 of its id modulo the
+pool size), so the worker can keep that client's RoiTracker and its frames
+are processed in order.  Sessions that share a worker interleave on one
+graph, so the worker resets the graph's temporal tracking whenever the
+session changes; consecutive frames of one session keep it.
+
+Requests carry the JPEG bytes; decoding, colour conversion and inference
+all happen in the worker, and only the (33, 4) landmark array comes back.
+A dispatcher thread in the web process resolves each request's Future.
+
+Load shedding: every worker accepts at most `queue_depth` requests in
+flight.  A request for a full (or still loading) worker raises Overloaded
+straight away, and the endpoint answers 503 with Retry-After, so queues
+and therefore p99 latency stay bounded instead of growing under overload.
+Every task carries its deadline, and a worker skips a task whose caller has
+already given up, so a backlog left by a slow frame drains without running
+inference on it.  A timed-out request still counts as in flight until its
+worker hands it back; the queue behind a slow worker therefore stays within
+`queue_depth` and new requests are shed meanwhile.  A worker that times out
+`max_timeouts` requests in a row is taken to be hung and is terminated.
+Dead workers are restarted and their pending requests fail.  health()
+reports per-worker queue depth, served, shed and timed-out counts, restarts
+and request latency percentiles.
+
+The web process must have put Models/ on sys.path (_paths) before this is
+imported; spawned workers inherit it.
+"""
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+from multiprocessing import get_context
+
+from exercise_core.profiler import LatencyHistogram
+
+DEFAULT_QUEUE_DEPTH = 4
+DEFAULT_TIMEOUT = 5.0
+# Consecutive timed-out requests after which a worker is restarted
+DEFAULT_MAX_TIMEOUTS = 3
+# RoiTrackers kept per worker; the least recently seen session's is dropped first
+MAX_TRACKS = 256
+# Error a worker reports for a task it skipped because its deadline had passed
+EXPIRED = "expired"
+
+
+class Overloaded(Exception):
+    """The session's worker is full or unavailable; retry later."""
+
+
+# ----------------------------- Worker -----------------------------
+def _worker(w, tasks, results, pose_options):
+    import cv2
+    import numpy as np
+    from exercise_core import pose as lazy
+    from exercise_core.angles import landmarks_to_array
+    from exercise_core.roi import RoiTracker
+
+    pose = lazy.create_pose(**pose_options)
+    # Request id None: the graph is loaded and the worker takes requests
+    results.put((None, (w, os.getpid()), None))
+    tracks = OrderedDict()
+    last_session = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            request_id, session_id, jpeg, deadline = task
+            if time.time() > deadline:
+                # The caller has stopped waiting; don't spend inference on it
+                results.put((request_id, None, EXPIRED))
+                continue
+            try:
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    raise ValueError("could not decode image")
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if session_id != last_session:
+                    # Another client's frame: don't track across people
+                    pose.reset()
+                    last_session = session_id
+                roi = tracks.get(session_id)
+                if roi is None:
+                    roi = tracks[session_id] = RoiTracker()
+                    if len(tracks) > MAX_TRACKS:
+                        tracks.popitem(last=False)
+                else:
+                    tracks.move_to_end(session_id)
+                out = roi.process(pose, rgb)
+                landmarks = landmarks_to_array(out.pose_landmarks.landmark) if out.pose_landmarks else None
+                results.put((request_id, landmarks, None))
+            except Exception as e:
+                results.put((request_id, None, repr(e)))
+    finally:
+        pose.close()
+
+
+# ----------------------------- Pool -----------------------------
+class PosePool:
+    """Session-affine pose workers with bounded queues.
+
+    workers     -- processes (default: CPU count, at least one)
+    queue_depth -- requests in flight per worker before new ones are shed
+    timeout     -- seconds process() waits for a result
+    max_timeouts -- consecutive timeouts after which a worker is restarted
+    """
+
+    def __init__(self, workers=None, queue_depth=DEFAULT_QUEUE_DEPTH, timeout=DEFAULT_TIMEOUT, pose_options=None,
+                 max_timeouts=DEFAULT_MAX_TIMEOUTS):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.max_timeouts = max_timeouts
+        self.pose_options = pose_options or {}
+        # Spawn, not fork: the web process may already have threads and a MediaPipe graph
+        self._ctx = get_context("spawn")
+        self._results = None
+        self._procs = [None] * self.workers
+        self._tasks = [None] * self.workers
+        self._in_flight = [0] * self.workers
+        self._served = [0] * self.workers
+        self._shed = [0] * self.workers
+        self._timed_out = [0] * self.workers
+        self._restarts = [0] * self.workers
+        self._strikes = [0] * self.workers     # timeouts since the worker last answered in time
+        self._ready = [False] * self.workers
+        self._pending = {}          # request id -> (future, worker, submitted at)
+        self._latency = LatencyHistogram()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._closed = False
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self._results = self._ctx.Queue()
+            for w in range(self.workers):
+                self._spawn(w)
+            self._dispatcher = threading.Thread(target=self._dispatch, name="pose-pool", daemon=True)
+            self._dispatcher.start()
+
+    def _spawn(self, w):
+        self._tasks[w] = self._ctx.Queue()
+        self._ready[w] = False
+        self._strikes[w] = 0
+        self._procs[w] = self._ctx.Process(target=_worker, args=(w, self._tasks[w], self._results, self.pose_options),
+                                           name=f"pose-worker-{w}", daemon=True)
+        self._procs[w].start()
+
+    def close(self, timeout=5.0):
+        with self._lock:
+            self._closed = True
+            procs = [p for p in self._procs if p is not None]
+            for q in self._tasks:
+                if q is not None:
+                    q.put(None)
+        for p in procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._fail_pending(lambda w: True, "pose pool closed")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- requests ----------------
+    def worker_for(self, session_id):
+        return zlib.crc32(session_id.encode()) % self.workers
+
+    def submit(self, session_id, jpeg, timeout=None):
+        """Queue one JPEG frame; returns a Future of the (33, 4) landmarks or None.
+
+        The worker skips the frame if it only gets to it after `timeout` seconds.
+        Raises Overloaded when the session's worker already has queue_depth requests.
+        """
+        deadline = time.time() + (self.timeout if timeout is None else timeout)
+        if self._dispatcher is None:
+            self.start()
+        w = self.worker_for(session_id)
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise Overloaded("pose pool is closed")
+            if not self._ready[w] or not self._procs[w].is_alive():
+                self._shed[w] += 1
+                raise Overloaded(f"pose worker {w} is starting")
+            if self._in_flight[w] >= self.queue_depth:
+                self._shed[w] += 1
+                raise Overloaded(f"pose worker {w} is busy")
+            request_id = self._next_id
+            self._next_id += 1
+            self._in_flight[w] += 1
+            self._pending[request_id] = (future, w, time.perf_counter())
+            self._tasks[w].put((request_id, session_id, jpeg, deadline))
+        return future
+
+    def process(self, session_id, jpeg, timeout=None):
+        """submit() and wait; raises Overloaded on shedding or when the worker is too slow."""
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(session_id, jpeg, timeout)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if not self._expire(future, self.worker_for(session_id)):
+                return future.result()      # answered while we were giving up
+            raise Overloaded("pose worker timed out") from None
+
+    def _expire(self, future, w):
+        """Abandon a timed-out request; False if its result arrived meanwhile.
+
+        The request stays in flight until the worker returns it (or skips it),
+        so a slow worker's queue cannot grow past queue_depth.  A worker with
+        max_timeouts timeouts in a row is terminated; _check_workers restarts it.
+        """
+        with self._lock:
+            if not future.cancel():
+                return False
+            self._timed_out[w] += 1
+            self._strikes[w] += 1
+            if self._strikes[w] >= self.max_timeouts and not self._closed:
+                self._strikes[w] = 0
+                self._procs[w].terminate()
+        return True
+
+    def _dispatch(self):
+        next_check = time.monotonic() + 1.0
+        while not self._closed:
+            try:
+                item = self._results.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            except (EOFError, OSError):
+                return
+            # Look for crashed workers about once a second, busy or not
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + 1.0
+            if item is None:
+                continue
+            request_id, landmarks, error = item
+            if request_id is None:
+                w, pid = landmarks
+                with self._lock:
+                    # Ignore a ready signal from a worker that has since been replaced
+                    if self._procs[w].pid == pid:
+                        self._ready[w] = True
+                continue
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                future, w, submitted = entry
+                self._in_flight[w] -= 1
+                if future.cancelled():
+                    continue        # timed out in process(); the worker may have skipped it
+                if error != EXPIRED:
+                    self._served[w] += 1
+                    self._strikes[w] = 0
+                    self._latency.record(time.perf_counter() - submitted)
+            if error == EXPIRED:
+                future.set_exception(Overloaded("pose worker timed out"))
+            elif error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(landmarks)
+
+    def _check_workers(self):
+        with self._lock:
+            dead = [w for w, p in enumerate(self._procs) if not self._closed and not p.is_alive()]
+            for w in dead:
+                self._restarts[w] += 1
+                self._in_flight[w] = 0
+                self._spawn(w)
+        if dead:
+            self._fail_pending(lambda w: w in dead, "pose worker restarted")
+
+    def _fail_pending(self, which, message):
+        with self._lock:
+            failed = [(rid, f) for rid, (f, w, _) in self._pending.items() if which(w)]
+            for rid, _ in failed:
+                del self._pending[rid]
+        for _, future in failed:
+            if not future.done():
+                future.set_exception(Overloaded(message))
+
+    # ---------------- reporting ----------------
+    def health(self):
+        with self._lock:
+            workers = [{"worker": w, "pid": p.pid if p else None, "alive": bool(p and p.is_alive()),
+                        "ready": bool(p and p.is_alive() and self._ready[w]), "in_flight": self._in_flight[w],
+                        "served": self._served[w], "shed": self._shed[w], "timed_out": self._timed_out[w],
+                        "restarts": self._restarts[w]}
+                       for w, p in enumerate(self._procs)]
+            latency = self._latency.as_dict()
+        started = self._dispatcher is not None
+        ready = sum(w["ready"] for w in workers)
+        # "down" also covers the first seconds after start, while graphs load
+        status = "idle" if not started else "ok" if ready == self.workers else "degraded" if ready else "down"
+        return {"status": status, "workers": workers, "queue_depth": self.queue_depth,
+                "in_flight": sum(w["in_flight"] for w in workers), "shed": sum(w["shed"] for w in workers),
+                "latency": latency}
@@ -0,0 +1,187 @@
+"""Per-client counting sessions for the /process_frame server.
+
+Every browser tab sends a session id with its frames.  A Session holds
+that client's selected exercise and its compiled counter (registry.create),
+so tabs no longer share one global rep count.  A session that never names
+an exercise detects it ("auto").  Tracking state (the pose
+graph and RoiTracker) lives in the session's pose_pool worker instead.
+
+SessionStore keeps sessions in process memory, in an OrderedDict used as an
+LRU: each access moves the session to the end, and sessions idle longer
+than `ttl` seconds or beyond `max_sessions` are evicted from the front.
+
+RedisSessionStore keeps the same Session objects (pickled) in Redis with a
+TTL, so any number of worker processes or hosts can serve one client.  A
+per-session Redis lock serializes frames from the same client across
+workers.  `redis` is only imported when this backend is chosen.
+
+    store = create_store(os.environ.get("SESSION_STORE_URL"))
+    with store.session(session_id, exercise) as session:
+        stage, reps, value = session.step(values, visibility, t)
+"""
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from exercise_core import registry
+
+# Dropdown value that pauses counting; frames are not run through the pose model
+REST = "rest"
+# Counter for clients that never pick an exercise: detects it from the motion
+AUTO = "auto"
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_SESSIONS = 1000
+# Must outlast everything done while a session is held, pose inference included
+DEFAULT_LOCK_TIMEOUT = 15.0
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def exercise_key(exercise):
+    """Canonical spec name for a dropdown value ('Squats' -> 'squat'); raises KeyError."""
+    key = registry.normalize_name(exercise or AUTO)
+    if key in (REST, AUTO):
+        return key
+    return registry.get_spec(exercise).name
+
+
+class Session:
+    """One client's exercise and counter."""
+
+    def __init__(self, session_id, exercise=AUTO):
+        self.id = session_id
+        self.exercise = None
+        self.counter = None
+        self.created = self.updated = time.time()
+        self.select(exercise)
+
+    def select(self, exercise):
+        """Switch exercise; the count starts over only when it actually changes."""
+        name = exercise_key(exercise)
+        if name != self.exercise:
+            self.exercise = name
+            self.counter = None if name == REST else registry.create(name)
+
+    @property
+    def resting(self):
+        return self.counter is None
+
+    def step(self, values, visibility, t=None):
+        return self.counter.step(values, visibility, t)
+
+    def state(self):
+        counter = self.counter
+        state = {"session": self.id, "exercise": self.exercise,
+                 "reps": counter.reps if counter else 0, "stage": counter.stage if counter else None}
+        if self.exercise == AUTO:
+            # "auto" until an exercise has been recognised
+            state["detected"] = counter.spec.name
+        return state
+
+
+# ----------------------------- In-process store -----------------------------
+class SessionStore:
+    """Sessions in this process, evicted by idle time and LRU order."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        # Least recently used first, so expired sessions sit at the front
+        sessions = self._sessions
+        while sessions:
+            oldest_id, oldest = next(iter(sessions.items()))
+            if len(sessions) <= self.max_sessions and now - oldest.updated <= self.ttl:
+                break
+            del sessions[oldest_id]
+            self._locks.pop(oldest_id, None)
+            self.evicted += 1
+
+    @contextmanager
+    def session(self, session_id, exercise=None):
+        """The session for session_id (created if new or evicted), held for one frame."""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id)
+                self._locks[session_id] = threading.Lock()
+            else:
+                self._sessions.move_to_end(session_id)
+            session.updated = now
+            lock = self._locks[session_id]
+            self._evict(now)
+        with lock:
+            if exercise is not None:
+                session.select(exercise)
+            yield session
+
+    def drop(self, session_id):
+        with self._lock:
+            self._locks.pop(session_id, None)
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        return {"backend": "memory", "sessions": len(self._sessions), "evicted": self.evicted,
+                "ttl": self.ttl, "max_sessions": self.max_sessions}
+
+
+# ----------------------------- Shared store -----------------------------
+def _redis():
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("SESSION_STORE_URL needs the 'redis' package (pip install redis)") from None
+    return redis
+
+
+class RedisSessionStore:
+    """Sessions shared by every worker through Redis; Redis expires idle ones after ttl.
+
+    Sessions are pickled, so the Redis instance must only be reachable by
+    these workers.
+    """
+
+    def __init__(self, url, ttl=DEFAULT_TTL, prefix="exercise:session:", lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        self.client = _redis().Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+
+    @contextmanager
+    def session(self, session_id, exercise=None):
+        key = self.prefix + session_id
+        with self.client.lock(key + ":lock", timeout=self.lock_timeout, blocking_timeout=self.lock_timeout):
+            blob = self.client.get(key)
+            session = pickle.loads(blob) if blob is not None else Session(session_id)
+            if exercise is not None:
+                session.select(exercise)
+            yield session
+            session.updated = time.time()
+            self.client.set(key, pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL), ex=int(self.ttl))
+
+    def drop(self, session_id):
+        return bool(self.client.delete(self.prefix + session_id))
+
+    def stats(self):
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+def create_store(url=None, ttl=DEFAULT_TTL, max_sessions=DEFAULT_MAX_SESSIONS, lock_timeout=DEFAULT_LOCK_TIMEOUT):
+    """RedisSessionStore for a redis:// URL, else an in-process SessionStore."""
+    if url:
+        return RedisSessionStore(url, ttl=ttl, lock_timeout=lock_timeout)
+    return SessionStore(ttl=ttl, max_sessions=max_sessions)
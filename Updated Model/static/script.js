@@ -3,6 +3,13 @@ const canvas = document.getElementById('canvas');
 const ctx = canvas.getContext('2d');
 const exerciseSelect = document.getElementById('exercise'); // Get the dropdown
 
+// One counting session per tab; the server keeps its reps and stage under this id
+let sessionId = sessionStorage.getItem('sessionId');
+if (!sessionId) {
+  sessionId = crypto.randomUUID ? crypto.randomUUID() : String(Date.now()) + Math.random().toString(16).slice(2);
+  sessionStorage.setItem('sessionId', sessionId);
+}
+
 navigator.mediaDevices.getUserMedia({ video: true })
   .then(stream => {
     video.srcObject = stream;
@@ -15,18 +22,19 @@ function captureFrame() {
   ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
   const dataUrl = canvas.toDataURL('image/jpeg');
 
-  // Include selected exercise in the request
+  // Include selected exercise and this tab's session in the request
   fetch('/process_frame', {
     method: 'POST',
     body: JSON.stringify({
       image: dataUrl,
-      exercise: exerciseSelect.value
+      exercise: exerciseSelect.value,
+      session: sessionId
     }),
     headers: { 'Content-Type': 'application/json' }
   })
   .then(res => res.json())
   .then(data => {
     document.getElementById('reps').textContent = data.reps;
-    document.getElementById('stage').textContent = data.stage;
+    document.getElementById('stage').textContent = data.stage ?? '-';
   });
 }